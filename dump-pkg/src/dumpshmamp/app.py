@@ -1,25 +1,44 @@
 import argparse
-import getpass
 import os
 import platform
-import tarfile
 import tempfile
 from datetime import datetime
 
-from dumpshmamp.collectors.env import EnvDataCollector
 from dumpshmamp.collectors.jetbrains import JetBrainsProductDataCollector, JetBrainsProductInfo
 from shminspector.api.context import Context
 from shminspector.api.registry import Registry
+from shminspector.util import trace
+from shminspector.util.profile import profiling, profiled
+from shminspector.util.spawnaudit import auditing
 
-platform.uname()
 user_home_dir_path = os.path.expanduser("~")
 default_target_dir_path = user_home_dir_path + "/tmp/env_dumps"
-username = getpass.getuser()
-archive_content_dir_path = tempfile.mkdtemp(prefix="envdmp-{}-".format(username))
+
+_archive_content_dir_path = None
+
+
+def archive_content_dir_path():
+    """
+    :return: the temporary directory that the collected files are written to, which is created on first use
+    """
+    global _archive_content_dir_path
+    if _archive_content_dir_path is None:
+        _archive_content_dir_path = tempfile.mkdtemp(prefix="envdmp-{}-".format(username()))
+
+    return _archive_content_dir_path
+
+
+def username():
+    import getpass
+
+    return getpass.getuser()
 
 
 def _prepare_env_info_file(ctx):
-    env_info_target_dir_path = "{}/env".format(archive_content_dir_path)
+    # deferred, because it imports most of the inspector's components, which argument parsing does not need
+    from dumpshmamp.collectors.env import EnvDataCollector
+
+    env_info_target_dir_path = "{}/env".format(archive_content_dir_path())
     os.mkdir(env_info_target_dir_path)
 
     env = EnvDataCollector(ctx, user_home_dir_path, env_info_target_dir_path)
@@ -28,7 +47,7 @@ def _prepare_env_info_file(ctx):
 
 def _jetbrains_product_info_collector_for(product_name, log_dir_segment=None, pref_dir_segment=None):
     def prepare_files(ctx):
-        target_dir_path = os.path.join(archive_content_dir_path, product_name.lower())
+        target_dir_path = os.path.join(archive_content_dir_path(), product_name.lower())
 
         collector = JetBrainsProductDataCollector(
             product_info=JetBrainsProductInfo(
@@ -52,13 +71,16 @@ _prepare_pycharm_info_files = _jetbrains_product_info_collector_for("PyCharm")
 
 
 def _create_dump_archive(ctx):
+    import tarfile
+
     ctx.logger.info("Preparing tar archive...")
+    content_dir_path = archive_content_dir_path()
 
     if ctx.log_file_path is not None and os.path.exists(ctx.log_file_path):
-        os.system("cp {} {}".format(ctx.log_file_path, "{}/self.log".format(archive_content_dir_path)))
+        os.system("cp {} {}".format(ctx.log_file_path, "{}/self.log".format(content_dir_path)))
 
     with tarfile.open(ctx.flags.out_file, "w:gz") as tar:
-        tar.add(archive_content_dir_path, arcname=os.path.basename(archive_content_dir_path))
+        tar.add(content_dir_path, arcname=os.path.basename(content_dir_path))
 
 
 def _check_prerequisites(ctx):
@@ -68,12 +90,16 @@ def _check_prerequisites(ctx):
         raise Exception("Unsupported operating system '%s'" % os_name)
 
 
-def _safe(ctx, *methods):
-    count = len(methods)
+def _safe(ctx, *named_methods):
+    """
+    :param named_methods: (name, method) pairs - names identify the methods in traces and profiles
+    """
+    count = len(named_methods)
 
-    for method in methods:
+    for name, method in named_methods:
         try:
-            method(ctx)
+            with trace.span(name, "dump", lane="dump"):
+                profiled(name, method, ctx)
         except Exception as err:
             count -= 1
             ctx.logger.error(err)
@@ -90,19 +116,21 @@ def run():
 
         _safe(
             context,
-            _prepare_env_info_file,
-            _prepare_intellij_info_files,
-            _prepare_webstore_info_files,
-            _prepare_goland_info_files,
-            _prepare_pycharm_info_files,
+            ("env", _prepare_env_info_file),
+            ("jetbrains.IntelliJ", _prepare_intellij_info_files),
+            ("jetbrains.WebStorm", _prepare_webstore_info_files),
+            ("jetbrains.GoLand", _prepare_goland_info_files),
+            ("jetbrains.PyCharm", _prepare_pycharm_info_files),
         )
+        context.logger.debug("Facts: {} computed, {} reused".format(context.facts.misses, context.facts.hits))
         if not ctx.flags.dryrun:
             _create_dump_archive(context)
             os.system("open -R %s" % ctx.flags.out_file)
         else:
             ctx.logger.info("Dry-run mode: archive creation skipped!")
 
-    run_safe(ctx, dump)
+    with trace.tracing(ctx.flags.trace_file), profiling(ctx.flags.profile_dir, ctx.logger), auditing(ctx):
+        run_safe(ctx, dump)
 
 
 def _parse_context():
@@ -125,6 +153,13 @@ def _parse_context():
     parser.add_argument("--config",
                         dest="config_file",
                         help="optional JSON config file path")
+    parser.add_argument("--trace-file",
+                        dest="trace_file",
+                        help="optional path of a Chrome trace event JSON file to write a timeline of the run to")
+    parser.add_argument("--profile",
+                        dest="profile_dir",
+                        help="optional directory to write cProfile stats of every data collection task to. A merged "
+                             "hotspots report is printed at the end of the run")
     parser.add_argument("--output", "-o",
                         default=None,
                         dest="out_file",
@@ -139,6 +174,8 @@ def _parse_context():
         debug=args.debug,
         log_file=args.log_file,
         experimental=args.experimental,
+        trace_file=args.trace_file,
+        profile_dir=args.profile_dir,
     )
 
     context.flags.out_file = resolve_output_file_path(args)
@@ -151,7 +188,7 @@ def resolve_output_file_path(args):
         return args.out_file
     else:
         os.makedirs(default_target_dir_path, exist_ok=True)
-        return "{}/envdump-{}-{}.tar.gz".format(default_target_dir_path, username, datetime.now().isoformat())
+        return "{}/envdump-{}-{}.tar.gz".format(default_target_dir_path, username(), datetime.now().isoformat())
 
 
 def run_safe(ctx: Context, fn):
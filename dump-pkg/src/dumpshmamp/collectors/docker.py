@@ -1,9 +1,9 @@
 from dumpshmamp.collectors.files import try_copyfile, file_path, mkdir
-from shminspector.util.cmd import try_capture_output, is_command
+from shminspector.util.cmd import try_capture_output
 
 
 def collect_docker_files(user_home_dir_path, target_dir_path, ctx):
-    if is_command("docker"):
+    if ctx.facts.which("docker") is not None:
         ctx.logger.info("Collecting Docker information...")
 
         mkdir(target_dir_path)
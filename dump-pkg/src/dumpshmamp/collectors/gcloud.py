@@ -1,5 +1,5 @@
 from dumpshmamp.collectors.files import try_copytree_if, try_copyfile, file_path, mkdir
-from shminspector.util.cmd import try_capture_output, is_command
+from shminspector.util.cmd import try_capture_output
 
 two_week_sec = 14 * 24 * 60 * 60  # days * hours * minutes * seconds
 
@@ -39,7 +39,7 @@ def _collect_config(user_home_dir, target_dir, ctx):
 
 
 def _collect_info(target_dir, ctx):
-    if is_command("gcloud"):
+    if ctx.facts.which("gcloud") is not None:
         try_capture_output(
             cmd=["gcloud", "info"],
             additional_env={
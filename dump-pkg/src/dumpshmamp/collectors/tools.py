@@ -1,6 +1,6 @@
 from dumpshmamp.collectors.files import mkdir
 
-from shminspector.util.cmd import try_capture_output, is_command
+from shminspector.util.cmd import try_capture_output
 
 
 def collect_shell_tools_info_files(target_dir, ctx):
@@ -23,7 +23,7 @@ def collect_shell_tools_info_files(target_dir, ctx):
 
 def _collect_info(cmd, target_dir, file_name, ctx):
     executable_name = cmd[0]
-    if is_command(executable_name):
+    if ctx.facts.which(executable_name) is not None:
         try_capture_output(
             cmd=cmd,
             target_dir_path=target_dir,
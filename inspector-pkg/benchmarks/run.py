@@ -0,0 +1,169 @@
+"""
+Benchmarks the execution graph and the executor against synthetic registries (see benchmarks.synthetic).
+
+Usage (from the inspector-pkg directory):
+
+    PYTHONPATH=src python3 -m benchmarks.run [--sizes 100,500,1000,2000,5000] [--repeat 5] [--output results.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import synthetic_registry
+from shminspector.api.context import Context, Mode
+from shminspector.api.executiongraph import ExecutionGraph
+from shminspector.api.executor import Executor
+from shminspector.api.registry import is_effective
+
+
+def bench_graph_construction(size, repeat):
+    registry = synthetic_registry(size)
+    ctx = _context(registry)
+
+    return _measure(lambda: ExecutionGraph(ctx), repeat)
+
+
+def bench_handler_filtering(size, repeat):
+    registry = synthetic_registry(size)
+    ctx = _context(registry)
+    handlers = []
+    for comp_id in registry.component_ids():
+        handlers.append(registry.find_collector(comp_id))
+        handlers.append(registry.find_validator(comp_id))
+        handlers.extend(registry.find_reactors(comp_id))
+
+    def filter_all():
+        for handler in handlers:
+            is_effective(handler, ctx.platform, ctx.flags.experimental, ctx.mode == Mode.INTERACTIVE)
+
+    return _measure(filter_all, repeat)
+
+
+def bench_effective_view(size, repeat):
+    registry = synthetic_registry(size)
+    ctx = _context(registry)
+    comp_ids = list(registry.component_ids())
+
+    def look_up_all():
+        # the view is built by the first (warm up) call and served from the registry's cache afterwards
+        view = registry.effective_view(ctx.platform, ctx.flags.experimental, ctx.mode == Mode.INTERACTIVE)
+        for comp_id in comp_ids:
+            view.find_collector(comp_id)
+            view.find_validator(comp_id)
+            view.find_reactors(comp_id)
+
+    return _measure(look_up_all, repeat)
+
+
+def bench_executor(size, jobs, command_jobs, latency, repeat):
+    registry = synthetic_registry(size, latency=latency)
+    ctx = _context(registry, jobs=jobs, command_jobs=command_jobs)
+    executor = Executor()
+
+    return _measure(lambda: executor.execute(ctx, get_handler=_noop_handler_provider), repeat)
+
+
+def run(sizes, repeat, executor_size, latency):
+    results = []
+
+    def record(name, params, timings):
+        result = dict(name=name, params=params, **_stats_of(timings))
+        results.append(result)
+        print("{:<24} {:<60} median={:.6f}s".format(name, json.dumps(params, sort_keys=True), result["median_sec"]),
+              file=sys.stderr)
+
+    for size in sizes:
+        record("graph_construction", {"size": size}, bench_graph_construction(size, repeat))
+        record("handler_filtering", {"size": size}, bench_handler_filtering(size, repeat))
+        record("effective_view", {"size": size}, bench_effective_view(size, repeat))
+
+    for jobs in (1, 4, 16):
+        for command_jobs in (1, 4):
+            params = {"size": executor_size, "jobs": jobs, "command_jobs": command_jobs, "latency_sec": latency}
+            record("executor", params, bench_executor(executor_size, jobs, command_jobs, latency, repeat))
+
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the inspector benchmarks")
+    parser.add_argument("--sizes",
+                        default="100,500,1000,2000,5000",
+                        help="comma separated registry sizes for the graph and filtering benchmarks")
+    parser.add_argument("--executor-size",
+                        default=200,
+                        type=int,
+                        help="registry size for the executor benchmarks")
+    parser.add_argument("--latency",
+                        default=0.005,
+                        type=float,
+                        help="simulated collector latency in seconds for the executor benchmarks")
+    parser.add_argument("--repeat",
+                        default=5,
+                        type=int,
+                        help="number of measured repetitions per benchmark")
+    parser.add_argument("--output",
+                        default=None,
+                        help="JSON results file path (defaults to stdout)")
+    args = parser.parse_args()
+
+    report = run(sizes=[int(size) for size in args.sizes.split(",")],
+                 repeat=args.repeat,
+                 executor_size=args.executor_size,
+                 latency=args.latency)
+
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+def _context(registry, jobs=1, command_jobs=1):
+    return Context(name="benchmark", registry=registry, mode=Mode.BACKGROUND, no_cache=True, jobs=jobs,
+                   command_jobs=command_jobs)
+
+
+# noinspection PyUnusedLocal
+def _noop_handler(command, ctx):
+    return None
+
+
+# noinspection PyUnusedLocal
+def _noop_handler_provider(ctx):
+    return _noop_handler
+
+
+def _measure(fn, repeat):
+    fn()  # warm up
+
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start_time)
+
+    return timings
+
+
+def _stats_of(timings):
+    return {
+        "min_sec": min(timings),
+        "median_sec": statistics.median(timings),
+        "max_sec": max(timings),
+        "timings_sec": timings,
+    }
+
+
+if __name__ == '__main__':
+    main()
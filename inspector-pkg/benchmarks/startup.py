@@ -0,0 +1,170 @@
+"""
+Measures the cold start of the command line tools - argument parsing and plan mode - in fresh interpreters, and fails
+when any of them takes longer than its budget. The tools run from login hooks, so start up time is paid over and over.
+
+Every scenario runs with 'python -X importtime', so besides the wall time (reported on top of a bare interpreter start)
+the slowest top level imports are reported as well, which is usually where a regression comes from.
+
+Usage (from the inspector-pkg directory):
+
+    PYTHONPATH=src:../installer-pkg/src:../dump-pkg/src python3 -m benchmarks.startup [--budget-factor 1.5]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+Scenario = namedtuple(typename="Scenario", field_names=["name", "entry_point", "args", "budget_sec"])
+
+SCENARIOS = [
+    Scenario("envinstall --help", "shminstaller.app:run", ["--help"], 0.1),
+    Scenario("envinstall --plan", "shminstaller.app:run", ["--plan", "--mode", "background"], 0.12),
+    Scenario("envdump --help", "dumpshmamp.app:run", ["--help"], 0.1),
+    Scenario("envstatus --help", "shminspector.query:main", ["--help"], 0.05),
+]
+
+_SCRIPT = """
+import sys
+from {module} import {function}
+sys.argv = {argv!r}
+try:
+    {function}()
+except SystemExit:
+    pass
+"""
+
+
+def bench_scenario(scenario, repeat, baseline_sec, baseline_imports):
+    module_name, function_name = scenario.entry_point.split(":")
+    script = _SCRIPT.format(module=module_name, function=function_name,
+                            argv=[scenario.name.split()[0]] + scenario.args)
+
+    timings = []
+    imports = {}
+    for _ in range(repeat):
+        elapsed, import_times = _run(["-c", script])
+        timings.append(max(0.0, elapsed - baseline_sec))
+        for name, cumulative_sec in import_times.items():
+            if name not in baseline_imports:
+                imports.setdefault(name, []).append(cumulative_sec)
+
+    top_imports = sorted(
+        ((name, statistics.median(times)) for name, times in imports.items()), key=lambda entry: entry[1], reverse=True
+    )
+    return timings, top_imports[:5]
+
+
+def bench_baseline(repeat):
+    """
+    :return: the median wall time of a bare interpreter start and the names of the modules it imports
+    """
+    runs = list(_run(["-c", "pass"]) for _ in range(repeat))
+
+    return statistics.median(elapsed for elapsed, _ in runs), set(runs[0][1].keys())
+
+
+def run(repeat, budget_factor):
+    # the first runs compile the byte code, which is not part of a regular start up
+    bench_baseline(1)
+    for scenario in SCENARIOS:
+        bench_scenario(scenario, 1, 0, set())
+
+    baseline_sec, baseline_imports = bench_baseline(repeat)
+    print("{:<24} median={:.3f}s".format("python -c pass", baseline_sec), file=sys.stderr)
+
+    results = []
+    for scenario in SCENARIOS:
+        timings, top_imports = bench_scenario(scenario, repeat, baseline_sec, baseline_imports)
+        budget_sec = scenario.budget_sec * budget_factor
+        median_sec = statistics.median(timings)
+        results.append({
+            "name": scenario.name,
+            "median_sec": median_sec,
+            "budget_sec": budget_sec,
+            "over_budget": median_sec > budget_sec,
+            "timings_sec": timings,
+            "top_imports_sec": dict(top_imports),
+        })
+        print("{:<24} median={:.3f}s budget={:.3f}s{} top imports: {}".format(
+            scenario.name,
+            median_sec,
+            budget_sec,
+            " OVER BUDGET" if median_sec > budget_sec else "",
+            ", ".join("{} {:.3f}s".format(name, sec) for name, sec in top_imports)
+        ), file=sys.stderr)
+
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "baseline_sec": baseline_sec,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks the start up time of the command line tools against budgets")
+    parser.add_argument("--repeat",
+                        default=5,
+                        type=int,
+                        help="number of measured runs per scenario")
+    parser.add_argument("--budget-factor",
+                        default=1.0,
+                        type=float,
+                        help="multiplies all budgets, e.g. to account for slower machines")
+    parser.add_argument("--output",
+                        default=None,
+                        help="JSON results file path (defaults to stdout)")
+    args = parser.parse_args()
+
+    report = run(repeat=args.repeat, budget_factor=args.budget_factor)
+
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if any(result["over_budget"] for result in report["results"]):
+        sys.exit(1)
+
+
+def _run(args):
+    """
+    :return: the wall time of running the interpreter with the specified arguments and the cumulative import times of
+    the top level modules
+    """
+    start_time = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime"] + args,
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    elapsed = time.perf_counter() - start_time
+
+    return elapsed, _top_level_import_times(process.stderr)
+
+
+def _top_level_import_times(importtime_output):
+    import_times = {}
+    for line in importtime_output.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if not name.startswith(" ") or name.startswith("  "):
+            continue  # not a top level import
+
+        import_times[name.strip()] = int(cumulative_us) / 1000000
+
+    return import_times
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import random
+import time
+
+from shminspector.api.collector import Collector
+from shminspector.api.reactor import Reactor, ReactorCommand
+from shminspector.api.registry import Registry
+from shminspector.api.tags import prerequisites, experimental
+from shminspector.api.validator import Validator, ValidationResult, Status
+
+
+class LatencyCollector(Collector):
+    """
+    Simulates a collector that blocks for 'latency' seconds, e.g. waiting for a subprocess.
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def collect(self, ctx):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        return self.latency
+
+
+class FixedStatusValidator(Validator):
+    def __init__(self, status):
+        self.status = status
+
+    def validate(self, input_data, ctx) -> ValidationResult:
+        return ValidationResult(input_data, self.status)
+
+
+class ManyCommandsReactor(Reactor):
+    def __init__(self, comp_id, command_count):
+        self.commands = list(
+            ReactorCommand(["brew", "install", "{}-formula-{}".format(comp_id, index)]) for index in range(command_count)
+        )
+
+    def react(self, data, ctx):
+        return list(self.commands)
+
+
+def synthetic_registry(size,
+                       max_prerequisites=3,
+                       latency=0.0,
+                       failure_ratio=0.2,
+                       commands_per_reactor=5,
+                       experimental_ratio=0.1,
+                       seed=0):
+    """
+    Builds a registry of 'size' components, whose prerequisites form a random DAG: every component depends on up to
+    'max_prerequisites' components registered before it. A 'failure_ratio' share of the components fail validation and
+    react with 'commands_per_reactor' commands each, and an 'experimental_ratio' share of them is tagged experimental.
+    """
+    rnd = random.Random(seed)
+    registry = Registry()
+
+    for index in range(size):
+        comp_id = "comp-{}".format(index)
+
+        collector = LatencyCollector(latency)
+        if index > 0:
+            prerequisite_count = rnd.randint(0, min(max_prerequisites, index))
+            prerequisite_ids = ("comp-{}".format(prerequisite) for prerequisite in rnd.sample(range(index),
+                                                                                               prerequisite_count))
+            collector = prerequisites(*prerequisite_ids)(collector)
+
+        failing = rnd.random() < failure_ratio
+        validator = FixedStatusValidator(Status.NOT_FOUND if failing else Status.OK)
+        reactor = ManyCommandsReactor(comp_id, commands_per_reactor if failing else 0)
+
+        if rnd.random() < experimental_ratio:
+            reactor = experimental(reactor)
+
+        registry.register_collector(comp_id, collector)
+        registry.register_validator(comp_id, validator)
+        registry.register_reactor(comp_id, reactor)
+
+    return registry
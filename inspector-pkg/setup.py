@@ -22,9 +22,15 @@ setup(
     packages=find_packages('src'),
     package_dir={'': 'src'},
     py_modules=[splitext(basename(path))[0] for path in glob('src/*.py')],
-    install_requires=[
-        'networkx>=2.2,<3',
-    ],
+    extras_require={
+        # only needed for exporting execution graphs (see shminspector.api.dag.DAG.to_networkx)
+        'graph': ['networkx>=2.2,<3'],
+    },
+    entry_points={
+        "console_scripts": [
+            "envstatus=shminspector.query:main"
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,146 @@
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "shminspector")
+DURATIONS_FILE_NAME = "durations.json"
+
+
+class CollectorCache:
+    """
+    A persistent on-disk cache of collected data. Collectors opt in by implementing 'fingerprint(ctx)', which returns a
+    picklable value that changes whenever the collected data might change (see the *_fingerprint helpers below).
+    Cached data is served only as long as the stored fingerprint equals the current one.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, logger=None):
+        self.cache_dir = cache_dir
+        self.logger = logger
+
+    def get(self, comp_id, collector, fingerprint):
+        """
+        :return: a (hit, data) tuple
+        """
+        try:
+            with open(self._entry_path(comp_id), "rb") as entry_file:
+                collector_name, cached_fingerprint, data = pickle.load(entry_file)
+        except FileNotFoundError:
+            return False, None
+        except Exception as err:
+            self._debug("Failed to read cache entry for {} - {}".format(comp_id, err))
+            return False, None
+
+        if collector_name == _name_of(collector) and cached_fingerprint == fingerprint:
+            return True, data
+        else:
+            return False, None
+
+    def put(self, comp_id, collector, fingerprint, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_file_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".{}-".format(comp_id))
+            with os.fdopen(fd, "wb") as entry_file:
+                pickle.dump((_name_of(collector), fingerprint, data), entry_file)
+
+            os.replace(tmp_file_path, self._entry_path(comp_id))
+        except Exception as err:
+            self._debug("Failed to write cache entry for {} - {}".format(comp_id, err))
+
+    def durations(self):
+        """
+        :return: a dictionary of the most recently recorded execution durations (in seconds) by component id
+        """
+        try:
+            with open(self._durations_path(), "r") as durations_file:
+                return dict(json.load(durations_file))
+        except FileNotFoundError:
+            return {}
+        except Exception as err:
+            self._debug("Failed to read component durations - {}".format(err))
+            return {}
+
+    def put_durations(self, durations):
+        """
+        Records component execution durations, replacing previously recorded durations of the same components.
+        """
+        if len(durations) == 0:
+            return
+
+        merged = self.durations()
+        merged.update(durations)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_file_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".durations-")
+            with os.fdopen(fd, "w") as durations_file:
+                json.dump(merged, durations_file, indent=2, sort_keys=True)
+
+            os.replace(tmp_file_path, self._durations_path())
+        except Exception as err:
+            self._debug("Failed to write component durations - {}".format(err))
+
+    def _durations_path(self):
+        return os.path.join(self.cache_dir, DURATIONS_FILE_NAME)
+
+    def _entry_path(self, comp_id):
+        return os.path.join(self.cache_dir, "{}.pickle".format(comp_id))
+
+    def _debug(self, message):
+        if self.logger is not None:
+            self.logger.debug(message)
+
+
+def fingerprint_of(collector, ctx):
+    """
+    :return: the collector's current fingerprint, or None if it doesn't support caching
+    """
+    fingerprint = getattr(collector, "fingerprint", None)
+    if fingerprint is None:
+        return None
+
+    return fingerprint(ctx)
+
+
+def binary_fingerprint(*names):
+    """
+    Identifies executables by their resolved path and modification time, so that installing, upgrading or replacing a
+    binary (or the symlink pointing to it) invalidates the fingerprint.
+    """
+    fingerprint = []
+    for name in names:
+        path = shutil.which(name)
+        if path is None:
+            fingerprint.append((name, None))
+        else:
+            real_path = os.path.realpath(path)
+            fingerprint.append((name, path, _mtime(path, follow_symlinks=False), real_path, _mtime(real_path)))
+
+    return tuple(fingerprint)
+
+
+def files_fingerprint(*paths):
+    """
+    Identifies files (or directories) by their modification time. Missing files are part of the fingerprint too.
+    """
+    return tuple((path, _mtime(os.path.expanduser(path))) for path in paths)
+
+
+def ttl_fingerprint(seconds):
+    """
+    A fingerprint that changes every 'seconds' seconds, for data that cannot be tied to files.
+    """
+    return int(time.time() // seconds)
+
+
+def _mtime(path, follow_symlinks=True):
+    try:
+        return os.stat(path, follow_symlinks=follow_symlinks).st_mtime
+    except OSError:
+        return None
+
+
+def _name_of(collector):
+    collector_type = type(collector)
+    return "{}.{}".format(collector_type.__module__, collector_type.__qualname__)
@@ -0,0 +1,121 @@
+from collections import namedtuple
+
+from shminspector.api.reactor import ReactorCommand, UserInput
+
+_BREW_VERBS = ("install", "upgrade", "uninstall")
+
+CoalescedCommand = namedtuple(typename="CoalescedCommand", field_names=["command", "sources"])
+"""
+A command to execute on behalf of one or more components. 'sources' is a tuple of (comp_id, ReactorCommand) pairs, one
+for every original command the coalesced command replaces.
+"""
+
+
+def coalesce(submissions):
+    """
+    Merges the reactor commands of several components into a shorter list of commands:
+
+    * duplicate commands are executed once
+    * compatible 'brew [cask] install|upgrade|uninstall' commands are merged into a single invocation, so that Homebrew's
+      startup and auto-update costs are only paid once
+
+    The relative order of every component's own commands is preserved - a command is never moved before a command that
+    preceded it in the same component.
+
+    :param submissions: a list of (comp_id, [ReactorCommand]) pairs
+    :return: a list of CoalescedCommand
+    """
+    entries = []
+    last_index_of = {}
+
+    for comp_id, commands in submissions:
+        for command in commands:
+            lower_bound = last_index_of.get(comp_id, -1)
+            index = _find_duplicate(entries, command, lower_bound)
+            if index is None:
+                index = _find_mergeable(entries, command, lower_bound)
+
+            if index is None:
+                entries.append(_Entry(command))
+                index = len(entries) - 1
+
+            entries[index].add(comp_id, command)
+            last_index_of[comp_id] = index
+
+    return list(entry.coalesced() for entry in entries)
+
+
+class _Entry:
+    def __init__(self, command: ReactorCommand):
+        self.key = _merge_key_of(command)
+        self.text = str(command)
+        self.sources = []
+
+    def add(self, comp_id, command):
+        self.sources.append((comp_id, command))
+
+    def coalesced(self):
+        if len(self.sources) == 1:
+            return CoalescedCommand(command=self.sources[0][1], sources=tuple(self.sources))
+
+        commands = list(command for _, command in self.sources)
+        silent = all(getattr(command, "silent", False) for command in commands)
+        serial = any(getattr(command, "serial", False) for command in commands)
+        if self.key is None and (getattr(commands[0], "silent", False), getattr(commands[0], "serial", False)) == \
+                (silent, serial):
+            return CoalescedCommand(command=commands[0], sources=tuple(self.sources))
+
+        cmd = list(commands[0].cmd)
+        if self.key is not None:
+            for command in commands[1:]:
+                for formula in _formulas_of(command):
+                    if formula not in cmd:
+                        cmd.append(formula)
+
+        return CoalescedCommand(command=ReactorCommand(cmd, silent=silent, serial=serial), sources=tuple(self.sources))
+
+
+def _find_duplicate(entries, command, lower_bound):
+    text = str(command)
+    for index in range(lower_bound + 1, len(entries)):
+        if entries[index].text == text:
+            return index
+
+    return None
+
+
+def _find_mergeable(entries, command, lower_bound):
+    key = _merge_key_of(command)
+    if key is None:
+        return None
+
+    for index in range(lower_bound + 1, len(entries)):
+        if entries[index].key == key:
+            return index
+
+    return None
+
+
+def _merge_key_of(command: ReactorCommand):
+    """
+    :return: the command prefix (e.g. ('brew', 'install')) for mergeable commands, otherwise None
+    """
+    if not isinstance(command, ReactorCommand):
+        return None
+
+    cmd = command.cmd
+    if len(cmd) < 3 or cmd[0] != "brew" or any(isinstance(value, UserInput) for value in cmd):
+        return None
+
+    prefix_length = 3 if cmd[1] == "cask" else 2
+    if cmd[prefix_length - 1] not in _BREW_VERBS or len(cmd) <= prefix_length:
+        return None
+
+    if any(value.startswith("-") for value in cmd[prefix_length:]):
+        return None
+
+    return tuple(cmd[:prefix_length])
+
+
+def _formulas_of(command: ReactorCommand):
+    return command.cmd[len(_merge_key_of(command)):]
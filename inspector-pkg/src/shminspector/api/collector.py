@@ -6,3 +6,28 @@ from shminspector.api.context import Context
 class Collector:
     @abstractmethod
     def collect(self, ctx: Context) -> object: pass
+
+    # noinspection PyUnusedLocal
+    def fingerprint(self, ctx: Context):
+        """
+        Optionally returns a value that identifies the state the collected data depends on. Collectors that return a
+        fingerprint are served from the persistent cache as long as it doesn't change. See shminspector.api.cache.
+        """
+        return None
+
+
+class AsyncCollector:
+    """
+    Asynchronous variant of Collector. The executor awaits collect on its event loop, so I/O bound implementations can
+    overlap with other components without occupying a worker thread.
+    """
+
+    @abstractmethod
+    async def collect(self, ctx: Context) -> object: pass
+
+    # noinspection PyUnusedLocal
+    def fingerprint(self, ctx: Context):
+        """
+        See Collector.fingerprint.
+        """
+        return None
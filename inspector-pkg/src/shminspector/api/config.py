@@ -5,6 +5,10 @@ _DEFAULT_CONFIG = {
         "minimum_cpu_count": 8,
         "minimum_total_ram_gb": 16,
     },
+    "timeouts": {
+        "default_sec": 300,
+        "components": {},
+    },
     "network": {
         "check_specs": [
             {
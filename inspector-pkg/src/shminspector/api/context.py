@@ -1,7 +1,10 @@
 import logging
+import threading
 from enum import Enum
 
+from shminspector.api.cache import CollectorCache
 from shminspector.api.config import load
+from shminspector.api.facts import FactStore
 from shminspector.api.registry import Registry
 from shminspector.api.tags import CURRENT_PLATFORM
 from shminspector.util.logger import ConsoleLogger, FileLogger, CompositeLogger
@@ -9,6 +12,9 @@ from shminspector.util.logger import ConsoleLogger, FileLogger, CompositeLogger
 _MODE_INTERACTIVE = "interactive"
 _MODE_BACKGROUND = "background"
 
+PLAN_FORMAT_TEXT = "text"
+PLAN_FORMAT_JSON = "json"
+
 
 class Mode(Enum):
     INTERACTIVE = 0
@@ -40,10 +46,21 @@ class Context:
                  debug=False,
                  experimental=False,
                  plan=False,
+                 plan_format=PLAN_FORMAT_TEXT,
                  dryrun=False,
                  log_file=None,
                  mode=Mode.INTERACTIVE,
-                 components=None):
+                 components=None,
+                 affected_by=None,
+                 only_closure=None,
+                 jobs=1,
+                 deadline=None,
+                 no_cache=False,
+                 command_jobs=1,
+                 daemon=False,
+                 fail_fast=False,
+                 trace_file=None,
+                 profile_dir=None):
         self.name = name
         self.mode = mode
         self.log_file_path = log_file
@@ -52,8 +69,10 @@ class Context:
         self.platform = CURRENT_PLATFORM
         self.config = load(config_file)
         self.components = components
-        self._set_flags(debug, dryrun, experimental, plan)
+        self._set_flags(debug, dryrun, experimental, plan, plan_format, jobs, deadline, no_cache, command_jobs, daemon,
+                        fail_fast, trace_file, profile_dir, affected_by, only_closure)
         self._user_inputs = {}
+        self._user_inputs_lock = threading.Lock()
 
         loggers = []
         log_level = logging.DEBUG if debug else logging.INFO
@@ -65,13 +84,27 @@ class Context:
             loggers.append(FileLogger(filename=self.log_file_path, level=logging.DEBUG))
 
         self.logger = CompositeLogger(loggers)
+        self.cache = CollectorCache(logger=self.logger) if not no_cache else None
+        self.facts = FactStore()
 
-    def _set_flags(self, debug, dryrun, experimental, plan):
+    def _set_flags(self, debug, dryrun, experimental, plan, plan_format, jobs, deadline, no_cache, command_jobs,
+                   daemon, fail_fast, trace_file, profile_dir, affected_by, only_closure):
         flags = Flags()
         flags.debug = debug
         flags.experimental = experimental
         flags.plan = plan
+        flags.plan_format = plan_format
         flags.dryrun = dryrun
+        flags.jobs = max(1, jobs)
+        flags.deadline = deadline
+        flags.no_cache = no_cache
+        flags.command_jobs = max(1, command_jobs)
+        flags.daemon = daemon
+        flags.fail_fast = fail_fast
+        flags.trace_file = trace_file
+        flags.profile_dir = profile_dir
+        flags.affected_by = affected_by
+        flags.only_closure = only_closure
 
         self.flags = flags
 
@@ -87,13 +120,15 @@ class Context:
 
         assert self.mode == Mode.INTERACTIVE, "Cannot ask for user input in non-interactive mode!"
 
-        existing_value = self._user_inputs.get(key, None)
-        if existing_value is not None:
-            return existing_value
-        else:
-            entered_value = input(prompt)
-            self._user_inputs[key] = entered_value
-            return entered_value
+        # components may react concurrently, so prompts must not interleave
+        with self._user_inputs_lock:
+            existing_value = self._user_inputs.get(key, None)
+            if existing_value is not None:
+                return existing_value
+            else:
+                entered_value = input(prompt)
+                self._user_inputs[key] = entered_value
+                return entered_value
 
     def __str__(self):
         return "Context(name={name}, mode={mode}, flags={flags}, log_file_path={log_file_path}, " \
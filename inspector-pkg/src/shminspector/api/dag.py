@@ -0,0 +1,192 @@
+from collections import OrderedDict, deque
+
+
+class DAG:
+    """
+    A minimal directed graph with the operations the execution graph needs. Nodes and edges are kept in insertion order,
+    so that traversal and topological ordering are deterministic.
+
+    Acyclicity is not enforced on insertion - use find_cycle() to check for it.
+    """
+
+    def __init__(self):
+        self._successors = OrderedDict()
+        self._predecessors = OrderedDict()
+
+    def add_node(self, node):
+        if node not in self._successors:
+            self._successors[node] = OrderedDict()
+            self._predecessors[node] = OrderedDict()
+
+    def add_edge(self, source, target):
+        self.add_node(source)
+        self.add_node(target)
+        self._successors[source][target] = None
+        self._predecessors[target][source] = None
+
+    def has_node(self, node):
+        return node in self._successors
+
+    def has_edge(self, source, target):
+        return source in self._successors and target in self._successors[source]
+
+    def nodes(self):
+        return list(self._successors)
+
+    def successors(self, node):
+        return list(self._successors[node])
+
+    def predecessors(self, node):
+        return list(self._predecessors[node])
+
+    def __len__(self):
+        return len(self._successors)
+
+    def __contains__(self, node):
+        return self.has_node(node)
+
+    def topological_order(self):
+        """
+        :return: a list of all nodes, where every node comes after all of its predecessors
+        :raise ValueError: if the graph contains a cycle
+        """
+        in_degrees = dict((node, len(predecessors)) for node, predecessors in self._predecessors.items())
+        ready = deque(node for node, in_degree in in_degrees.items() if in_degree == 0)
+        order = []
+
+        while len(ready) > 0:
+            node = ready.popleft()
+            order.append(node)
+            for successor in self._successors[node]:
+                in_degrees[successor] -= 1
+                if in_degrees[successor] == 0:
+                    ready.append(successor)
+
+        if len(order) != len(self._successors):
+            raise ValueError("Graph contains a cycle: {}".format(" -> ".join(str(node) for node in self.find_cycle())))
+
+        return order
+
+    def find_cycle(self):
+        """
+        :return: the nodes of a cycle, starting and ending with the same node, or None if the graph is acyclic
+        """
+        done = set()
+        for root in self._successors:
+            if root in done:
+                continue
+
+            path = [root]
+            on_path = {root}
+            pending = [iter(self._successors[root])]
+            while len(pending) > 0:
+                node = next(pending[-1], None)
+                if node is None:
+                    finished = path.pop()
+                    on_path.discard(finished)
+                    done.add(finished)
+                    pending.pop()
+                    continue
+
+                if node in on_path:
+                    return path[path.index(node):] + [node]
+
+                if node not in done:
+                    path.append(node)
+                    on_path.add(node)
+                    pending.append(iter(self._successors[node]))
+
+        return None
+
+    def to_networkx(self):
+        """
+        Converts the graph to a networkx.DiGraph, e.g. for exporting or drawing it. Requires networkx to be installed
+        (available as the 'graph' extra).
+        """
+        try:
+            import networkx
+        except ImportError:
+            raise ImportError("networkx is required for graph conversion. Install it with "
+                              "'pip3 install envinspector-sha1n[graph]'")
+
+        graph = networkx.DiGraph()
+        graph.add_nodes_from(self._successors)
+        for source, targets in self._successors.items():
+            graph.add_edges_from((source, target) for target in targets)
+
+        return graph
+
+
+class ReachabilityIndex:
+    """
+    A precomputed transitive closure of an acyclic DAG, both forward (descendants) and reverse (ancestors). Every node is
+    assigned a bit by its topological position, and the closure of every node is kept as an integer bitset, so that the
+    closure of any set of nodes is a handful of bitwise ORs.
+
+    The index is a snapshot - it does not reflect changes made to the graph after it was built.
+    """
+
+    def __init__(self, dag: DAG):
+        self._nodes = dag.topological_order()
+        self._bits = dict((node, 1 << index) for index, node in enumerate(self._nodes))
+        self._ancestors = {}
+        self._descendants = {}
+
+        for node in self._nodes:
+            ancestors = 0
+            for predecessor in dag.predecessors(node):
+                ancestors |= self._ancestors[predecessor] | self._bits[predecessor]
+            self._ancestors[node] = ancestors
+
+        for node in reversed(self._nodes):
+            descendants = 0
+            for successor in dag.successors(node):
+                descendants |= self._descendants[successor] | self._bits[successor]
+            self._descendants[node] = descendants
+
+    def ancestors_of(self, *nodes):
+        """
+        :return: the nodes that any of the specified nodes transitively depend on, in topological order
+        """
+        return self._nodes_of(self._union_of(self._ancestors, nodes))
+
+    def descendants_of(self, *nodes):
+        """
+        :return: the nodes that transitively depend on any of the specified nodes, in topological order
+        """
+        return self._nodes_of(self._union_of(self._descendants, nodes))
+
+    def with_ancestors(self, *nodes):
+        return self._nodes_of(self._union_of(self._ancestors, nodes) | self._bits_of(nodes))
+
+    def with_descendants(self, *nodes):
+        return self._nodes_of(self._union_of(self._descendants, nodes) | self._bits_of(nodes))
+
+    def reaches(self, source, target):
+        """
+        :return: True if there is a path from 'source' to 'target'
+        """
+        return self._descendants[source] & self._bits[target] != 0
+
+    def _union_of(self, closures, nodes):
+        union = 0
+        for node in nodes:
+            union |= closures[node]
+
+        return union
+
+    def _bits_of(self, nodes):
+        bits = 0
+        for node in nodes:
+            bits |= self._bits[node]
+
+        return bits
+
+    def _nodes_of(self, bits):
+        nodes = []
+        while bits != 0:
+            lowest_bit = bits & -bits
+            nodes.append(self._nodes[lowest_bit.bit_length() - 1])
+            bits ^= lowest_bit
+
+        return nodes
@@ -0,0 +1,21 @@
+from collections import namedtuple
+
+# Execution events published by the Executor to its listeners. Every event carries the time it was published at
+# (seconds since the epoch); '*Finished' events also carry the elapsed time of the corresponding phase in seconds.
+
+CollectStarted = namedtuple(typename="CollectStarted", field_names=["comp_id", "time"])
+
+CollectFinished = namedtuple(typename="CollectFinished", field_names=["comp_id", "time", "elapsed", "data", "cached"])
+
+ValidationFinished = namedtuple(typename="ValidationFinished", field_names=["comp_id", "time", "elapsed", "result"])
+
+ReactionFinished = namedtuple(typename="ReactionFinished", field_names=["comp_id", "time", "elapsed", "commands"])
+
+CommandStarted = namedtuple(typename="CommandStarted", field_names=["comp_id", "time", "command"])
+
+CommandFinished = namedtuple(typename="CommandFinished",
+                             field_names=["comp_id", "time", "elapsed", "command", "error"])
+
+ComponentFinished = namedtuple(typename="ComponentFinished", field_names=["comp_id", "time", "elapsed", "result"])
+
+RunFinished = namedtuple(typename="RunFinished", field_names=["time", "elapsed", "summary"])
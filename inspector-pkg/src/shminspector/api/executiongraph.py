@@ -0,0 +1,155 @@
+from shminspector.api.context import Context, Mode
+from shminspector.api.dag import DAG, ReachabilityIndex
+from shminspector.util import trace
+
+
+def effective_handlers_of(ctx):
+    """
+    :return: the registry view of the handlers that are effective in the specified context. Views are cached by the
+    registry, so filtering happens once per platform, 'experimental' flag and mode.
+    """
+    return ctx.registry.effective_view(ctx.platform, ctx.flags.experimental, ctx.mode == Mode.INTERACTIVE, ctx.logger)
+
+
+class ExecutionGraph:
+    def __init__(self, ctx: Context):
+        self.graph = DAG()
+        self.ctx = ctx
+        self._expanded = set()
+        self._reachability = None
+
+        ctx.logger.info("Preparing execution plan...")
+
+        with trace.span("execution graph", "executor", lane="executor"):
+            comp_ids = self._effective_component_ids()
+            for comp_id in comp_ids:
+                self._add_component(comp_id)
+
+        if ctx.flags.debug:
+            self.ctx.logger.debug("Resolved execution order: {}".format(list(self.topologically_ordered_comp_ids())))
+
+    def _effective_component_ids(self):
+        if self.ctx.components is None:
+            all_components = self.ctx.registry.component_ids()
+            self.ctx.logger.debug("No components have been explicitly specified. Will execute all: {}"
+                                  .format(", ".join(all_components)))
+            return all_components
+        else:
+            requested = self.ctx.components
+            self.ctx.logger.info("Requested components: {}".format(", ".join(requested)))
+            return requested
+
+    def _add_component(self, root_comp_id):
+        """
+        Adds the component along with its transitive prerequisites using an iterative depth first traversal. Every
+        component is expanded once, and cycles are detected on the way by looking for prerequisites that are still on the
+        traversal path.
+        """
+        if root_comp_id in self._expanded:
+            return
+
+        self.graph.add_node(root_comp_id)
+        path = [root_comp_id]
+        on_path = {root_comp_id}
+        pending = [iter(self._prerequisites_of_component(root_comp_id))]
+
+        while len(pending) > 0:
+            dep = next(pending[-1], None)
+            if dep is None:
+                expanded = path.pop()
+                on_path.discard(expanded)
+                self._expanded.add(expanded)
+                pending.pop()
+                continue
+
+            comp_id = path[-1]
+            if dep in on_path:
+                cycle = path[path.index(dep):] + [dep]
+                raise CyclicDependencyError("Cyclic dependency: {}".format(" -> ".join(cycle)), cycle)
+
+            if not self.graph.has_edge(dep, comp_id):
+                self.ctx.logger.progress("Adding dependency: {} -> {}", comp_id, dep)
+                self.graph.add_edge(dep, comp_id)
+
+            if dep not in self._expanded:
+                path.append(dep)
+                on_path.add(dep)
+                pending.append(iter(self._prerequisites_of_component(dep)))
+
+    def _prerequisites_of_component(self, comp_id):
+        if comp_id not in self.ctx.registry.component_ids():
+            raise MissingDependencyError("No component with id '{}' is registered! "
+                                         "You might need to add '--experimental' or '-e'".format(comp_id))
+
+        return self.ctx.registry.prerequisites_of(comp_id)
+
+    def topologically_ordered_comp_ids(self):
+        return self.graph.topological_order()
+
+    def prerequisites_of(self, comp_id):
+        return set(self.graph.predecessors(comp_id))
+
+    def reachability(self):
+        """
+        :return: a transitive closure index of the graph, which is built on first use
+        """
+        if self._reachability is None:
+            with trace.span("reachability index", "executor", lane="executor"):
+                self._reachability = ReachabilityIndex(self.graph)
+
+        return self._reachability
+
+    def with_dependents(self, comp_ids):
+        """
+        :return: the specified component ids along with the ids of all the components that transitively depend on them
+        """
+        return set(self.reachability().with_descendants(*self._in_graph(comp_ids)))
+
+    def with_prerequisites(self, comp_ids):
+        """
+        :return: the specified component ids along with the ids of all their transitive prerequisites
+        """
+        return set(self.reachability().with_ancestors(*self._in_graph(comp_ids)))
+
+    def selected_comp_ids(self):
+        """
+        Resolves the components selected by ctx.flags.affected_by (the specified components along with their transitive
+        dependents) and ctx.flags.only_closure (the specified components along with their transitive prerequisites and
+        dependents).
+
+        :return: the union of the selected component ids, or None if no selection was specified
+        """
+        affected_by = self.ctx.flags.affected_by
+        only_closure = self.ctx.flags.only_closure
+        if affected_by is None and only_closure is None:
+            return None
+
+        for comp_id in (affected_by or []) + (only_closure or []):
+            if not self.graph.has_node(comp_id):
+                raise MissingDependencyError("Component '{}' is not part of the execution graph! It is either not "
+                                             "registered or not one of the requested components".format(comp_id))
+
+        selected = set()
+        if affected_by is not None:
+            selected |= self.with_dependents(affected_by)
+        if only_closure is not None:
+            selected |= self.with_prerequisites(only_closure) | self.with_dependents(only_closure)
+
+        self.ctx.logger.info("Selected components: {}".format(
+            ", ".join(comp_id for comp_id in self.topologically_ordered_comp_ids() if comp_id in selected)
+        ))
+
+        return selected
+
+    def _in_graph(self, comp_ids):
+        return list(comp_id for comp_id in comp_ids if self.graph.has_node(comp_id))
+
+
+class CyclicDependencyError(BaseException):
+    def __init__(self, message, cycle=()):
+        super().__init__(message)
+        self.cycle = list(cycle)
+
+
+class MissingDependencyError(BaseException):
+    pass
@@ -1,16 +1,46 @@
+import asyncio
+import functools
+import queue
 import subprocess
+import threading
 from collections import namedtuple
-
-from networkx import DiGraph, is_directed_acyclic_graph, topological_sort
-
-from shminspector.api.context import Context, Mode
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+
+from shminspector.api.cache import fingerprint_of
+from shminspector.api.coalesce import coalesce
+from shminspector.api.context import Context
+from shminspector.api.events import CollectStarted, CollectFinished, ValidationFinished, ReactionFinished, \
+    CommandStarted, CommandFinished, ComponentFinished, RunFinished
+# ExecutionGraph, its errors and ExecPlanExecutor are also available from here, as they used to be defined here
+from shminspector.api.executiongraph import ExecutionGraph, CyclicDependencyError, MissingDependencyError, \
+    effective_handlers_of
+from shminspector.api.plan import ExecPlanExecutor
 from shminspector.api.reactor import ReactorCommand
-from shminspector.api.tags import is_experimental, stringify, is_interactive, is_compatible_with_current_platform, \
-    prerequisites_of
+from shminspector.api.tags import timeout_of
 from shminspector.api.validator import Status
-from shminspector.util.cmd import execute_with_streamed_output
+from shminspector.util import trace
+from shminspector.util.cmd import execute_with_streamed_output, ProcessScope, process_scope
+from shminspector.util.profile import profiled, profiled_async
+
+ComponentResult = namedtuple(typename="ComponentResult", field_names=["comp_id", "status", "command_count", "reason"])
+ComponentResult.__new__.__defaults__ = (None,)
+
+# statuses of components that leave their dependents nothing to build on, unless the reactor attempted to fix them
+_FAILED_STATUSES = (Status.NOT_FOUND, Status.ERROR, Status.TIMEOUT, Status.SKIPPED)
+
+
+class ExecutionSummary(namedtuple(typename="ExecutionSummary", field_names=["problem_count", "total_count"])):
+    """
+    Execution counters plus the per-component results, ordered by the topological execution order regardless of the
+    order in which components actually finished.
+    """
 
-ExecutionSummary = namedtuple(typename="ExecutionSummary", field_names=["problem_count", "total_count"])
+    def __new__(cls, problem_count, total_count, results=()):
+        summary = super().__new__(cls, problem_count, total_count)
+        summary.results = tuple(results)
+
+        return summary
 
 
 def _command_handler_for(ctx):
@@ -21,23 +51,41 @@ def _command_handler_for(ctx):
 
 
 def _execute_command(command: ReactorCommand, ctx: Context):
+    """
+    Command handlers return None when the command succeeded or an error describing the failure.
+    """
     logger = ctx.logger
-    logger.command_info(command)
+    prefix = getattr(_command_output, "prefix", "")
+    logger.command_info("{}{}".format(prefix, command))
 
     try:
         for line in execute_with_streamed_output(command.resolve(ctx)):
             if not command.silent:
-                ctx.logger.command_output(line)
+                ctx.logger.command_output("{}{}".format(prefix, line))
 
-        logger.progress("Command '{}' executed successfully".format(command))
+        logger.progress("Command '{}' executed successfully", command)
+        return None
     except subprocess.CalledProcessError as err:
         logger.debug(err)
         if not command.silent:
             logger.failure("Command '{}' returned code {}".format(command, err.returncode))
+        return err
     except FileNotFoundError as err:
         logger.debug(err)
         if not command.silent:
             logger.failure("Failed to execute command '{}' - {}".format(command, err))
+        return err
+
+
+_command_output = threading.local()
+
+
+def _with_output_prefix(prefix, handle_command, *args):
+    _command_output.prefix = prefix
+    try:
+        return handle_command(*args)
+    finally:
+        _command_output.prefix = ""
 
 
 def _log_command(command: ReactorCommand, ctx: Context):
@@ -47,160 +95,736 @@ def _log_command(command: ReactorCommand, ctx: Context):
 _DEFAULT_CMD_HANDLER_PROVIDER = _command_handler_for
 
 
-class ExecPlanExecutor:
-    def execute(self, ctx: Context):
-        index = 0
+class Executor:
+    """
+    Executes components as a pipeline on a single event loop. Every component flows through two stages:
 
-        for comp_id in _execution_order_comp_ids(ctx):
-            collector = _handler_or_none(ctx.registry.find_collector(comp_id), ctx)
+    * inspection - collect, validate and compute reactor commands. Up to ctx.flags.jobs components are inspected
+      concurrently.
+    * command execution - reactor commands run on a dedicated serial lane.
 
-            if collector is not None:
-                index += 1
-                ctx.logger.info("{} --> {}".format(index, stringify(collector)))
-                validator = _handler_or_none(ctx.registry.find_validator(comp_id), ctx)
-                if validator is not None:
-                    index += 1
-                    ctx.logger.info("{}\t --> {}".format(index, stringify(validator)))
+    A component enters inspection as soon as all of its prerequisites left both stages, so unrelated components keep
+    being inspected while another component's reactor commands (e.g. a long 'brew install') are running.
 
-                    reactors = ctx.registry.find_reactors(comp_id)
-                    if len(reactors) == 0:
-                        ctx.logger.debug("No reactors registered for {}".format(comp_id))
+    The inspection stage of every component is bounded by its time budget (see _time_budget_of) and the whole run is
+    bounded by ctx.flags.deadline. A component that runs out of time has its processes killed and is reported with
+    Status.TIMEOUT.
 
-                    effective_reactors = (reactor for reactor in reactors if _handler_or_none(reactor, ctx) is not None)
-                    for reactor in effective_reactors:
-                        index += 1
-                        ctx.logger.info("{}\t\t --> {}".format(index, stringify(reactor)))
-                else:
-                    ctx.logger.debug("No validator registered for {}".format(comp_id))
+    Components implementing the asynchronous protocol (e.g. AsyncCollector) are awaited directly, while synchronous ones
+    are bridged through worker threads.
 
+    Progress is published as typed events (see shminspector.api.events) to the specified listeners, or through the
+    stream iterator. Listeners are always called on the executor's event loop thread, one event at a time.
+    """
 
-class Executor:
+    def __init__(self, listeners=()):
+        self._listeners = tuple(listeners)
 
     def execute(self, ctx: Context, get_handler=_DEFAULT_CMD_HANDLER_PROVIDER):
-        return self._exec(get_handler(ctx), ctx)
-
-    def _exec(self, handle_command, ctx: Context):
-        total = 0
-        problems = 0
-        for comp_id in _execution_order_comp_ids(ctx):
-            collector = _handler_or_none(ctx.registry.find_collector(comp_id), ctx)
-            if collector is not None:
-                data = collector.collect(ctx)
-
-                result = self._validate(comp_id, data, ctx)
-                total += 1
-                if result is not None:
-                    if result.status != Status.OK:
-                        problems += 1
-                    self._react(comp_id, result, handle_command, ctx)
-                else:
-                    ctx.logger.warn("{} validator produced no result!".format(comp_id))
+        graph = ExecutionGraph(ctx)
+        return self._exec(get_handler(ctx), ctx, graph, selected=graph.selected_comp_ids())
+
+    def stream(self, ctx: Context, get_handler=_DEFAULT_CMD_HANDLER_PROVIDER):
+        """
+        Executes on a background thread and yields execution events as soon as they are published. The last event is
+        always RunFinished. Errors raised by the execution are re-raised by the iterator.
+        """
+        events = queue.Queue()
+        end_of_stream = object()
+        errors = []
+
+        def execute():
+            try:
+                Executor(listeners=self._listeners + (events.put,)).execute(ctx, get_handler)
+            except BaseException as err:
+                errors.append(err)
+            finally:
+                events.put(end_of_stream)
+
+        thread = threading.Thread(target=execute, name="executor-stream", daemon=True)
+        thread.start()
+
+        event = events.get()
+        while event is not end_of_stream:
+            yield event
+            event = events.get()
+
+        thread.join()
+        if len(errors) > 0:
+            raise errors[0]
+
+    def verify(self, ctx: Context, comp_ids, graph=None):
+        """
+        Re-collects (bypassing the cache) and re-validates the specified components and their transitive dependents,
+        without reacting. Used to verify the effect of reactor commands executed by a previous run.
+        """
+        if graph is None:
+            graph = ExecutionGraph(ctx)
+
+        return self._exec(None, ctx, graph, selected=graph.with_dependents(comp_ids), verify_only=True)
+
+    def _exec(self, handle_command, ctx: Context, graph, selected=None, verify_only=False):
+        start_time = time()
+        ctx.facts.reset()
+        ordered_comp_ids = list(
+            comp_id for comp_id in graph.topologically_ordered_comp_ids() if selected is None or comp_id in selected
+        )
+
+        loop = asyncio.new_event_loop()
+        inspection_pool = ThreadPoolExecutor(max_workers=ctx.flags.jobs, thread_name_prefix="inspection")
+        command_pool = ThreadPoolExecutor(max_workers=ctx.flags.command_jobs, thread_name_prefix="commands")
+        loop.set_default_executor(inspection_pool)
+        durations = {}
+        try:
+            results = loop.run_until_complete(
+                self._exec_all(graph, ordered_comp_ids, inspection_pool,
+                               _CommandLane(handle_command, command_pool, self._emit), ctx, verify_only, durations)
+            )
+        finally:
+            loop.close()
+            # handlers of timed out components cannot be interrupted, so the run does not wait for them to return
+            inspection_pool.shutdown(wait=False)
+            command_pool.shutdown(wait=False)
+
+        ordered_results = [results[comp_id] for comp_id in ordered_comp_ids if results[comp_id] is not None]
+        problems = sum(1 for result in ordered_results if result.status not in (None, Status.OK))
+
+        # durations of verification and dry runs do not represent real runs, so they are not used for plan estimates
+        if ctx.cache is not None and not verify_only and not ctx.flags.dryrun:
+            ctx.cache.put_durations(durations)
+
+        ctx.logger.debug("Facts: {} computed, {} reused", ctx.facts.misses, ctx.facts.hits)
+
+        summary = ExecutionSummary(total_count=len(ordered_results), problem_count=problems, results=ordered_results)
+        _log_skipped(summary, ctx)
+        self._emit(ctx, RunFinished(time=time(), elapsed=time() - start_time, summary=summary))
+
+        return summary
+
+    async def _exec_all(self, graph, ordered_comp_ids, inspection_pool, command_lane, ctx: Context, verify_only,
+                        durations):
+        loop = asyncio.get_event_loop()
+        deadline = _Deadline(loop, ctx.flags.deadline)
+        inspection_slots = asyncio.Semaphore(ctx.flags.jobs)
+        command_lane.open(ctx)
+        tasks = {}
+        busy_slots = []
+
+        async def release_when_idle(scope):
+            await scope.wait_for_calls()
+            inspection_slots.release()
+
+        async def exec_when_ready(comp_id, prerequisite_tasks):
+            if len(prerequisite_tasks) > 0:
+                await asyncio.wait(prerequisite_tasks.values())
+
+            start_time = time()
+            if ctx.flags.fail_fast:
+                reason = _skip_reason_of(prerequisite_tasks)
+                if reason is not None and comp_id in ctx.registry.component_ids():
+                    ctx.logger.warn("{} - skipped, because {}".format(comp_id, reason))
+                    result = ComponentResult(comp_id=comp_id, status=Status.SKIPPED, command_count=0, reason=reason)
+                    self._emit(ctx, ComponentFinished(comp_id=comp_id, time=time(), elapsed=0, result=result))
+                    return result
+
+            scope = _ComponentScope(comp_id, inspection_pool)
+            commands = []
+            inspection_elapsed = None
+            time_budget = deadline.remaining()
+            try:
+                # a slot stands for a worker, which stays busy until the handlers of a timed out component return, so
+                # the time budget of a component only starts once it holds one
+                await asyncio.wait_for(inspection_slots.acquire(), timeout=time_budget)
+                inspection_start_time = time()
+                try:
+                    time_budget = deadline.bound(_time_budget_of(comp_id, ctx))
+                    result, commands = await asyncio.wait_for(self._inspect(comp_id, ctx, scope, verify_only),
+                                                              timeout=time_budget)
+                finally:
+                    inspection_elapsed = time() - inspection_start_time
+                    if scope.idle():
+                        inspection_slots.release()
+                    else:
+                        busy_slots.append(loop.create_task(release_when_idle(scope)))
+
+                if len(commands) > 0:
+                    time_budget = deadline.remaining()
+                    await asyncio.wait_for(command_lane.execute(comp_id, commands, ctx, scope), timeout=time_budget)
+            except asyncio.TimeoutError:
+                scope.kill_all()
+                ctx.logger.error("{} timed out after {:.1f} seconds!".format(comp_id, time_budget))
+                result = ComponentResult(comp_id=comp_id, status=Status.TIMEOUT, command_count=len(commands),
+                                         reason="timed out after {:.1f} seconds".format(time_budget))
+
+            if result is not None:
+                # plan estimates are based on the time a component takes once it holds a worker, without the time it
+                # waited for one or for its commands to be executed along with the commands of other components
+                if inspection_elapsed is not None:
+                    durations[comp_id] = inspection_elapsed
+                elapsed = time() - start_time
+                self._emit(ctx, ComponentFinished(comp_id=comp_id, time=time(), elapsed=elapsed, result=result))
+
+            return result
+
+        for comp_id in ordered_comp_ids:
+            # prerequisites that are not part of this run are considered done
+            prerequisite_tasks = dict(
+                (prerequisite, tasks[prerequisite]) for prerequisite in graph.prerequisites_of(comp_id)
+                if prerequisite in tasks
+            )
+            tasks[comp_id] = loop.create_task(exec_when_ready(comp_id, prerequisite_tasks))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            await command_lane.close()
+            for busy_slot in busy_slots:
+                busy_slot.cancel()
+            await asyncio.gather(*busy_slots, return_exceptions=True)
+
+        return dict((comp_id, task.result()) for comp_id, task in tasks.items())
+
+    async def _inspect(self, comp_id, ctx: Context, scope, verify_only=False):
+        collector = effective_handlers_of(ctx).find_collector(comp_id)
+        if collector is None:
+            return None, []
+
+        data = await self._collect(comp_id, collector, ctx, scope, use_cached=not verify_only)
+
+        result = await self._validate(comp_id, data, ctx, scope)
+        if result is not None:
+            commands = await self._react(comp_id, result, ctx, scope) if not verify_only else []
+            return ComponentResult(comp_id=comp_id, status=result.status, command_count=len(commands)), commands
+        else:
+            ctx.logger.warn("{} validator produced no result!".format(comp_id))
+            return ComponentResult(comp_id=comp_id, status=None, command_count=0), []
+
+    async def _collect(self, comp_id, collector, ctx, scope, use_cached=True):
+        start_time = time()
+        self._emit(ctx, CollectStarted(comp_id=comp_id, time=start_time))
+
+        data, cached = await self._collect_or_load(comp_id, collector, ctx, scope, use_cached)
+
+        self._emit(ctx, CollectFinished(comp_id=comp_id, time=time(), elapsed=time() - start_time, data=data,
+                                        cached=cached))
+        return data
+
+    async def _collect_or_load(self, comp_id, collector, ctx, scope, use_cached):
+        fingerprint = None
+        if ctx.cache is not None:
+            fingerprint = await _call(fingerprint_of, collector, ctx, scope=scope)
+            if fingerprint is not None and use_cached:
+                hit, data = ctx.cache.get(comp_id, collector, fingerprint)
+                if hit:
+                    ctx.logger.debug("{} - serving cached data", comp_id)
+                    return data, True
 
-        return ExecutionSummary(total_count=total, problem_count=problems)
+        data = await _call(collector.collect, ctx, scope=scope, profile_as="{}.collect".format(comp_id))
 
-    def _validate(self, comp_id, data, ctx):
-        validator = _handler_or_none(ctx.registry.find_validator(comp_id), ctx)
+        if fingerprint is not None:
+            ctx.cache.put(comp_id, collector, fingerprint, data)
+
+        return data, False
+
+    def _emit(self, ctx, event):
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as err:
+                ctx.logger.warn("Execution event listener failed - {}".format(err))
+
+        tracer = trace.active_tracer()
+        if tracer is not None:
+            _trace_event(tracer, event)
+
+    async def _validate(self, comp_id, data, ctx, scope):
+        validator = effective_handlers_of(ctx).find_validator(comp_id)
         if validator is not None:
-            return validator.validate(data, ctx)
+            start_time = time()
+            result = await _call(validator.validate, data, ctx, scope=scope, profile_as="{}.validate".format(comp_id))
+            self._emit(ctx, ValidationFinished(comp_id=comp_id, time=time(), elapsed=time() - start_time,
+                                               result=result))
+            return result
         else:
             ctx.logger.warn("No validator is registered for {}".format(comp_id))
             return None
 
-    def _react(self, comp_id, validation_result, handle_command, ctx):
-        reactors = ctx.registry.find_reactors(comp_id)
-
-        if len(reactors) == 0:
-            ctx.logger.debug("No reactors registered for {}".format(comp_id))
+    async def _react(self, comp_id, validation_result, ctx, scope):
+        if len(ctx.registry.find_reactors(comp_id)) == 0:
+            ctx.logger.debug("No reactors registered for {}", comp_id)
 
-        effective_reactors = list(
-            reactor for reactor in reactors if _handler_or_none(reactor, ctx) is not None
-        )
+        effective_reactors = effective_handlers_of(ctx).find_reactors(comp_id)
 
+        start_time = time()
+        commands = []
         for reactor in effective_reactors:
-            for command in reactor.react(validation_result, ctx):
-                handle_command(command, ctx)
+            commands += await _call(reactor.react, validation_result, ctx, scope=scope,
+                                    profile_as="{}.react".format(comp_id))
+
+        self._emit(ctx, ReactionFinished(comp_id=comp_id, time=time(), elapsed=time() - start_time, commands=commands))
+
+        return commands
+
+
+class _CommandLane:
+    """
+    Executes reactor commands on dedicated threads, so running commands never occupy an inspection worker.
+
+    Commands are executed in batches. A batch holds the commands of all the components that were submitted while no
+    command slot was available. Each batch is coalesced first (see shminspector.api.coalesce), which drops duplicates
+    and merges compatible package manager invocations. If a merged command fails, its original commands are retried one
+    by one, so that the failure is attributed to the right component.
+
+    Up to 'command_jobs' commands run concurrently, while the commands of each component still run in order. Serial
+    commands (see ReactorCommand.serial) run only when no other command is running.
+    """
+
+    def __init__(self, handle_command, pool, emit):
+        self._handle_command = handle_command
+        self._pool = pool
+        self._emit = emit
+        self._pending = []
+        self._running = {}
+        self._batches = set()
+        self._slots = None
+        self._wakeup = None
+        self._worker = None
+
+    def open(self, ctx: Context):
+        self._slots = _CommandSlots(ctx.flags.command_jobs)
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.get_event_loop().create_task(self._run(ctx))
+
+    async def close(self):
+        tasks = [self._worker] + list(self._batches) + list(self._running.values())
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def execute(self, comp_id, commands, ctx: Context, scope):
+        future = asyncio.get_event_loop().create_future()
+        self._pending.append(_Submission(comp_id, commands, scope, future))
+        self._wakeup.set()
+
+        await future
+
+    async def _run(self, ctx):
+        while True:
+            await self._wakeup.wait()
+            # let commands pile up while all slots are busy, and give components that finish their inspection at the
+            # same time a chance to join the batch
+            await self._slots.wait_for_free_slot()
+            await asyncio.sleep(0)
+            self._wakeup.clear()
+
+            batch = list(submission for submission in self._pending if not submission.future.done())
+            self._pending = []
+            if len(batch) > 0:
+                started = asyncio.Event()
+                task = asyncio.get_event_loop().create_task(self._execute_batch(batch, ctx, started))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+                task.add_done_callback(lambda _: started.set())
+                # the batch only occupies a slot once its first command starts, so wait for that before forming the
+                # next batch, or commands submitted meanwhile would find a free slot and miss being coalesced
+                await started.wait()
+
+    async def _execute_batch(self, batch, ctx, started):
+        try:
+            await self._execute_coalesced(batch, ctx, started)
+        except BaseException as err:
+            for submission in batch:
+                if not submission.future.done():
+                    submission.future.set_exception(err)
+            if isinstance(err, asyncio.CancelledError):
+                raise
+        else:
+            for submission in batch:
+                if not submission.future.done():
+                    submission.future.set_result(None)
+
+    async def _execute_coalesced(self, batch, ctx, started):
+        scopes = dict((submission.comp_id, submission.scope) for submission in batch)
+        coalesced_commands = coalesce(list((submission.comp_id, submission.commands) for submission in batch))
+
+        tasks = []
+        last_task_of = {}
+        succeeded = set()
+        for coalesced in coalesced_commands:
+            comp_ids = _unique(comp_id for comp_id, _ in coalesced.sources)
+            preceding_tasks = list(last_task_of[comp_id] for comp_id in comp_ids if comp_id in last_task_of)
+            task = asyncio.get_event_loop().create_task(
+                self._execute_when_ready(coalesced, comp_ids, preceding_tasks, scopes, succeeded, started, ctx))
+            for comp_id in comp_ids:
+                last_task_of[comp_id] = task
+            tasks.append(task)
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _execute_when_ready(self, coalesced, comp_ids, preceding_tasks, scopes, succeeded, started, ctx):
+        if len(preceding_tasks) > 0:
+            await asyncio.wait(preceding_tasks)
+
+        command_text = str(coalesced.command)
+        if command_text in succeeded:
+            ctx.logger.debug("Skipping '{}' - already executed successfully in this batch", command_text)
+            return
+
+        if len(coalesced.sources) > 1:
+            ctx.logger.debug("Coalesced {} command(s) of {} into '{}'", len(coalesced.sources), ", ".join(comp_ids),
+                             command_text)
+
+        error = await self._execute_once(comp_ids, coalesced.command, ctx, scopes[comp_ids[0]], started)
+        if error is None:
+            succeeded.add(command_text)
+            return
+
+        commands = _commands_of(coalesced.sources)
+        if len(commands) > 1:
+            ctx.logger.warn("Coalesced command '{}' failed. Retrying its commands one by one...", command_text)
+            for command, source_comp_ids in commands:
+                if await self._execute_once(source_comp_ids, command, ctx, scopes[source_comp_ids[0]], started) is None:
+                    succeeded.add(str(command))
+                else:
+                    _log_command_failure(source_comp_ids, command, ctx)
+        elif len(comp_ids) > 1:
+            # the command is the very same for all the components, so executing it again would not tell them apart
+            _log_command_failure(comp_ids, coalesced.command, ctx)
+
+    async def _execute_once(self, comp_ids, command, ctx, scope, started):
+        """
+        Executes the command, unless the very same command is already running on behalf of another batch, in which case
+        its outcome is shared.
+        """
+        command_text = str(command)
+        running = self._running.get(command_text)
+        if running is not None:
+            ctx.logger.debug("Waiting for '{}' - already running", command_text)
+            started.set()
+            return await asyncio.shield(running)
+
+        running = asyncio.get_event_loop().create_task(self._execute(comp_ids, command, ctx, scope, started))
+        self._running[command_text] = running
+        running.add_done_callback(lambda _: self._running.pop(command_text, None))
+
+        return await asyncio.shield(running)
+
+    async def _execute(self, comp_ids, command, ctx, scope, started):
+        handle_command = self._handle_command
+        if not asyncio.iscoroutinefunction(handle_command):
+            handle_command = functools.partial(_with_output_prefix, "[{}] ".format(",".join(comp_ids))
+                                               if ctx.flags.command_jobs > 1 else "", handle_command)
+
+        async with self._slots.acquire(exclusive=getattr(command, "serial", False)):
+            started.set()
+            start_time = time()
+            for comp_id in comp_ids:
+                self._emit(ctx, CommandStarted(comp_id=comp_id, time=start_time, command=command))
+
+            error = None
+            try:
+                error = await _call(handle_command, command, ctx, executor=self._pool, scope=scope)
+            except BaseException as err:
+                error = err
+                raise
+            finally:
+                # commands change the system, so facts collected so far might no longer hold
+                ctx.facts.invalidate()
+                for comp_id in comp_ids:
+                    self._emit(ctx, CommandFinished(comp_id=comp_id, time=time(), elapsed=time() - start_time,
+                                                    command=command, error=error))
+
+        return error
+
+
+class _CommandSlots:
+    """
+    Limits the number of concurrently running commands. An exclusive slot is granted only when no other command is
+    running, and blocks all other commands until released. Waiting exclusive requests take precedence.
+    """
+
+    def __init__(self, limit):
+        self._limit = limit
+        self._running = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+        self._condition = asyncio.Condition()
+
+    async def wait_for_free_slot(self):
+        async with self._condition:
+            await self._condition.wait_for(self._has_free_slot)
+
+    def acquire(self, exclusive):
+        return _AcquiredSlot(self, exclusive)
+
+    async def _acquire(self, exclusive):
+        async with self._condition:
+            if exclusive:
+                self._exclusive_waiting += 1
+                try:
+                    await self._condition.wait_for(lambda: self._running == 0)
+                finally:
+                    self._exclusive_waiting -= 1
+                self._exclusive = True
+            else:
+                await self._condition.wait_for(lambda: self._exclusive_waiting == 0 and self._has_free_slot())
+
+            self._running += 1
+
+    async def _release(self):
+        async with self._condition:
+            self._running -= 1
+            self._exclusive = False
+            self._condition.notify_all()
+
+    def _has_free_slot(self):
+        return not self._exclusive and self._running < self._limit
+
+
+class _AcquiredSlot:
+    def __init__(self, slots, exclusive):
+        self._slots = slots
+        self._exclusive = exclusive
+
+    async def __aenter__(self):
+        await self._slots._acquire(self._exclusive)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._slots._release()
+
+
+def _unique(values):
+    unique_values = []
+    for value in values:
+        if value not in unique_values:
+            unique_values.append(value)
+
+    return unique_values
+
+
+def _commands_of(sources):
+    """
+    :return: the distinct commands of the (comp_id, command) sources, each with the ids of the components it came from
+    """
+    comp_ids_by_command = {}
+    commands = []
+    for comp_id, command in sources:
+        comp_ids = comp_ids_by_command.get(str(command))
+        if comp_ids is None:
+            comp_ids = comp_ids_by_command[str(command)] = []
+            commands.append((command, comp_ids))
+        if comp_id not in comp_ids:
+            comp_ids.append(comp_id)
+
+    return commands
+
+
+def _log_command_failure(comp_ids, command, ctx):
+    for comp_id in comp_ids:
+        ctx.logger.failure("{} - command '{}' failed", comp_id, command)
+
+
+_Submission = namedtuple(typename="_Submission", field_names=["comp_id", "commands", "scope", "future"])
+
+
+class _ComponentScope(ProcessScope):
+    """
+    The processes and the synchronous handler calls of a component. A handler cannot be interrupted, so it keeps its
+    worker busy until it returns, even when its component has timed out already.
+    """
 
+    def __init__(self, comp_id, inspection_pool):
+        super().__init__(comp_id)
+        self._inspection_pool = inspection_pool
+        self._calls = []
+
+    def run(self, executor, fn):
+        call = (executor if executor is not None else self._inspection_pool).submit(fn)
+        self._calls.append(call)
 
-def _handler_or_none(handler, ctx):
-    if is_experimental(handler):
-        if not ctx.flags.experimental:
-            ctx.logger.debug("{} - filtered out, because 'experimental' flag is off!".format(stringify(handler)))
-            return None
+        return _awaitable(call)
+
+    def idle(self):
+        return all(call.done() for call in self._calls)
 
-    if is_interactive(handler):
-        if ctx.mode != Mode.INTERACTIVE:
-            ctx.logger.warn("{} - filtered out, because it requires interactive mode!".format(stringify(handler)))
-            return None
+    async def wait_for_calls(self):
+        running = list(_awaitable(call) for call in self._calls if not call.done())
+        if len(running) > 0:
+            await asyncio.wait(running)
 
-    if not is_compatible_with_current_platform(handler):
-        ctx.logger.debug("{} - filtered out, because it is not compatible with the current platform!"
-                         .format(stringify(handler)))
-        return None
 
-    return handler
+def _awaitable(call):
+    """
+    Like asyncio.wrap_future, except that a call that returns after the run is over (and its loop closed) is ignored,
+    rather than failing to report back to the loop.
+    """
+    loop = asyncio.get_event_loop()
+    future = loop.create_future()
+
+    def copy_outcome():
+        if future.cancelled():
+            return
+        elif call.cancelled():
+            future.cancel()
+        elif call.exception() is not None:
+            future.set_exception(call.exception())
+        else:
+            future.set_result(call.result())
 
+    # noinspection PyUnusedLocal
+    def on_call_done(done_call):
+        if not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(copy_outcome)
+            except RuntimeError:
+                pass  # the loop got closed in the meantime
 
-def _execution_order_comp_ids(ctx):
-    return ExecutionGraph(ctx).topologically_ordered_comp_ids()
+    # noinspection PyUnusedLocal
+    def on_future_done(done_future):
+        if future.cancelled():
+            call.cancel()
 
+    future.add_done_callback(on_future_done)
+    call.add_done_callback(on_call_done)
 
-class ExecutionGraph:
-    def __init__(self, ctx: Context):
-        self.graph = DiGraph()
-        self.ctx = ctx
+    return future
 
-        ctx.logger.info("Preparing execution plan...")
 
-        comp_ids = self._effective_component_ids()
-        for comp_id in comp_ids:
-            self._add_component(comp_id)
+class _Deadline:
+    def __init__(self, loop, seconds):
+        self._loop = loop
+        self._end_time = loop.time() + seconds if seconds is not None else None
 
-        if ctx.flags.debug:
-            self.ctx.logger.debug("Resolved execution order: {}".format(list(self.topologically_ordered_comp_ids())))
+    def remaining(self):
+        if self._end_time is None:
+            return None
 
-    def _add_deps(self, dependencies, comp_id):
-        for dep in dependencies:
-            self.graph.add_node(dep)
+        return max(0.0, self._end_time - self._loop.time())
 
-            if not self.graph.has_edge(dep, comp_id):
-                self.ctx.logger.progress("Adding dependency: {} -> {}".format(comp_id, dep))
-                self.graph.add_edge(dep, comp_id)
+    def bound(self, seconds):
+        remaining = self.remaining()
+        if remaining is None:
+            return seconds
+        elif seconds is None:
+            return remaining
+        else:
+            return min(seconds, remaining)
+
+
+def _trace_event(tracer, event):
+    """
+    Lays execution events out as spans on one lane per component.
+    """
+    if isinstance(event, CollectFinished):
+        tracer.complete("collect", "component", event.time - event.elapsed, event.time, lane=event.comp_id,
+                        args={"cached": event.cached})
+    elif isinstance(event, ValidationFinished):
+        status = event.result.status.name if event.result is not None else None
+        tracer.complete("validate", "component", event.time - event.elapsed, event.time, lane=event.comp_id,
+                        args={"status": status})
+    elif isinstance(event, ReactionFinished):
+        tracer.complete("react", "component", event.time - event.elapsed, event.time, lane=event.comp_id,
+                        args={"command_count": len(event.commands)})
+    elif isinstance(event, CommandFinished):
+        tracer.complete(str(event.command), "command", event.time - event.elapsed, event.time, lane=event.comp_id,
+                        args={"error": str(event.error) if event.error is not None else None})
+    elif isinstance(event, ComponentFinished):
+        status = event.result.status.name if event.result.status is not None else None
+        tracer.complete(event.comp_id, "component", event.time - event.elapsed, event.time, lane=event.comp_id,
+                        args={"status": status, "reason": event.result.reason})
+    elif isinstance(event, RunFinished):
+        tracer.complete("run", "executor", event.time - event.elapsed, event.time, lane="executor",
+                        args={"total_count": event.summary.total_count,
+                              "problem_count": event.summary.problem_count})
+
+
+def _skip_reason_of(prerequisite_tasks):
+    """
+    :return: the reason for skipping a component given its prerequisites' tasks, or None if it should be executed
+    """
+    for prerequisite in sorted(prerequisite_tasks):
+        task = prerequisite_tasks[prerequisite]
+        if task.cancelled() or task.exception() is not None:
+            continue
+
+        result = task.result()
+        if result is None or result.status not in _FAILED_STATUSES or result.command_count > 0:
+            continue
+
+        if result.status == Status.SKIPPED:
+            return result.reason
+        else:
+            return "prerequisite '{}' {}".format(prerequisite, _describe_failure(result.status))
 
-            if not is_directed_acyclic_graph(self.graph):
-                raise CyclicDependencyError("Dependency {} -> {} forms a cycle!".format(comp_id, dep))
+    return None
 
-            self._add_component(dep)
 
-    def _effective_component_ids(self):
-        if self.ctx.components is None:
-            all_components = self.ctx.registry.component_ids()
-            self.ctx.logger.debug("No components have been explicitly specified. Will execute all: {}"
-                                  .format(", ".join(all_components)))
-            return all_components
-        else:
-            requested = self.ctx.components
-            self.ctx.logger.info("Requested components: {}".format(", ".join(requested)))
-            return requested
+def _describe_failure(status):
+    if status == Status.NOT_FOUND:
+        return "was not found"
+    elif status == Status.TIMEOUT:
+        return "timed out"
+    else:
+        return "failed"
 
-    def _add_component(self, comp_id):
-        self.graph.add_node(comp_id)
 
-        if not self.ctx.registry.component_ids().__contains__(comp_id):
-            raise MissingDependencyError("No component with id '{}' is registered! "
-                                         "You might need to add '--experimental' or '-e'".format(comp_id))
+def _log_skipped(summary, ctx):
+    skipped = list(result for result in summary.results if result.status == Status.SKIPPED)
+    if len(skipped) > 0:
+        ctx.logger.warn("{} component(s) skipped:".format(len(skipped)))
+        for result in skipped:
+            ctx.logger.warn("\t{} - {}".format(result.comp_id, result.reason))
 
-        self._add_deps(prerequisites_of(self.ctx.registry.find_collector(comp_id)), comp_id)
-        self._add_deps(prerequisites_of(self.ctx.registry.find_validator(comp_id)), comp_id)
-        for reactor in self.ctx.registry.find_reactors(comp_id):
-            self._add_deps(prerequisites_of(reactor), comp_id)
 
-    def topologically_ordered_comp_ids(self):
-        return topological_sort(self.graph)
+def _time_budget_of(comp_id, ctx):
+    """
+    Resolves the time budget of a component in seconds: 'timeouts.components.<comp_id>' from the configuration, then the
+    collector's @timeout tag, then 'timeouts.default_sec'. None means no limit.
+    """
+    timeouts = ctx.config.get("timeouts", {})
 
+    configured = timeouts.get("components", {}).get(comp_id, None)
+    if configured is not None:
+        return float(configured)
 
-class CyclicDependencyError(BaseException):
-    pass
+    tagged = timeout_of(ctx.registry.find_collector(comp_id))
+    if tagged is not None:
+        return tagged
 
+    default = timeouts.get("default_sec", None)
+    return float(default) if default is not None else None
 
-class MissingDependencyError(BaseException):
-    pass
+
+async def _call(fn, *args, executor=None, scope=None, profile_as=None):
+    """
+    Awaits fn if it is a coroutine function, otherwise runs it on the specified executor (defaults to the inspection
+    pool of the scope), so blocking handlers never stall the event loop. Processes spawned by a synchronous fn are
+    tracked by scope. fn is profiled as 'profile_as' when profiling is on.
+    """
+    if asyncio.iscoroutinefunction(fn):
+        if profile_as is not None:
+            return await profiled_async(profile_as, fn, *args)
+        else:
+            return await fn(*args)
+    else:
+        return await scope.run(executor, functools.partial(_in_scope, scope, profile_as, fn, *args))
+
+
+def _in_scope(scope, profile_as, fn, *args):
+    with process_scope(scope):
+        if profile_as is not None:
+            return profiled(profile_as, fn, *args)
+        else:
+            return fn(*args)
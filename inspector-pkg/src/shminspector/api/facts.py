@@ -0,0 +1,142 @@
+import shutil
+import threading
+
+from shminspector.util import cmd
+
+
+class FactStore:
+    """
+    Facts about the workstation that are shared by all the components of a run, so that probes repeated by several
+    collectors (e.g. locating a binary or running 'python3 --version') are done once. Facts are keyed by their name and
+    parameters, e.g. 'which:bazel', 'brew:installed' or 'exec:python3 --version'.
+
+    A fact is computed once, even when it is requested concurrently: the first request computes it and the others wait
+    for its value. Errors are stored as well and re-raised to every requester. The outcome of a computation whose
+    component timed out (and had its processes killed) is not stored, and the requests that waited for it compute the
+    fact again. Interruptions (e.g. KeyboardInterrupt) are re-raised to the waiting requests, but not stored either.
+
+    Facts describe the state of the system, so they have to be invalidated whenever the system might have changed, e.g.
+    after reactor commands were executed.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._facts = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        :return: the value of the fact identified by 'key', which is computed by calling 'compute()' on first request
+        """
+        while True:
+            with self._lock:
+                fact = self._facts.get(key)
+                if fact is None:
+                    self.misses += 1
+                    fact = _Fact()
+                    self._facts[key] = fact
+                    owner = True
+                else:
+                    self.hits += 1
+                    owner = False
+
+            if owner:
+                try:
+                    fact.compute(compute)
+                    if not fact.memoizable():
+                        # before the waiting requests are woken up, so they never find the killed fact again
+                        self._discard(key, fact)
+                finally:
+                    fact.publish()
+
+                return fact.value()
+
+            fact.wait()
+            if not fact.killed:
+                return fact.value()
+
+    def which(self, executable_name):
+        """
+        :return: the path of the executable, or None if it is not on the PATH
+        """
+        return self.get("which:{}".format(executable_name), lambda: shutil.which(executable_name))
+
+    def execute(self, command):
+        """
+        :return: the output of the command (see shminspector.util.cmd.execute)
+        """
+        return self.get("exec:{}".format(" ".join(command)), lambda: cmd.execute(command))
+
+    def brew_formulae(self):
+        """
+        :return: the names of the installed Homebrew formulae, or an empty set if Homebrew is not installed
+        """
+
+        def installed_formulae():
+            _, code, output = cmd.try_execute(["brew", "list", "-1"])
+            if code != 0 or output is None:
+                return frozenset()
+
+            return frozenset(line.strip() for line in output.splitlines() if line.strip() != "")
+
+        return self.get("brew:installed", installed_formulae)
+
+    def invalidate(self):
+        """
+        Drops all the facts, so that they are computed again on their next request. Requests that are already waiting
+        for a fact still get its value.
+        """
+        with self._lock:
+            self._facts.clear()
+
+    def reset(self):
+        """
+        Drops all the facts and the hit and miss counts, e.g. before a new run.
+        """
+        with self._lock:
+            self._facts.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _discard(self, key, fact):
+        with self._lock:
+            if self._facts.get(key) is fact:
+                del self._facts[key]
+
+    def __str__(self):
+        return "FactStore(hits={}, misses={})".format(self.hits, self.misses)
+
+
+class _Fact:
+    def __init__(self):
+        self._computed = threading.Event()
+        self._value = None
+        self._error = None
+        self.killed = False
+
+    def compute(self, compute):
+        scope = cmd.current_process_scope()
+        try:
+            self._value = compute()
+        except BaseException as err:
+            self._error = err
+        finally:
+            # the processes of a timed out component are killed, so the outcome of its computation is no fact
+            self.killed = scope is not None and scope.killed
+
+    def publish(self):
+        self._computed.set()
+
+    def memoizable(self):
+        return not self.killed and (self._error is None or isinstance(self._error, Exception))
+
+    def wait(self):
+        self._computed.wait()
+
+    def value(self):
+        self._computed.wait()
+        if self._error is not None:
+            raise self._error
+
+        return self._value
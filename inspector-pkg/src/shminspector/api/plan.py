@@ -0,0 +1,171 @@
+import json
+
+from shminspector.api.context import Context, PLAN_FORMAT_JSON
+from shminspector.api.executiongraph import ExecutionGraph, effective_handlers_of
+from shminspector.api.tags import stringify
+
+
+class ExecutionPlan:
+    """
+    Groups the components of an execution graph into waves - topological levels of components that have no dependencies
+    between them and can therefore run in parallel - and estimates the wall time of the run from recorded component
+    durations.
+
+    Only the specified 'comp_ids' (the components that will actually be executed) are placed into waves. Other graph
+    nodes, e.g. components that are filtered out on the current platform, are treated as taking no time, but still pass
+    on the ordering constraints of their own prerequisites.
+
+    Estimates:
+
+    * serial_sec - the sum of all known durations, i.e. the wall time with a single job.
+    * critical_path_sec - the duration of the longest chain of dependent components, i.e. the lower bound of the wall
+      time with unlimited jobs. 'critical_path' lists the components of that chain.
+
+    Components without a recorded duration count as taking no time and are listed in 'unknown_comp_ids'.
+    """
+
+    def __init__(self, dag, comp_ids, durations):
+        effective = set(comp_ids)
+        levels = {}
+        finish_times = {}
+        critical_prerequisites = {}
+
+        def path_key(node):
+            # the longest chain by time, or by length when durations are equal (e.g. unknown)
+            return finish_times[node], levels[node]
+
+        for node in dag.topological_order():
+            prerequisites = dag.predecessors(node)
+            levels[node] = max((levels[prerequisite] + (1 if prerequisite in effective else 0)
+                                for prerequisite in prerequisites), default=0)
+            critical_prerequisite = max(prerequisites, key=path_key, default=None)
+            start_time = finish_times[critical_prerequisite] if critical_prerequisite is not None else 0
+            duration = (durations.get(node) or 0) if node in effective else 0
+
+            finish_times[node] = start_time + duration
+            critical_prerequisites[node] = critical_prerequisite
+
+        ordered_comp_ids = list(node for node in levels if node in effective)
+
+        self.waves = []
+        for comp_id in ordered_comp_ids:
+            while len(self.waves) <= levels[comp_id]:
+                self.waves.append([])
+            self.waves[levels[comp_id]].append(comp_id)
+
+        self.durations = dict((comp_id, durations.get(comp_id)) for comp_id in ordered_comp_ids)
+        self.unknown_comp_ids = list(comp_id for comp_id in ordered_comp_ids if durations.get(comp_id) is None)
+        self.serial_sec = sum(duration for duration in self.durations.values() if duration is not None)
+        self.critical_path = []
+        self.critical_path_sec = 0
+
+        if len(ordered_comp_ids) > 0:
+            last = max(ordered_comp_ids, key=path_key)
+            self.critical_path_sec = finish_times[last]
+            node = last
+            while node is not None:
+                if node in effective:
+                    self.critical_path.insert(0, node)
+                node = critical_prerequisites[node]
+
+    def wave_of(self, comp_id):
+        for index, wave in enumerate(self.waves):
+            if comp_id in wave:
+                return index
+
+        return None
+
+    def to_dict(self):
+        return {
+            "waves": list(list(wave) for wave in self.waves),
+            "durations_sec": dict(self.durations),
+            "estimate": {
+                "serial_sec": self.serial_sec,
+                "critical_path_sec": self.critical_path_sec,
+                "critical_path": list(self.critical_path),
+                "unknown": list(self.unknown_comp_ids),
+            }
+        }
+
+
+class ExecPlanExecutor:
+    """
+    Prints the execution plan as waves of components that can run in parallel, along with the estimated serial and
+    critical path wall times based on the component durations recorded by previous runs (see ExecutionPlan).
+    """
+
+    def execute(self, ctx: Context):
+        graph = ExecutionGraph(ctx)
+        selected = graph.selected_comp_ids()
+        comp_ids = list(
+            comp_id for comp_id in graph.topologically_ordered_comp_ids()
+            if (selected is None or comp_id in selected) and
+            effective_handlers_of(ctx).find_collector(comp_id) is not None
+        )
+        durations = ctx.cache.durations() if ctx.cache is not None else {}
+        plan = ExecutionPlan(graph.graph, comp_ids, durations)
+
+        if ctx.flags.plan_format == PLAN_FORMAT_JSON:
+            print(json.dumps(self._json_plan_of(plan, graph, ctx), indent=2))
+        else:
+            self._log_plan(plan, graph, ctx)
+
+        return plan
+
+    def _log_plan(self, plan, graph, ctx):
+        for index, wave in enumerate(plan.waves):
+            ctx.logger.info("Wave {} ({} component(s)):".format(index + 1, len(wave)))
+            for comp_id in wave:
+                prerequisites = sorted(graph.prerequisites_of(comp_id))
+                ctx.logger.info("\t{} [{}]{}".format(
+                    comp_id,
+                    _format_duration(plan.durations[comp_id]),
+                    " after {}".format(", ".join(prerequisites)) if len(prerequisites) > 0 else ""
+                ))
+                collector, validator, reactors = self._handlers_of(comp_id, ctx)
+                ctx.logger.info("\t\t --> {}".format(stringify(collector)))
+                if validator is not None:
+                    ctx.logger.info("\t\t --> {}".format(stringify(validator)))
+                    for reactor in reactors:
+                        ctx.logger.info("\t\t\t --> {}".format(stringify(reactor)))
+                else:
+                    ctx.logger.debug("No validator registered for {}", comp_id)
+
+        ctx.logger.info("Estimated wall time: {} serial, {} critical path ({})".format(
+            _format_duration(plan.serial_sec),
+            _format_duration(plan.critical_path_sec),
+            " -> ".join(plan.critical_path)
+        ))
+        if len(plan.unknown_comp_ids) > 0:
+            ctx.logger.info("No recorded durations for: {}".format(", ".join(plan.unknown_comp_ids)))
+
+    def _json_plan_of(self, plan, graph, ctx):
+        json_plan = plan.to_dict()
+        json_plan["waves"] = []
+        for wave in plan.waves:
+            json_wave = []
+            for comp_id in wave:
+                collector, validator, reactors = self._handlers_of(comp_id, ctx)
+                json_wave.append({
+                    "comp_id": comp_id,
+                    "prerequisites": sorted(graph.prerequisites_of(comp_id)),
+                    "duration_sec": plan.durations[comp_id],
+                    "collector": stringify(collector),
+                    "validator": stringify(validator) if validator is not None else None,
+                    "reactors": list(stringify(reactor) for reactor in reactors),
+                })
+            json_plan["waves"].append(json_wave)
+
+        return json_plan
+
+    def _handlers_of(self, comp_id, ctx):
+        handlers = effective_handlers_of(ctx)
+        if len(ctx.registry.find_reactors(comp_id)) == 0:
+            ctx.logger.debug("No reactors registered for {}", comp_id)
+
+        return handlers.find_collector(comp_id), handlers.find_validator(comp_id), handlers.find_reactors(comp_id)
+
+
+def _format_duration(seconds):
+    return "{:.1f}s".format(seconds) if seconds is not None else "?"
+
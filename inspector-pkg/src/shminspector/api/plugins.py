@@ -0,0 +1,153 @@
+import importlib
+import json
+import os
+import sys
+import threading
+
+from shminspector.api.cache import DEFAULT_CACHE_DIR, files_fingerprint
+from shminspector.api.tags import tags, tags_of
+
+PLUGINS_ENTRY_POINT_GROUP = "shminspector.components"
+
+_CACHE_FILE_NAME = "plugins.json"
+
+
+class LazyHandler:
+    """
+    A handler (collector, validator or reactor) that is imported and created on first use. 'target' is a
+    "package.module:attribute" reference to a handler class or factory, which is called with the specified arguments.
+
+    The tags of the handler have to be declared on the LazyHandler itself, using the regular tag decorators, e.g.
+    macos(LazyHandler("shminspector.components.xcode:XcodeInfoCollector")). This way components can be filtered and
+    scheduled without importing their modules. Declared tags are added to the tags of the loaded handler.
+    """
+
+    def __init__(self, target, *args, **kwargs):
+        self.target = target
+        self._args = args
+        self._kwargs = kwargs
+        self._handler = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self._handler is None:
+                factory = _resolve(self.target)
+                self._handler = tags(*tags_of(self))(factory(*self._args, **self._kwargs))
+
+            return self._handler
+
+    def is_loaded(self):
+        return self._handler is not None
+
+    def __repr__(self):
+        return "LazyHandler({})".format(self.target)
+
+
+def loaded(handler):
+    """
+    :return: the loaded handler if 'handler' is a LazyHandler, or the handler itself otherwise
+    """
+    if isinstance(handler, LazyHandler):
+        return handler.load()
+
+    return handler
+
+
+def register_plugins(registry, group=PLUGINS_ENTRY_POINT_GROUP, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Registers components shipped by separately installed packages. Every entry point in the specified group has to
+    reference a 'register_components(registry)' function, which would normally register LazyHandlers, so that only
+    the entry point's own module is imported here.
+
+    A plugin package declares its entry point in its setup.py, for example:
+
+        entry_points={"shminspector.components": ["my-components = my_package.plugin:register_components"]}
+
+    Scanning the metadata of all installed packages takes longer than importing the built-in components, so the
+    discovered entry points are cached in 'cache_dir' until a directory on sys.path changes (None disables caching).
+    """
+    for target in _entry_point_targets(group, cache_dir):
+        register_components = _resolve(target)
+        register_components(registry)
+
+
+def _resolve(target):
+    module_name, attr_name = target.split(":")
+    return getattr(importlib.import_module(module_name), attr_name)
+
+
+_entry_point_targets_by_group = {}
+_scanned_entry_point_targets = None
+
+
+def _entry_point_targets(group, cache_dir):
+    if group not in _entry_point_targets_by_group:
+        _entry_point_targets_by_group[group] = _cached_entry_point_targets(group, cache_dir)
+
+    return _entry_point_targets_by_group[group]
+
+
+def _cached_entry_point_targets(group, cache_dir):
+    """
+    :return: the entry point targets of the group. Only the groups read by this tool are cached, rather than the entry
+    points of every installed package.
+    """
+    fingerprint = list(list(entry) for entry in files_fingerprint(*sys.path))
+    cache_file_path = os.path.join(cache_dir, _CACHE_FILE_NAME) if cache_dir is not None else None
+
+    cached_targets = {}
+    if cache_file_path is not None:
+        try:
+            with open(cache_file_path, "r") as cache_file:
+                cached = json.load(cache_file)
+            if cached["fingerprint"] == fingerprint:
+                cached_targets = cached["targets"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    if group in cached_targets:
+        return cached_targets[group]
+
+    global _scanned_entry_point_targets
+    if _scanned_entry_point_targets is None:
+        _scanned_entry_point_targets = _scan_entry_point_targets()
+    targets = _scanned_entry_point_targets.get(group, [])
+
+    if cache_file_path is not None:
+        cached_targets[group] = targets
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_file_path, "w") as cache_file:
+                json.dump({"fingerprint": fingerprint, "targets": cached_targets}, cache_file)
+        except OSError:
+            pass
+
+    return targets
+
+
+def _scan_entry_point_targets():
+    """
+    :return: a dictionary of "module:attribute" entry point targets by group
+    """
+    targets = {}
+    try:
+        from importlib.metadata import distributions
+    except ImportError:
+        # Python < 3.8
+        import pkg_resources
+        for distribution in pkg_resources.working_set:
+            for group, entry_points in distribution.get_entry_map().items():
+                targets.setdefault(group, []).extend(
+                    "{}:{}".format(entry_point.module_name, ".".join(entry_point.attrs))
+                    for entry_point in entry_points.values()
+                )
+
+        return targets
+
+    for distribution in distributions():
+        for entry_point in distribution.entry_points:
+            # drops the optional extras, e.g. "module:attribute [extra]"
+            targets.setdefault(entry_point.group, []).append(entry_point.value.split("[")[0].strip())
+
+    return targets
@@ -14,13 +14,30 @@ class UserInput:
 
 
 class ReactorCommand:
-    def __init__(self, cmd, silent=False):
+    def __init__(self, cmd, silent=False, serial=None):
         """
         :param cmd: a list of either strings or UserInput instances
         :param silent: True if this command output should not be printed to the console, otherwise False (default)
+        :param serial: True if this command must not run concurrently with any other command. Defaults to True for sudo
+        commands and commands requiring user input, which might prompt on the terminal, otherwise False
         """
         self._cmd = cmd
         self.silent = silent
+        self._serial = serial
+
+    @property
+    def cmd(self):
+        """
+        :return: the unresolved command, which might contain UserInput instances
+        """
+        return list(self._cmd)
+
+    @property
+    def serial(self):
+        if self._serial is not None:
+            return self._serial
+
+        return (len(self._cmd) > 0 and self._cmd[0] == "sudo") or any(type(value) == UserInput for value in self._cmd)
 
     def resolve(self, ctx: Context):
         resolved_cmd = []
@@ -40,3 +57,12 @@ class ReactorCommand:
 class Reactor:
     @abstractmethod
     def react(self, data, ctx: Context) -> List[ReactorCommand]: pass
+
+
+class AsyncReactor:
+    """
+    Asynchronous variant of Reactor. See AsyncCollector.
+    """
+
+    @abstractmethod
+    async def react(self, data, ctx: Context) -> List[ReactorCommand]: pass
@@ -1,28 +1,131 @@
+from shminspector.api.plugins import loaded
+from shminspector.api.tags import tag_info_of, stringify
+
+
 class Registry:
+    """
+    Handlers can be registered either directly or as LazyHandlers (see shminspector.api.plugins), which are loaded on
+    first lookup. Component ids, tags and prerequisites are available without loading any handler.
+    """
 
     def __init__(self):
         self._collectors = {}
         self._validators = {}
         self._reactors = {}
+        self._views = {}
 
     def register_collector(self, component_id, collector):
         self._collectors[component_id] = collector
+        self._views.clear()
 
     def register_validator(self, component_id, validator):
         self._validators[component_id] = validator
+        self._views.clear()
 
     def register_reactor(self, component_id, *reactors):
         existing_reactors = self._reactors.get(component_id, [])
         self._reactors[component_id] = existing_reactors + list(reactors)
+        self._views.clear()
+
+    def component_ids(self):
+        return self._collectors.keys()
+
+    def find_collector(self, component_id):
+        return loaded(self._collectors.get(component_id, None))
+
+    def find_validator(self, component_id):
+        return loaded(self._validators.get(component_id, None))
+
+    def find_reactors(self, component_id):
+        return list(loaded(reactor) for reactor in self._reactors.get(component_id, []))
+
+    def prerequisites_of(self, component_id):
+        """
+        :return: the ids of the components that any of the component's handlers requires, without loading them
+        """
+        prerequisites = []
+        handlers = [self._collectors.get(component_id), self._validators.get(component_id)]
+        for handler in handlers + self._reactors.get(component_id, []):
+            for prerequisite in sorted(tag_info_of(handler).prerequisites):
+                if prerequisite not in prerequisites:
+                    prerequisites.append(prerequisite)
+
+        return prerequisites
+
+    def effective_view(self, platform, experimental, interactive, logger=None):
+        """
+        :return: a cached view of the handlers that are effective on the specified platform, with the specified
+        'experimental' flag and mode (see EffectiveRegistryView). Views are rebuilt after handlers are registered.
+        """
+        key = (platform, experimental, interactive)
+        view = self._views.get(key)
+        if view is None:
+            view = EffectiveRegistryView(self, platform, experimental, interactive, logger)
+            self._views[key] = view
+
+        return view
+
+
+class EffectiveRegistryView:
+    """
+    The handlers of a registry filtered once by their tags, so that looking up the effective handlers of a component is
+    a dictionary lookup. A handler is effective unless it is experimental and the 'experimental' flag is off, it is
+    interactive and the mode is not, or it does not support the platform.
+
+    Filtering uses declared tags only, so lazy handlers are loaded on lookup rather than when the view is built.
+    """
+
+    def __init__(self, registry: Registry, platform, experimental, interactive, logger=None):
+        def effective(handlers):
+            return list(
+                handler for handler in handlers if is_effective(handler, platform, experimental, interactive, logger)
+            )
+
+        self._collectors = dict(
+            (comp_id, collector) for comp_id, collector in registry._collectors.items()
+            if is_effective(collector, platform, experimental, interactive, logger)
+        )
+        self._validators = dict(
+            (comp_id, validator) for comp_id, validator in registry._validators.items()
+            if is_effective(validator, platform, experimental, interactive, logger)
+        )
+        self._reactors = dict(
+            (comp_id, effective(reactors)) for comp_id, reactors in registry._reactors.items()
+        )
 
     def component_ids(self):
+        """
+        :return: the ids of the components with an effective collector
+        """
         return self._collectors.keys()
 
     def find_collector(self, component_id):
-        return self._collectors.get(component_id, None)
+        return loaded(self._collectors.get(component_id, None))
 
     def find_validator(self, component_id):
-        return self._validators.get(component_id, None)
+        return loaded(self._validators.get(component_id, None))
 
     def find_reactors(self, component_id):
-        return self._reactors.get(component_id, [])
+        return list(loaded(reactor) for reactor in self._reactors.get(component_id, []))
+
+
+def is_effective(handler, platform, experimental, interactive, logger=None):
+    info = tag_info_of(handler)
+
+    if info.experimental and not experimental:
+        if logger is not None:
+            logger.debug(lambda: "{} - filtered out, because 'experimental' flag is off!".format(stringify(handler)))
+        return False
+
+    if info.interactive and not interactive:
+        if logger is not None:
+            logger.warn("{} - filtered out, because it requires interactive mode!".format(stringify(handler)))
+        return False
+
+    if not info.supports(platform):
+        if logger is not None:
+            logger.debug(lambda: "{} - filtered out, because it is not compatible with the current platform!"
+                         .format(stringify(handler)))
+        return False
+
+    return True
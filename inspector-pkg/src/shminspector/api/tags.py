@@ -1,29 +1,67 @@
 import platform
+from collections import namedtuple
 from enum import Enum
 
-_TAGS_ATTR_NAME = "__tags_"
+_TAG_INFO_ATTR_NAME = "__tag_info_"
+
+
+class TagInfo(namedtuple(typename="TagInfo",
+                         field_names=["tags", "platforms", "prerequisites", "experimental", "interactive", "timeout"])):
+    """
+    The tags of a component class (or object), parsed once when they are set. All the fields are immutable, so a
+    TagInfo inherited from a base class can be shared safely - tagging a subclass or an instance creates a new TagInfo
+    instead of modifying the inherited one.
+
+    'platforms' is empty when the component is compatible with all platforms.
+    """
+
+    @staticmethod
+    def of(tag_names):
+        tag_names = frozenset(tag_names)
+        timeouts = list(float(tag[len(_TIMEOUT_TAG_PREFIX):]) for tag in tag_names if tag.startswith(_TIMEOUT_TAG_PREFIX))
+
+        return TagInfo(
+            tags=tag_names,
+            platforms=frozenset(
+                Platform[tag[len(_PLATFORM_TAG_PREFIX):].upper()] for tag in tag_names
+                if tag.startswith(_PLATFORM_TAG_PREFIX)
+            ),
+            prerequisites=frozenset(
+                _strip_prerequisite_prefix_for(tag) for tag in tag_names if tag.startswith(_PREREQ_TAG_PREFIX)
+            ),
+            experimental=_EXPERIMENTAL_TAG_NAME in tag_names,
+            interactive=_INTERACTIVE_TAG_NAME in tag_names,
+            timeout=min(timeouts) if len(timeouts) > 0 else None,
+        )
+
+    def with_tags(self, tag_names):
+        return TagInfo.of(self.tags.union(tag_names))
+
+    def supports(self, p):
+        return len(self.platforms) == 0 or p in self.platforms
 
 
 def tags(*values: str):
-    return _set_tags((v for v in values))
+    return _set_tags(values)
+
+
+def tag_info_of(obj) -> TagInfo:
+    return getattr(obj, _TAG_INFO_ATTR_NAME, _NO_TAGS)
 
 
 def has_tag(obj, tag: str):
-    _tags: set = getattr(obj, _TAGS_ATTR_NAME, set())
-    return _tags.__contains__(tag)
+    return tag in tag_info_of(obj).tags
 
 
 def tags_of(obj):
-    return getattr(obj, _TAGS_ATTR_NAME, set())
+    return tag_info_of(obj).tags
 
 
 def _set_tags(values):
-    def deco(c):
-        _tags = tags_of(c)
-        for v in values:
-            _tags.add(v)
+    values = tuple(values)
 
-        setattr(c, _TAGS_ATTR_NAME, _tags)
+    def deco(c):
+        setattr(c, _TAG_INFO_ATTR_NAME, tag_info_of(c).with_tags(values))
 
         return c
 
@@ -43,7 +81,7 @@ def experimental(cls):
 
 
 def is_experimental(obj):
-    return has_tag(obj, _EXPERIMENTAL_TAG_NAME)
+    return tag_info_of(obj).experimental
 
 
 def interactive(cls):
@@ -55,7 +93,7 @@ def interactive(cls):
 
 
 def is_interactive(obj):
-    return has_tag(obj, _INTERACTIVE_TAG_NAME)
+    return tag_info_of(obj).interactive
 
 
 #
@@ -105,14 +143,8 @@ def target_platform(p: Platform):
     return tags(_platform_tag_name_for(p))
 
 
-def _all_platform_tag(obj) -> set:
-    return set((tag for tag in tags_of(obj) if tag.startswith(_PLATFORM_TAG_PREFIX)))
-
-
 def is_compatible_with_current_platform(obj):
-    platform_tags = _all_platform_tag(obj)
-
-    return platform_tags.__len__() == 0 or platform_tags.__contains__(_platform_tag_name_for(CURRENT_PLATFORM))
+    return tag_info_of(obj).supports(CURRENT_PLATFORM)
 
 
 def _platform_tag_name_for(p: Platform):
@@ -131,12 +163,7 @@ def prerequisites(*comp_ids):
 
 
 def prerequisites_of(obj):
-    if obj is None:
-        return set()
-    else:
-        all_tags = tags_of(obj)
-        return set(
-            _strip_prerequisite_prefix_for(prereq) for prereq in all_tags if prereq.startswith(_PREREQ_TAG_PREFIX))
+    return tag_info_of(obj).prerequisites
 
 
 def _prerequisite_tag_name_for(comp_id):
@@ -147,6 +174,28 @@ def _strip_prerequisite_prefix_for(tag):
     return tag[len(_PREREQ_TAG_PREFIX):]
 
 
+#
+# Timeouts
+#
+
+_TIMEOUT_TAG_PREFIX = "@timeout:"
+
+
+def timeout(seconds):
+    """
+    A decorator to set the default time budget of a component in seconds. The budget can be overridden by the
+    'timeouts' section of the configuration.
+    """
+    return tags("{}{}".format(_TIMEOUT_TAG_PREFIX, seconds))
+
+
+def timeout_of(obj):
+    return tag_info_of(obj).timeout
+
+
+_NO_TAGS = TagInfo.of(())
+
+
 #
 # Utilities
 #
@@ -154,7 +203,7 @@ def stringify(obj):
     class_name = type(obj).__name__
     obj_tags = tags_of(obj)
     if len(obj_tags) > 0:
-        tags_label = ", ".join(obj_tags)
+        tags_label = ", ".join(sorted(obj_tags))
         return "{class_name}[tags={tags}]".format(class_name=class_name, tags=tags_label)
     else:
         return class_name
@@ -11,6 +11,8 @@ class Status(Enum):
     NOT_FOUND = 3
     UPGRADE_REQUIRED = 4
     DOWNGRADE_REQUIRED = 5
+    TIMEOUT = 6
+    SKIPPED = 7
 
 
 class ValidationResult:
@@ -22,3 +24,12 @@ class ValidationResult:
 class Validator:
     @abstractmethod
     def validate(self, input_data, ctx: Context) -> ValidationResult: pass
+
+
+class AsyncValidator:
+    """
+    Asynchronous variant of Validator. See AsyncCollector.
+    """
+
+    @abstractmethod
+    async def validate(self, input_data, ctx: Context) -> ValidationResult: pass
@@ -1,6 +1,6 @@
 import argparse
 
-from shminspector.api.context import Context, Mode
+from shminspector.api.context import Context, Mode, PLAN_FORMAT_TEXT, PLAN_FORMAT_JSON
 from shminspector.api.registry import Registry
 
 
@@ -22,7 +22,14 @@ def parse_context(name, registry: Registry, description=""):
                         default=False,
                         dest="plan",
                         action="store_true",
-                        help="prints out an execution plan (takes into account your platform and program flags)")
+                        help="prints out an execution plan (takes into account your platform and program flags). "
+                             "Components are grouped into waves that can run in parallel, and the wall time is "
+                             "estimated from the durations recorded by previous runs")
+    parser.add_argument("--plan-format",
+                        choices=[PLAN_FORMAT_TEXT, PLAN_FORMAT_JSON],
+                        dest="plan_format",
+                        default=PLAN_FORMAT_TEXT,
+                        help="one of [ text | json ]. The JSON plan is printed to the standard output")
     parser.add_argument("--debug", "-d",
                         default=False,
                         dest="debug",
@@ -36,21 +43,71 @@ def parse_context(name, registry: Registry, description=""):
     parser.add_argument("--log-file",
                         dest="log_file",
                         help="absolute path to optional log file")
+    parser.add_argument("--trace-file",
+                        dest="trace_file",
+                        help="optional path of a Chrome trace event JSON file to write a timeline of the run to. The "
+                             "file can be opened with https://ui.perfetto.dev")
+    parser.add_argument("--profile",
+                        dest="profile_dir",
+                        help="optional directory to write cProfile stats of every component collect/validate/react "
+                             "call to. A merged hotspots report is printed at the end of the run")
     parser.add_argument("--config",
                         dest="config_file",
                         help="optional JSON config file path")
+    parser.add_argument("--jobs", "-j",
+                        default=1,
+                        type=int,
+                        dest="jobs",
+                        help="maximum number of components to execute concurrently. Components are started as soon as "
+                             "all of their prerequisites are done (default: 1)")
+    parser.add_argument("--command-jobs",
+                        default=1,
+                        type=int,
+                        dest="command_jobs",
+                        help="maximum number of reactor commands to execute concurrently. When greater than 1, command "
+                             "output lines are prefixed with the names of the components they belong to (default: 1)")
+    parser.add_argument("--deadline",
+                        default=None,
+                        type=float,
+                        dest="deadline",
+                        help="optional time limit for the whole run in seconds. Components that do not finish in time "
+                             "are killed and reported as timed out")
+    parser.add_argument("--fail-fast",
+                        default=False,
+                        dest="fail_fast",
+                        action="store_true",
+                        help="skips components that depend on a component that could not be found, failed or timed "
+                             "out, without inspecting them")
+    parser.add_argument("--no-cache",
+                        default=False,
+                        dest="no_cache",
+                        action="store_true",
+                        help="ignores cached component data and forces a fresh collection")
+    parser.add_argument("--daemon",
+                        default=False,
+                        dest="daemon",
+                        action="store_true",
+                        help="keeps running and re-checks components periodically and whenever their watched files "
+                             "change. Reactor commands are never executed in daemon mode")
     parser.add_argument("--components",
                         default=None,
                         dest="components",
                         help="optional comma separated list of component names. Supported components are: {}"
                         .format(list(registry.component_ids())))
+    parser.add_argument("--affected-by",
+                        default=None,
+                        dest="affected_by",
+                        help="optional comma separated list of component names. Runs only these components and the "
+                             "components that transitively depend on them, e.g. after fixing one of them")
+    parser.add_argument("--only-closure",
+                        default=None,
+                        dest="only_closure",
+                        help="optional comma separated list of component names. Runs only these components along with "
+                             "their transitive prerequisites and dependents")
 
     args = parser.parse_args()
 
-    if args.components is not None:
-        components = [comp.strip() for comp in args.components.split(",")]
-    else:
-        components = None
+    components = _comma_separated_list_or_none(args.components)
 
     return Context(
         name=name,
@@ -60,7 +117,25 @@ def parse_context(name, registry: Registry, description=""):
         debug=args.debug,
         log_file=args.log_file,
         plan=args.plan,
+        plan_format=args.plan_format,
         dryrun=args.dryrun,
         experimental=args.experimental,
-        components=components
+        components=components,
+        affected_by=_comma_separated_list_or_none(args.affected_by),
+        only_closure=_comma_separated_list_or_none(args.only_closure),
+        jobs=args.jobs,
+        deadline=args.deadline,
+        no_cache=args.no_cache,
+        command_jobs=args.command_jobs,
+        daemon=args.daemon,
+        fail_fast=args.fail_fast,
+        trace_file=args.trace_file,
+        profile_dir=args.profile_dir
     )
+
+
+def _comma_separated_list_or_none(value):
+    if value is None:
+        return None
+
+    return [item.strip() for item in value.split(",")]
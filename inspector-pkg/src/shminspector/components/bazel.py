@@ -1,13 +1,12 @@
-import shutil
+import os
 from collections import namedtuple
 
+from shminspector.api.cache import binary_fingerprint, files_fingerprint
 from shminspector.api.collector import Collector
 from shminspector.api.context import Context
 from shminspector.api.semver import SemVer
-from shminspector.api.tags import macos
+from shminspector.api.tags import macos, timeout
 from shminspector.api.validator import ValidationResult, Status, Validator
-from shminspector.util import cmd
-from shminspector.util.cmd import try_execute
 
 BazelInfo = namedtuple(typename="BazelInfo", field_names=["path", "version", "bazelisk"])
 BazelInfo.__str__ = lambda self: "BazelInfo(path={}, version={}, bazelisk={})" \
@@ -15,11 +14,18 @@ BazelInfo.__str__ = lambda self: "BazelInfo(path={}, version={}, bazelisk={})" \
 
 
 @macos
+@timeout(120)  # 'bazel version' might have to start a server or wait for a lock
 class BazelInfoCollector(Collector):
 
+    def fingerprint(self, ctx: Context):
+        # Bazelisk resolves the Bazel version from USE_BAZEL_VERSION or the workspace's .bazelversion file
+        cwd = os.getcwd()
+        return binary_fingerprint("bazel"), os.environ.get("USE_BAZEL_VERSION", None), cwd, \
+            files_fingerprint(*_bazelversion_paths(cwd))
+
     def collect(self, ctx: Context):
         ctx.logger.progress("Collecting Bazel binary information...")
-        path = shutil.which("bazel")
+        path = ctx.facts.which("bazel")
         if path is None:
             return None
 
@@ -29,7 +35,7 @@ class BazelInfoCollector(Collector):
 
     def _bazel_version(self, ctx):
         try:
-            lines = cmd.execute(["bazel", "version", "--gnu_format=true"]).split("\n")
+            lines = ctx.facts.execute(["bazel", "version", "--gnu_format=true"]).split("\n")
             version = lines[len(lines) - 2].split()[1]
             major, minor, patch = version.split(".")
             return SemVer(major, minor, patch)
@@ -38,9 +44,7 @@ class BazelInfoCollector(Collector):
             return None
 
     def _bazelisk_exists(self, ctx):
-        _, code, stdout = try_execute(["brew", "ls", "-1", "bazelisk"], logger=ctx.logger)
-
-        return code == 0 and "bazelisk" in stdout
+        return "bazelisk" in ctx.facts.brew_formulae()
 
 
 class BazelInfoValidator(Validator):
@@ -55,3 +59,17 @@ class BazelInfoValidator(Validator):
 
         ctx.logger.warn("Bazel upgrade required")
         return ValidationResult(input_data, Status.UPGRADE_REQUIRED)
+
+
+def _bazelversion_paths(dir_path):
+    """
+    :return: the paths of the .bazelversion files that might apply to the directory - in it and in all its parents,
+    since the workspace root might be any of them
+    """
+    paths = []
+    while True:
+        paths.append(os.path.join(dir_path, ".bazelversion"))
+        parent_path = os.path.dirname(dir_path)
+        if parent_path == dir_path:
+            return paths
+        dir_path = parent_path
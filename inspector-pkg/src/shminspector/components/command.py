@@ -1,5 +1,3 @@
-from shutil import which
-
 from shminspector.api.context import Context
 from shminspector.api.validator import ValidationResult, Status
 
@@ -28,7 +26,7 @@ def collect_for(command):
     # noinspection PyUnusedLocal
     def collect(self, ctx: Context):
         ctx.logger.progress("Detecting {} path...".format(command))
-        return which(command)
+        return ctx.facts.which(command)
 
     return collect
 
@@ -1,10 +1,12 @@
+import asyncio
 import json
 import os.path as path
 from collections import namedtuple
 
-from shminspector.api.collector import Collector
+from shminspector.api.cache import binary_fingerprint, files_fingerprint, ttl_fingerprint
+from shminspector.api.collector import AsyncCollector
 from shminspector.api.context import Context
-from shminspector.api.tags import macos
+from shminspector.api.tags import macos, timeout
 from shminspector.api.validator import Validator, ValidationResult, Status
 from shminspector.components.command import command_collector, command_validator
 from shminspector.util import cmd
@@ -24,7 +26,8 @@ GCloudConfig = namedtuple(
 
 
 @macos
-class GCloudConfigCollector(Collector):
+@timeout(60)
+class GCloudConfigCollector(AsyncCollector):
     _expected_cred_helpers = {
         "us.gcr.io": "gcloud",
         "asia.gcr.io": "gcloud",
@@ -34,21 +37,39 @@ class GCloudConfigCollector(Collector):
         "eu.gcr.io": "gcloud"
     }
 
-    def collect(self, ctx: Context):
-        account = self._account(ctx)
+    def fingerprint(self, ctx: Context):
+        # credentials might expire without any of the files changing, hence the TTL
+        return binary_fingerprint("gcloud"), \
+               files_fingerprint("~/.config/gcloud/active_config",
+                                 "~/.config/gcloud/configurations",
+                                 "~/.config/gcloud/credentials.db",
+                                 "~/.docker/config.json"), \
+               ttl_fingerprint(60 * 60)
+
+    async def collect(self, ctx: Context):
+        # both gcloud invocations are slow to start, so they are spawned concurrently
+        account, auth_list = await asyncio.gather(self._account(ctx), self._auth_list(ctx))
         if account is not None:
-            return GCloudConfig(account=account, auth_ok=self._auth_ok(ctx, account), docker_ok=self._docker_ok())
+            return GCloudConfig(account=account,
+                                auth_ok=self._auth_ok(auth_list, account),
+                                docker_ok=self._docker_ok())
         else:
             return None
 
-    def _auth_ok(self, ctx, expected_account):
-        ok, code, output = cmd.try_execute(cmd=["gcloud", "auth", "list", "--format", "json"], logger=ctx.logger)
-
+    @staticmethod
+    async def _auth_list(ctx):
+        ok, code, output = await cmd.try_execute_async(cmd=["gcloud", "auth", "list", "--format", "json"],
+                                                       logger=ctx.logger)
         if ok and code == 0:
-            auth_list_json = json.loads(output)
-            for entry in auth_list_json:
-                if entry["account"] == expected_account and entry["status"] == "ACTIVE":
-                    return True
+            return json.loads(output)
+        else:
+            return []
+
+    @staticmethod
+    def _auth_ok(auth_list, expected_account):
+        for entry in auth_list:
+            if entry["account"] == expected_account and entry["status"] == "ACTIVE":
+                return True
 
         return False
 
@@ -66,9 +87,12 @@ class GCloudConfigCollector(Collector):
 
         return config_exists
 
-    def _account(self, ctx):
-        ok, code, output = cmd.try_execute(cmd=["gcloud", "config", "get-value", "account", "--format", "json"],
-                                           logger=ctx.logger)
+    @staticmethod
+    async def _account(ctx):
+        ok, code, output = await cmd.try_execute_async(
+            cmd=["gcloud", "config", "get-value", "account", "--format", "json"],
+            logger=ctx.logger
+        )
         if ok and code == 0:
             return output.strip().strip('"')
         else:
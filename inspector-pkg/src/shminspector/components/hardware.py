@@ -1,6 +1,7 @@
 import multiprocessing
 from collections import namedtuple
 
+from shminspector.api.cache import ttl_fingerprint
 from shminspector.api.collector import Collector
 from shminspector.api.context import Context
 from shminspector.api.tags import macos
@@ -13,6 +14,9 @@ HardwareInfo = namedtuple(typename="HardwareInfo", field_names=["cpu_count", "to
 @macos  # remove after fixing ram calculation method
 class HardwareInfoCollector(Collector):
 
+    def fingerprint(self, ctx: Context):
+        return ttl_fingerprint(24 * 60 * 60)
+
     def collect(self, ctx: Context):
         ctx.logger.progress("Collecting hardware information...")
         cpu_count = multiprocessing.cpu_count()
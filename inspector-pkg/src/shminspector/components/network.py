@@ -1,4 +1,3 @@
-import urllib.request as request
 from collections import namedtuple
 from time import time
 from typing import List
@@ -17,10 +16,16 @@ class UrlConnectivityInfoCollector(Collector):
     def collect(self, ctx: Context) -> List[NetConnectivityInfo]:
         specs = self._collect_specs(ctx)
         ctx.logger.progress("Checking network connectivity...")
-        return list((self._check_connectivity(spec, ctx) for spec in specs))
+        return list(
+            ctx.facts.get("url:{}".format(spec.address), lambda spec=spec: self._check_connectivity(spec, ctx))
+            for spec in specs
+        )
 
     @timeit_if(more_than_sec=3)
     def _check_connectivity(self, spec, ctx):
+        # urllib.request takes longer to import than most checks take to run, so it is only imported when needed
+        import urllib.request as request
+
         start_time = time()
 
         def elapsed():
@@ -1,11 +1,10 @@
-import shutil
 from collections import namedtuple
 
+from shminspector.api.cache import binary_fingerprint
 from shminspector.api.collector import Collector
 from shminspector.api.context import Context
 from shminspector.api.semver import SemVer
 from shminspector.api.validator import Validator, ValidationResult, Status
-from shminspector.util import cmd
 
 PythonInfo = namedtuple(typename="PythonInfo", field_names=["path", "version"])
 PythonInfo.__str__ = lambda self: "PythonInfo(path={}, version={})".format(self.path, self.version)
@@ -15,18 +14,21 @@ class PythonInfoCollector(Collector):
     def __init__(self, binary_name="python"):
         self.binary_name = binary_name
 
+    def fingerprint(self, ctx: Context):
+        return binary_fingerprint(self.binary_name)
+
     def collect(self, ctx: Context):
         ctx.logger.progress("Collecting Python binary information for {}...".format(self.binary_name))
-        path = shutil.which(self.binary_name)
+        path = ctx.facts.which(self.binary_name)
 
         if path is None:
             return None  # python not found
 
-        major, minor, patch = self._python_version()
+        major, minor, patch = self._python_version(ctx)
         return PythonInfo(path, SemVer(major, minor, patch))
 
-    def _python_version(self):
-        return cmd.execute([self.binary_name, "--version"]).split()[1].split(".")
+    def _python_version(self, ctx):
+        return ctx.facts.execute([self.binary_name, "--version"]).split()[1].split(".")
 
 
 class PythonInfoValidator(Validator):
@@ -1,5 +1,6 @@
 from collections import namedtuple
 
+from shminspector.api.cache import binary_fingerprint, files_fingerprint
 from shminspector.api.collector import Collector
 from shminspector.api.context import Context
 from shminspector.api.tags import macos
@@ -12,6 +13,10 @@ XcodeInfo = namedtuple(typename="XcodeInfo", field_names=["path"])
 @macos
 class XcodeInfoCollector(Collector):
 
+    def fingerprint(self, ctx: Context):
+        # xcode-select keeps the active developer directory in this symlink
+        return binary_fingerprint("xcode-select"), files_fingerprint("/var/db/xcode_select_link")
+
     def collect(self, ctx: Context):
         ctx.logger.progress("Collecting Xcode installation information...")
         path = self._xcode_path(ctx)
@@ -0,0 +1,179 @@
+import os
+import signal
+import threading
+from time import time
+
+from shminspector.api.cache import fingerprint_of
+from shminspector.api.context import Context
+from shminspector.api.executiongraph import ExecutionGraph
+from shminspector.api.executor import Executor
+from shminspector.api.validator import Status
+from shminspector.components import BAZEL_COMP_ID, DOCKER_COMP_ID, GCLOUD_CONFIG_COMP_ID
+from shminspector.query import DEFAULT_SOCKET_PATH
+from shminspector.statusserver import StatusServer
+
+_DEFAULT_INTERVAL_SEC = 600
+_DEFAULT_POLL_SEC = 2
+_DEFAULT_WATCHED_PATHS = {
+    BAZEL_COMP_ID: ["~/.bazelrc"],
+    DOCKER_COMP_ID: ["~/.docker/config.json"],
+    GCLOUD_CONFIG_COMP_ID: ["~/.config/gcloud"],
+}
+
+
+class Daemon:
+    """
+    Keeps inspecting the environment in a long running process. The registry and the execution graph are built once,
+    and the latest result of every component is kept in memory to report status changes. Re-checks always collect
+    afresh, bypassing the collector cache, since a check is meant to notice changes that fingerprints might miss.
+
+    All components are re-checked every 'daemon.interval_sec' seconds. In between, the daemon polls every
+    'daemon.poll_sec' seconds for changes in the collectors' fingerprints and in the files listed under
+    'daemon.watch.<comp_id>', and re-checks only the affected components along with their dependents. When
+    ctx.flags.affected_by or ctx.flags.only_closure is specified, only the selected components are checked.
+
+    Checks never react - the daemon only reports status changes. The latest statuses are served on the unix socket at
+    'daemon.socket_path' (see shminspector.query), unless it is set to null.
+    """
+
+    def __init__(self, ctx: Context):
+        self.ctx = ctx
+        self.results = {}
+        self.last_check_time = None
+
+        config = ctx.config.get("daemon", {})
+        self.interval_sec = config.get("interval_sec", _DEFAULT_INTERVAL_SEC)
+        self.poll_sec = config.get("poll_sec", _DEFAULT_POLL_SEC)
+        self.watched_paths = config.get("watch", _DEFAULT_WATCHED_PATHS)
+        socket_path = config.get("socket_path", DEFAULT_SOCKET_PATH)
+        self.status_server = StatusServer(os.path.expanduser(socket_path)) if socket_path is not None else None
+
+        self._executor = Executor()
+        self._graph = ExecutionGraph(ctx)
+        selected = self._graph.selected_comp_ids()
+        self._comp_ids = list(
+            comp_id for comp_id in self._graph.topologically_ordered_comp_ids() if selected is None or comp_id in selected
+        )
+        self._signatures = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def run(self):
+        self.ctx.logger.info("Running in daemon mode. Full checks every {} seconds.".format(self.interval_sec))
+        next_full_check_time = 0
+
+        if self.status_server is not None:
+            self.status_server.start()
+            self.ctx.logger.info("Serving component statuses on {}".format(self.status_server.socket_path))
+
+        try:
+            while not self._stopped.is_set():
+                if time() >= next_full_check_time:
+                    self.check(self._comp_ids)
+                    next_full_check_time = time() + self.interval_sec
+                else:
+                    changed_comp_ids = self.changed_comp_ids()
+                    if len(changed_comp_ids) > 0:
+                        self.ctx.logger.info("Changes detected in: {}".format(", ".join(sorted(changed_comp_ids))))
+                        self.check(changed_comp_ids)
+
+                self._stopped.wait(min(self.poll_sec, max(0, next_full_check_time - time())))
+        finally:
+            if self.status_server is not None:
+                self.status_server.stop()
+
+        self.ctx.logger.info("Daemon stopped.")
+
+    def stop(self):
+        self._stopped.set()
+
+    def check(self, comp_ids):
+        """
+        Re-checks the specified components and their dependents, and reports status changes.
+        """
+        signatures = dict((comp_id, self._signature_of(comp_id)) for comp_id in self._comp_ids)
+        summary = self._executor.verify(self.ctx, comp_ids, graph=self._graph)
+
+        with self._lock:
+            for result in summary.results:
+                previous = self.results.get(result.comp_id)
+                if previous is None or previous.status != result.status:
+                    self._report(result)
+
+                self.results[result.comp_id] = result
+                self._signatures[result.comp_id] = signatures[result.comp_id]
+
+            self.last_check_time = time()
+
+            if self.status_server is not None:
+                self.status_server.update(self.results, self.last_check_time)
+
+        return summary
+
+    def changed_comp_ids(self):
+        return set(
+            comp_id for comp_id in self._comp_ids
+            if comp_id in self._signatures and self._signatures[comp_id] != self._signature_of(comp_id)
+        )
+
+    def _signature_of(self, comp_id):
+        try:
+            fingerprint = fingerprint_of(self.ctx.registry.find_collector(comp_id), self.ctx)
+        except Exception as err:
+            self.ctx.logger.debug("Failed to fingerprint {} - {}", comp_id, err)
+            fingerprint = None
+
+        return fingerprint, watched_files_fingerprint(*self.watched_paths.get(comp_id, []))
+
+    def _report(self, result):
+        if result.status in (None, Status.OK):
+            self.ctx.logger.success("{} - OK".format(result.comp_id))
+        else:
+            self.ctx.logger.failure("{} - {}".format(result.comp_id, result.status.name))
+
+
+def watched_files_fingerprint(*paths):
+    """
+    Like files_fingerprint, but directories are identified by the modification times of their direct entries as well, so
+    that changes to files within watched directories are noticed.
+    """
+    fingerprint = []
+    for path in paths:
+        expanded_path = os.path.expanduser(path)
+        try:
+            stat = os.stat(expanded_path)
+        except OSError:
+            fingerprint.append((path, None))
+            continue
+
+        entries = ()
+        if os.path.isdir(expanded_path):
+            try:
+                entries = tuple(sorted((entry.name, _mtime_of(entry)) for entry in os.scandir(expanded_path)))
+            except OSError:
+                pass
+
+        fingerprint.append((path, stat.st_mtime, entries))
+
+    return tuple(fingerprint)
+
+
+def _mtime_of(entry):
+    try:
+        return entry.stat().st_mtime
+    except OSError:
+        return None
+
+
+def run_daemon(ctx: Context):
+    daemon = Daemon(ctx)
+
+    # noinspection PyUnusedLocal
+    def stop(signum, frame):
+        daemon.stop()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
@@ -1,70 +1,77 @@
-from shminspector.api.executor import Executor
+from shminspector.api.cache import DEFAULT_CACHE_DIR
+from shminspector.api.plugins import LazyHandler, register_plugins
 from shminspector.api.registry import Registry
 from shminspector.api.semver import SemVer
+from shminspector.api.tags import macos, timeout
 from shminspector.components import *
-from shminspector.components.bazel import BazelInfoCollector, BazelInfoValidator
-from shminspector.components.brew import HomebrewCommandCollectorValidator
-from shminspector.components.debugreactor import DebugReactor
-from shminspector.components.disk import DiskInfoCollector, DiskInfoValidator
-from shminspector.components.docker import DockerInfoCollector, DockerInfoValidator
-from shminspector.components.gcloud import GCloudCommandCollectorValidator, GCloudConfigCollector, \
-    GCloudConfigValidator
-from shminspector.components.hardware import HardwareInfoValidator, HardwareInfoCollector
-from shminspector.components.network import UrlConnectivityInfoCollector, UrlConnectivityInfoValidator
-from shminspector.components.python import PythonInfoCollector, PythonInfoValidator, PythonInfoStrictValidator
-from shminspector.components.xcode import XcodeInfoCollector, XcodeInfoValidator
-
-
-def register_components(registry: Registry):
-    log_reactor = DebugReactor()
-
-    registry.register_collector(NET_COMP_ID, UrlConnectivityInfoCollector())
-    registry.register_validator(NET_COMP_ID, UrlConnectivityInfoValidator())
+
+
+def _lazy(target, *args, **kwargs):
+    """
+    Component modules are only imported when their components are actually scheduled. The tags declared on the returned
+    handlers must match the tags of the referenced classes.
+    """
+    return LazyHandler("shminspector.components." + target, *args, **kwargs)
+
+
+def register_components(registry: Registry, plugins_cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Registers the built-in components and the components of installed plugins, whose entry points are cached in
+    'plugins_cache_dir' (see register_plugins).
+    """
+    log_reactor = _lazy("debugreactor:DebugReactor")
+
+    registry.register_collector(NET_COMP_ID, _lazy("network:UrlConnectivityInfoCollector"))
+    registry.register_validator(NET_COMP_ID, _lazy("network:UrlConnectivityInfoValidator"))
     registry.register_reactor(NET_COMP_ID, log_reactor)
 
-    registry.register_collector(HARDWARE_COMP_ID, HardwareInfoCollector())
-    registry.register_validator(HARDWARE_COMP_ID, HardwareInfoValidator())
+    registry.register_collector(HARDWARE_COMP_ID, macos(_lazy("hardware:HardwareInfoCollector")))
+    registry.register_validator(HARDWARE_COMP_ID, _lazy("hardware:HardwareInfoValidator"))
     registry.register_reactor(HARDWARE_COMP_ID, log_reactor)
 
-    registry.register_collector(DISK_COMP_ID, DiskInfoCollector())
-    registry.register_validator(DISK_COMP_ID, DiskInfoValidator())
+    registry.register_collector(DISK_COMP_ID, _lazy("disk:DiskInfoCollector"))
+    registry.register_validator(DISK_COMP_ID, _lazy("disk:DiskInfoValidator"))
     registry.register_reactor(DISK_COMP_ID, log_reactor)
 
-    registry.register_collector(BREW_COMP_ID, HomebrewCommandCollectorValidator())
-    registry.register_validator(BREW_COMP_ID, HomebrewCommandCollectorValidator())
+    registry.register_collector(BREW_COMP_ID, macos(_lazy("brew:HomebrewCommandCollectorValidator")))
+    registry.register_validator(BREW_COMP_ID, macos(_lazy("brew:HomebrewCommandCollectorValidator")))
     registry.register_reactor(BREW_COMP_ID, log_reactor)
 
-    registry.register_collector(XCODE_COMP_ID, XcodeInfoCollector())
-    registry.register_validator(XCODE_COMP_ID, XcodeInfoValidator())
+    registry.register_collector(XCODE_COMP_ID, macos(_lazy("xcode:XcodeInfoCollector")))
+    registry.register_validator(XCODE_COMP_ID, macos(_lazy("xcode:XcodeInfoValidator")))
     registry.register_reactor(XCODE_COMP_ID, log_reactor)
 
-    registry.register_collector(BAZEL_COMP_ID, BazelInfoCollector())
-    registry.register_validator(BAZEL_COMP_ID, BazelInfoValidator())
+    registry.register_collector(BAZEL_COMP_ID, macos(timeout(120)(_lazy("bazel:BazelInfoCollector"))))
+    registry.register_validator(BAZEL_COMP_ID, _lazy("bazel:BazelInfoValidator"))
     registry.register_reactor(BAZEL_COMP_ID, log_reactor)
 
-    registry.register_collector(PYTHON_COMP_ID, PythonInfoCollector())
-    registry.register_validator(PYTHON_COMP_ID, PythonInfoValidator(expected_ver=SemVer("2", "7", "0")))
+    registry.register_collector(PYTHON_COMP_ID, _lazy("python:PythonInfoCollector"))
+    registry.register_validator(PYTHON_COMP_ID, _lazy("python:PythonInfoValidator", expected_ver=SemVer("2", "7", "0")))
     registry.register_reactor(PYTHON_COMP_ID, log_reactor)
 
-    registry.register_collector(PYTHON3_COMP_ID, PythonInfoCollector(binary_name="python3"))
-    registry.register_validator(PYTHON3_COMP_ID, PythonInfoStrictValidator(expected_ver=SemVer("3", "6", "8")))
+    registry.register_collector(PYTHON3_COMP_ID, _lazy("python:PythonInfoCollector", binary_name="python3"))
+    registry.register_validator(PYTHON3_COMP_ID, _lazy("python:PythonInfoStrictValidator",
+                                                       expected_ver=SemVer("3", "6", "8")))
     registry.register_reactor(PYTHON3_COMP_ID, log_reactor)
 
-    registry.register_collector(GCLOUD_COMP_ID, GCloudCommandCollectorValidator())
-    registry.register_validator(GCLOUD_COMP_ID, GCloudCommandCollectorValidator())
+    registry.register_collector(GCLOUD_COMP_ID, macos(_lazy("gcloud:GCloudCommandCollectorValidator")))
+    registry.register_validator(GCLOUD_COMP_ID, macos(_lazy("gcloud:GCloudCommandCollectorValidator")))
     registry.register_reactor(GCLOUD_COMP_ID, log_reactor)
 
-    registry.register_collector(GCLOUD_CONFIG_COMP_ID, GCloudConfigCollector())
-    registry.register_validator(GCLOUD_CONFIG_COMP_ID, GCloudConfigValidator())
+    registry.register_collector(GCLOUD_CONFIG_COMP_ID, macos(timeout(60)(_lazy("gcloud:GCloudConfigCollector"))))
+    registry.register_validator(GCLOUD_CONFIG_COMP_ID, macos(_lazy("gcloud:GCloudConfigValidator")))
     registry.register_reactor(GCLOUD_CONFIG_COMP_ID, log_reactor)
 
-    registry.register_collector(DOCKER_COMP_ID, DockerInfoCollector())
-    registry.register_validator(DOCKER_COMP_ID, DockerInfoValidator())
+    registry.register_collector(DOCKER_COMP_ID, macos(_lazy("docker:DockerInfoCollector")))
+    registry.register_validator(DOCKER_COMP_ID, macos(_lazy("docker:DockerInfoValidator")))
     registry.register_reactor(DOCKER_COMP_ID, log_reactor)
 
+    register_plugins(registry, cache_dir=plugins_cache_dir)
 
 
 def run_embedded(ctx):
+    # deferred, because the executor imports asyncio, which argument parsing and plan mode do not need
+    from shminspector.api.executor import Executor
     executor = Executor()
 
     def execute():
@@ -0,0 +1,103 @@
+"""
+A stdlib-only client for the status socket served by the daemon (see shminspector.statusserver). This module is meant
+to be imported by shell prompt hooks and editors, so it must not import anything else from this package.
+"""
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".cache", "shminspector", "status.sock")
+
+EXIT_OK = 0
+EXIT_PROBLEMS = 1
+EXIT_UNAVAILABLE = 2
+EXIT_UNKNOWN = 3
+
+
+class QueryError(Exception):
+    pass
+
+
+class UnknownComponentError(QueryError):
+    """
+    The daemon has no status for the component - it is unknown, or it was not checked yet.
+    """
+    pass
+
+
+def query(comp_id=None, socket_path=DEFAULT_SOCKET_PATH, timeout=1.0):
+    """
+    :param comp_id: a component id, or None for the status of all components
+    :return: the decoded response. See shminspector.statusserver for the response format
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(socket_path)
+            client.sendall("{}\n".format(comp_id or "").encode("utf-8"))
+
+            chunks = []
+            while True:
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError as err:
+        raise QueryError("Status daemon is not available at {} - {}".format(socket_path, err))
+
+    try:
+        response = json.loads(b"".join(chunks).decode("utf-8"))
+    except ValueError as err:
+        # an empty, truncated or garbled response - json.JSONDecodeError and UnicodeDecodeError are both ValueErrors
+        raise QueryError("Status daemon at {} sent an invalid response - {}".format(socket_path, err))
+
+    if "error" in response:
+        raise UnknownComponentError(response["error"])
+
+    return response
+
+
+def main(argv=None):
+    """
+    Prints the status of the specified component (or of all components) and exits with 0 if everything is OK, 1 if
+    problems were detected, 2 if the daemon is not available, or 3 if the daemon has no status for the component.
+    """
+    # deferred, so that prompt hooks importing this module for query() do not pay for it
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="envstatus",
+                                     description="Prints the latest component statuses served by the envinstall daemon "
+                                                 "(envinstall --daemon)",
+                                     epilog="exit codes: {} - OK, {} - problems detected, {} - daemon not available, "
+                                            "{} - unknown or not yet checked component"
+                                     .format(EXIT_OK, EXIT_PROBLEMS, EXIT_UNAVAILABLE, EXIT_UNKNOWN))
+    parser.add_argument("comp_id",
+                        nargs="?",
+                        default=None,
+                        metavar="component",
+                        help="the id of the component to print the status of (defaults to all components)")
+    comp_id = parser.parse_args(sys.argv[1:] if argv is None else argv).comp_id
+
+    try:
+        response = query(comp_id, socket_path=os.environ.get("SHMINSPECTOR_SOCKET", DEFAULT_SOCKET_PATH))
+    except UnknownComponentError as err:
+        print(err, file=sys.stderr)
+        return EXIT_UNKNOWN
+    except QueryError as err:
+        print(err, file=sys.stderr)
+        return EXIT_UNAVAILABLE
+
+    if comp_id is not None:
+        statuses = {comp_id: response["status"]}
+    else:
+        statuses = response["components"]
+
+    for name in sorted(statuses):
+        print("{}: {}".format(name, statuses[name]))
+
+    return EXIT_OK if all(status == "OK" for status in statuses.values()) else EXIT_PROBLEMS
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+
+from shminspector.api.validator import Status
+
+
+class StatusServer:
+    """
+    Serves the latest component statuses on a unix domain socket (see shminspector.query for the client).
+
+    A request is a single line holding a component id, or an empty line for all components. The response is a JSON
+    object, after which the connection is closed:
+
+    * component: {"id": <comp_id>, "status": <status name>, "checked_at": <epoch seconds>}
+    * all: {"components": {<comp_id>: <status name>, ...}, "checked_at": <epoch seconds>}
+    * failure: {"error": <message>}
+
+    Responses are encoded once per update rather than per request, so queries never touch the executor, collectors or
+    any lock.
+    """
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        # until the first check, every query is answered with an error
+        self._responses = {}
+        self._server = None
+        self._thread = None
+
+    def update(self, results, checked_at):
+        """
+        :param results: ComponentResult by comp_id
+        """
+        statuses = dict((comp_id, _status_name(result.status)) for comp_id, result in results.items())
+        responses = dict(
+            (comp_id, _encode({"id": comp_id, "status": status, "checked_at": checked_at}))
+            for comp_id, status in statuses.items()
+        )
+        responses[""] = _encode({"components": statuses, "checked_at": checked_at})
+
+        # replaced as a whole, so handler threads always see a consistent snapshot
+        self._responses = responses
+
+    def start(self):
+        _remove_stale_socket(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+
+        self._server = _ThreadingUnixStreamServer(self.socket_path, _handler_for(self))
+        os.chmod(self.socket_path, 0o600)
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.1},
+                                        name="status-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def response_for(self, comp_id):
+        response = self._responses.get(comp_id)
+        if response is None and comp_id == "":
+            response = _encode({"error": "No components were checked yet"})
+        elif response is None:
+            response = _encode({"error": "Unknown component '{}', or it was not checked yet".format(comp_id)})
+
+        return response
+
+
+class _ThreadingUnixStreamServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # prompt hooks of many terminals might connect at once
+    request_queue_size = 128
+
+
+def _handler_for(status_server):
+    class _StatusRequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            comp_id = self.rfile.readline(1024).decode("utf-8").strip()
+            self.wfile.write(status_server.response_for(comp_id))
+
+    return _StatusRequestHandler
+
+
+def _remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+        else:
+            raise Exception("Another daemon is already serving on {}".format(socket_path))
+
+
+def _status_name(status):
+    return Status.OK.name if status is None else status.name
+
+
+def _encode(response):
+    return json.dumps(response).encode("utf-8")
@@ -1,46 +1,164 @@
 import os
 import shutil
+import signal
 import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+from time import time
 
+from shminspector.util import trace, spawnaudit
 from shminspector.util.logger import NOOP_LOGGER
 
 
+# Before Python 3.8 asyncio subprocesses need a child watcher that is attached to the running loop from the main thread,
+# which executor loops (e.g. the one Executor.stream runs on a background thread) do not have. Asynchronous commands are
+# executed on a worker thread instead.
+_ASYNC_SUBPROCESSES = sys.version_info >= (3, 8)
+
+
+class ProcessScope:
+    """
+    Tracks the child processes spawned on behalf of a single component, so that they can all be killed (along with
+    their process groups) once the component runs out of time.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.killed = False
+        self._processes = set()
+        self._lock = threading.Lock()
+
+    def add(self, popen):
+        with self._lock:
+            self._processes.add(popen)
+            if self.killed:
+                _kill(popen)
+
+    def remove(self, popen):
+        with self._lock:
+            self._processes.discard(popen)
+
+    def kill_all(self):
+        with self._lock:
+            self.killed = True
+            for popen in self._processes:
+                _kill(popen)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def process_scope(scope: ProcessScope):
+    """
+    Associates every process spawned by the current thread with the specified scope.
+    """
+    previous = getattr(_local, "scope", None)
+    _local.scope = scope
+    try:
+        yield scope
+    finally:
+        _local.scope = previous
+
+
+def current_process_scope():
+    """
+    :return: the scope of the processes spawned by the current thread, or None
+    """
+    return getattr(_local, "scope", None)
+
+
 def is_command(executable_name):
     return shutil.which(executable_name) is not None
 
 
-def execute(cmd, additional_env=None):
-    completed_process = subprocess.run(cmd,
-                                       env=_envvars(additional_env),
-                                       stdout=subprocess.PIPE,
-                                       stderr=subprocess.STDOUT,
-                                       encoding='utf-8')
+def execute(cmd, additional_env=None, timeout=None):
+    code, output = _run(cmd, additional_env, timeout)
 
-    if completed_process.returncode != 0:
-        raise Exception("Failed to execute command '{}'! output: {}".format(cmd, completed_process.stdout))
+    if code != 0:
+        raise Exception("Failed to execute command '{}'! output: {}".format(cmd, output))
 
-    return completed_process.stdout
+    return output
 
 
-def try_execute(cmd, additional_env=None, logger=NOOP_LOGGER):
+def try_execute(cmd, additional_env=None, logger=NOOP_LOGGER, timeout=None):
 
     try:
-        completed_process = subprocess.run(cmd,
-                                           env=_envvars(additional_env),
-                                           stdout=subprocess.PIPE,
-                                           stderr=subprocess.STDOUT,
-                                           encoding='utf-8')
+        code, output = _run(cmd, additional_env, timeout)
+
+        return True, code, output
+    except FileNotFoundError as err:
+        logger.debug(err)
+        return False, -1, None
+    except subprocess.TimeoutExpired as err:
+        logger.warn(err)
+        return True, -1, err.output
+
+
+async def try_execute_async(cmd, additional_env=None, logger=NOOP_LOGGER, timeout=None):
+    """
+    Asynchronous variant of try_execute for components implementing the asynchronous protocol. If the awaiting task is
+    cancelled (e.g. by a component timeout), the process group is killed.
+    """
+    import asyncio
 
-        return True, completed_process.returncode, completed_process.stdout
+    if not _ASYNC_SUBPROCESSES:
+        return await _try_execute_on_thread(cmd, additional_env, logger, timeout)
+
+    start_time = time()
+    try:
+        process = await asyncio.create_subprocess_exec(*cmd,
+                                                       env=_envvars(additional_env),
+                                                       stdout=subprocess.PIPE,
+                                                       stderr=subprocess.STDOUT,
+                                                       start_new_session=True)
     except FileNotFoundError as err:
         logger.debug(err)
         return False, -1, None
 
+    # the output is read by a task of its own, so that the output read so far is not lost when the command times out
+    reading = asyncio.ensure_future(process.stdout.read())
+    try:
+        output = await asyncio.wait_for(asyncio.shield(reading), timeout=timeout)
+        await process.wait()
+    except asyncio.TimeoutError:
+        _kill_process_group(process.pid)
+        output = await reading
+        await process.wait()
+        logger.warn("Command '{}' timed out after {} seconds".format(" ".join(cmd), timeout))
+        return True, -1, output.decode("utf-8")
+    except asyncio.CancelledError:
+        _kill_process_group(process.pid)
+        reading.cancel()
+        raise
+    finally:
+        # asyncio reaps its children by itself, so their resource usage is not available
+        _record_process(cmd, process.pid, process.returncode, start_time, rusage=None)
+
+    return True, process.returncode, output.decode("utf-8")
+
+
+async def _try_execute_on_thread(cmd, additional_env, logger, timeout):
+    import asyncio
 
-def try_capture_output(cmd, target_dir_path, file_name, additional_env=None, logger=NOOP_LOGGER):
+    scope = ProcessScope(" ".join(cmd))
+
+    def execute_in_scope():
+        with process_scope(scope):
+            return try_execute(cmd, additional_env=additional_env, logger=logger, timeout=timeout)
+
+    try:
+        return await asyncio.get_event_loop().run_in_executor(None, execute_in_scope)
+    except asyncio.CancelledError:
+        scope.kill_all()
+        raise
+
+
+def try_capture_output(cmd, target_dir_path, file_name, additional_env=None, logger=NOOP_LOGGER, timeout=None):
     cmd_string = " ".join(cmd)
 
-    ok, code, output = try_execute(cmd, additional_env=additional_env, logger=logger)
+    ok, code, output = try_execute(cmd, additional_env=additional_env, logger=logger, timeout=timeout)
 
     if not ok:
         logger.warn("Failed to execute '{}'".format(cmd_string))
@@ -51,25 +169,163 @@ def try_capture_output(cmd, target_dir_path, file_name, additional_env=None, log
         target_file_path = "{}/{}".format(target_dir_path, file_name)
         logger.progress("Writing '{}' to {}".format(cmd_string, target_file_path))
         with open(target_file_path, 'w') as info_file:
-            info_file.write(output)
+            info_file.write(output or "")
 
     return ok
 
 
-def execute_with_streamed_output(cmd, additional_env=None):
+def execute_with_streamed_output(cmd, additional_env=None, timeout=None):
+    """
+    Note that streamed commands might be interactive (e.g. sudo asking for a password), so unlike the other functions
+    in this module, they stay in the caller's process group and only the process itself is killed on timeout.
+    """
+    popen = _spawn(cmd, additional_env, universal_newlines=True)
+    watchdog = _watchdog_for(popen, timeout)
+    try:
+        for line in iter(popen.stdout.readline, ""):
+            yield line
+
+        popen.stdout.close()
+
+        return_code = _wait(popen)
+    finally:
+        _release(popen, watchdog)
+
+    if watchdog is not None and watchdog.expired:
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    if return_code != 0:
+        raise subprocess.CalledProcessError(return_code, cmd)
+
+
+def _run(cmd, additional_env, timeout):
+    popen = _spawn(cmd, additional_env, encoding="utf-8", start_new_session=True)
+    watchdog = _watchdog_for(popen, timeout)
+    try:
+        output = popen.stdout.read()
+        popen.stdout.close()
+        _wait(popen)
+    finally:
+        _release(popen, watchdog)
+
+    if watchdog is not None and watchdog.expired:
+        raise subprocess.TimeoutExpired(cmd, timeout, output=output)
+
+    return popen.returncode, output
+
+
+def _spawn(cmd, additional_env, **kwargs):
     popen = subprocess.Popen(cmd,
                              env=_envvars(additional_env),
                              stdout=subprocess.PIPE,
                              stderr=subprocess.STDOUT,
-                             universal_newlines=True)
-    for line in iter(popen.stdout.readline, ""):
-        yield line
+                             **kwargs)
+    popen.own_process_group = kwargs.get("start_new_session", False)
+    popen.start_time = time()
+    popen.rusage = None
+    # guards reaping the process against signalling it (see _wait and _kill), so a reaped pid is never signalled
+    popen.reap_lock = threading.Lock()
 
-    popen.stdout.close()
+    scope = getattr(_local, "scope", None)
+    if scope is not None:
+        scope.add(popen)
 
-    return_code = popen.wait()
-    if return_code != 0:
-        raise subprocess.CalledProcessError(return_code, cmd)
+    return popen
+
+
+def _release(popen, watchdog=None):
+    if watchdog is not None:
+        watchdog.cancel()
+
+    scope = getattr(_local, "scope", None)
+    if scope is not None:
+        scope.remove(popen)
+
+    _record_process(popen.args, popen.pid, popen.returncode, popen.start_time, popen.rusage,
+                    group=scope.name if scope is not None else None)
+
+
+def _record_process(cmd, pid, return_code, start_time, rusage, group=None):
+    end_time = time()
+
+    audit = spawnaudit.active_audit()
+    if audit is not None:
+        audit.add(group, cmd, end_time - start_time, rusage, return_code)
+
+    tracer = trace.active_tracer()
+    if tracer is not None:
+        argv = list(str(arg) for arg in cmd)
+        args = {"argv": argv, "pid": pid, "returncode": return_code}
+        if rusage is not None:
+            args.update({"user_time": rusage.ru_utime, "system_time": rusage.ru_stime})
+        tracer.complete(os.path.basename(argv[0]), "subprocess", start_time, end_time, lane=group, args=args)
+
+
+def _wait(popen):
+    """
+    Waits for the process like Popen.wait, except that the process is reaped with os.wait4, so that its resource usage
+    is kept in 'popen.rusage'.
+    """
+    if hasattr(os, "waitid"):
+        try:
+            # waits for the process to exit without reaping it, so that it can still be killed meanwhile
+            os.waitid(os.P_PID, popen.pid, os.WEXITED | os.WNOWAIT)
+        except ChildProcessError:
+            pass
+
+    with popen.reap_lock:
+        if popen.returncode is None:
+            try:
+                _, status, popen.rusage = os.wait4(popen.pid, 0)
+                popen.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+            except ChildProcessError:
+                # already reaped elsewhere
+                popen.wait()
+
+    return popen.returncode
+
+
+class _Watchdog:
+    def __init__(self, popen, timeout):
+        self.expired = False
+        self._popen = popen
+        self._timer = threading.Timer(timeout, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self):
+        self.expired = True
+        _kill(self._popen)
+
+    def cancel(self):
+        self._timer.cancel()
+
+
+def _watchdog_for(popen, timeout):
+    return _Watchdog(popen, timeout) if timeout is not None else None
+
+
+def _kill(popen):
+    with popen.reap_lock:
+        if popen.returncode is not None:
+            return
+
+        # the process is not reaped yet, so its pid cannot have been reused. Unlike Popen.kill, signalling it directly
+        # does not reap it, which would lose its resource usage
+        if popen.own_process_group:
+            _kill_process_group(popen.pid)
+        else:
+            try:
+                os.kill(popen.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+def _kill_process_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
 
 
 def _envvars(custom=None):
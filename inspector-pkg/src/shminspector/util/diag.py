@@ -1,6 +1,7 @@
 import functools
 from time import time
 
+from shminspector.util import trace
 from shminspector.util.logger import ConsoleLogger
 
 _logger = ConsoleLogger()
@@ -11,7 +12,8 @@ def timeit_if(more_than_sec=0, alt_text=None):
         @functools.wraps(func)
         def wrapper_timer(*args, **kwargs):
             start_time = time()
-            value = func(*args, **kwargs)
+            with trace.span(func.__qualname__, "function"):
+                value = func(*args, **kwargs)
             end_time = time()
             run_time = end_time - start_time
             if run_time >= more_than_sec:
@@ -1,7 +1,5 @@
 import logging
-import logging.handlers as handlers
 from abc import abstractmethod
-from typing import Any
 
 _ERASE_LINE = '\u001b[2K'
 _WHITE = "\u001b[37m"
@@ -14,27 +12,53 @@ _REVERSE = "\u001b[7m"
 
 
 class Logger(object):
+    """
+    Messages are formatted only if they are actually logged. A message is either:
+
+    * a format string with its arguments, e.g. logger.debug("{} - serving cached data", comp_id)
+    * a function that returns the message, e.g. logger.debug(lambda: "Handlers: {}".format(stringify(handler)))
+    * any other object, which is logged as is (exceptions are logged along with their traceback where supported)
+    """
+
+    # the level each of the logging methods logs at
+    LEVELS = {
+        "progress": logging.INFO,
+        "debug": logging.DEBUG,
+        "info": logging.INFO,
+        "warn": logging.WARNING,
+        "error": logging.ERROR,
+        "success": logging.INFO,
+        "failure": logging.ERROR,
+        "command_info": logging.INFO,
+        "command_output": logging.INFO,
+    }
+
+    def is_enabled(self, method_name):
+        """
+        :return: False if messages logged with the specified method are filtered out by the logger's level
+        """
+        return True
 
     @abstractmethod
-    def progress(self, message): pass
+    def progress(self, message, *args): pass
 
     @abstractmethod
-    def debug(self, message): pass
+    def debug(self, message, *args): pass
 
     @abstractmethod
-    def info(self, message): pass
+    def info(self, message, *args): pass
 
     @abstractmethod
-    def warn(self, message): pass
+    def warn(self, message, *args): pass
 
     @abstractmethod
-    def error(self, message): pass
+    def error(self, message, *args): pass
 
     @abstractmethod
-    def success(self, message): pass
+    def success(self, message, *args): pass
 
     @abstractmethod
-    def failure(self, message): pass
+    def failure(self, message, *args): pass
 
     @abstractmethod
     def command_info(self, command): pass
@@ -43,16 +67,42 @@ class Logger(object):
     def command_output(self, output): pass
 
 
+def render(message, args=()):
+    """
+    :return: the text of a deferred message (see Logger), or the message itself if it is neither a format string with
+    arguments nor a function
+    """
+    if len(args) > 0:
+        return message.format(*args)
+
+    if callable(message) and not isinstance(message, type):
+        return message()
+
+    return message
+
+
 class ConsoleLogger(Logger):
-    def __init__(self, level=logging.INFO):
+    """
+    Logs to the shared 'console' logger. Without a level, the logger is only configured (at INFO level) if nothing
+    configured it yet, so that modules creating their own ConsoleLogger on import do not reset the level of the one
+    created for the run (e.g. DEBUG when running with --debug).
+    """
+
+    def __init__(self, level=None):
         self.logger = logging.getLogger("console")
+        if level is None and len(self.logger.handlers) > 0:
+            return
+
         self.logger.handlers.clear()
         stream_handler = logging.StreamHandler()
         stream_handler.terminator = ""
         self.logger.addHandler(stream_handler)
-        self.logger.setLevel(level)
+        self.logger.setLevel(level if level is not None else logging.INFO)
+
+    def is_enabled(self, method_name):
+        return self.logger.isEnabledFor(self.LEVELS[method_name])
 
-    def progress(self, message):
+    def progress(self, message, *args):
         if self.logger.level == logging.DEBUG:
             term = "\n"
             style = _WHITE
@@ -60,25 +110,26 @@ class ConsoleLogger(Logger):
             style = _REVERSE
             term = "\r"
 
-        self.logger.info("{}- {}{}{}{}".format(_ERASE_LINE, style, message, _RESET, term))
+        self.logger.info("{}- {}{}{}{}".format(_ERASE_LINE, style, render(message, args), _RESET, term))
 
-    def debug(self, message):
-        self.logger.debug("{}- {}{}\n".format(_ERASE_LINE, message, _RESET))
+    def debug(self, message, *args):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("{}- {}{}\n".format(_ERASE_LINE, render(message, args), _RESET))
 
-    def info(self, message):
-        self.logger.info("{}- {}{}{}{}\n".format(_ERASE_LINE, _BOLD, _WHITE, message, _RESET))
+    def info(self, message, *args):
+        self.logger.info("{}- {}{}{}{}\n".format(_ERASE_LINE, _BOLD, _WHITE, render(message, args), _RESET))
 
-    def warn(self, message):
-        self.logger.warning("{}- {}{}{}\n".format(_ERASE_LINE, _YELLOW, message, _RESET))
+    def warn(self, message, *args):
+        self.logger.warning("{}- {}{}{}\n".format(_ERASE_LINE, _YELLOW, render(message, args), _RESET))
 
-    def error(self, message):
-        self.logger.error("{}- {}{}{}\n".format(_ERASE_LINE, _RED, message, _RESET))
+    def error(self, message, *args):
+        self.logger.error("{}- {}{}{}\n".format(_ERASE_LINE, _RED, render(message, args), _RESET))
 
-    def success(self, message):
-        self.logger.info("{}- {}{}{}{}{}\n".format(_ERASE_LINE, _REVERSE, _BOLD, _GREEN, message, _RESET))
+    def success(self, message, *args):
+        self.logger.info("{}- {}{}{}{}{}\n".format(_ERASE_LINE, _REVERSE, _BOLD, _GREEN, render(message, args), _RESET))
 
-    def failure(self, message):
-        self.logger.error("{}- {}{}{}{}\n".format(_ERASE_LINE, _REVERSE, _RED, message, _RESET))
+    def failure(self, message, *args):
+        self.logger.error("{}- {}{}{}{}\n".format(_ERASE_LINE, _REVERSE, _RED, render(message, args), _RESET))
 
     def command_info(self, command):
         self.logger.info("{}\t~ {}{}{}{}\n".format(_ERASE_LINE, _REVERSE, _YELLOW, command, _RESET))
@@ -88,8 +139,12 @@ class ConsoleLogger(Logger):
 
 
 class FileLogger(Logger):
+    LEVELS = dict(Logger.LEVELS, progress=logging.DEBUG)
 
     def __init__(self, filename, level=logging.INFO):
+        # logging.handlers imports socket and pickle, which only file logging needs
+        import logging.handlers as handlers
+
         file_handler = handlers.RotatingFileHandler(filename=filename, mode="a", maxBytes=1024 * 1000, backupCount=3)
         file_handler.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s"))
 
@@ -97,29 +152,34 @@ class FileLogger(Logger):
         self.logger.setLevel(level)
         self.logger.addHandler(file_handler)
 
-    def progress(self, message):
-        self.logger.debug(message)
+    def is_enabled(self, method_name):
+        return self.logger.isEnabledFor(self.LEVELS[method_name])
 
-    def debug(self, message):
-        self.logger.debug(message, exc_info=self._exc_info(message))
+    def progress(self, message, *args):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(render(message, args))
 
-    def info(self, message):
-        self.logger.info(message)
+    def debug(self, message, *args):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(render(message, args), exc_info=self._exc_info(message))
 
-    def warn(self, message):
-        self.logger.warning(message, exc_info=self._exc_info(message))
+    def info(self, message, *args):
+        self.logger.info(render(message, args))
 
-    def error(self, message):
-        self.logger.error(message, exc_info=self._exc_info(message))
+    def warn(self, message, *args):
+        self.logger.warning(render(message, args), exc_info=self._exc_info(message))
 
-    def success(self, message):
-        self.logger.info(message)
+    def error(self, message, *args):
+        self.logger.error(render(message, args), exc_info=self._exc_info(message))
 
-    def failure(self, message):
-        self.logger.error(message, exc_info=self._exc_info(message))
+    def success(self, message, *args):
+        self.logger.info(render(message, args))
+
+    def failure(self, message, *args):
+        self.logger.error(render(message, args), exc_info=self._exc_info(message))
 
     def command_info(self, command):
-        self.info("[Command]: {}".format(command))
+        self.info("[Command]: {}", command)
 
     def command_output(self, output):
         self.logger.info(output.strip())
@@ -130,45 +190,100 @@ class FileLogger(Logger):
 
 
 class NoopLogger(Logger):
-    def __getattribute__(self, name: str) -> Any:
-        return lambda *args, **kwrgs: None
+    def is_enabled(self, method_name):
+        return False
 
+    def progress(self, message, *args):
+        pass
 
-class CompositeLogger(Logger):
-    def __init__(self, loggers):
-        self.loggers = loggers
+    def debug(self, message, *args):
+        pass
+
+    def info(self, message, *args):
+        pass
 
-    def progress(self, message):
-        self._all("progress", message)
+    def warn(self, message, *args):
+        pass
 
-    def debug(self, message):
-        self._all("debug", message)
+    def error(self, message, *args):
+        pass
 
-    def info(self, message):
-        self._all("info", message)
+    def success(self, message, *args):
+        pass
 
-    def warn(self, message):
-        self._all("warn", message)
+    def failure(self, message, *args):
+        pass
 
-    def error(self, message):
-        self._all("error", message)
+    def command_info(self, command):
+        pass
 
-    def success(self, message):
-        self._all("success", message)
+    def command_output(self, output):
+        pass
 
-    def failure(self, message):
-        self._all("failure", message)
+
+class CompositeLogger(Logger):
+    """
+    Dispatches every message to the loggers that log it at their level. The levels of the loggers are checked once,
+    when the composite is created, so a message that all the loggers filter out costs a call and nothing else - in
+    particular, deferred messages are never formatted.
+    """
+
+    def __init__(self, loggers):
+        self.loggers = loggers
+        self._progress = self._enabled("progress")
+        self._debug = self._enabled("debug")
+        self._info = self._enabled("info")
+        self._warn = self._enabled("warn")
+        self._error = self._enabled("error")
+        self._success = self._enabled("success")
+        self._failure = self._enabled("failure")
+        self._command_info = self._enabled("command_info")
+        self._command_output = self._enabled("command_output")
+
+    def is_enabled(self, method_name):
+        return any(logger.is_enabled(method_name) for logger in self.loggers)
+
+    def progress(self, message, *args):
+        for progress in self._progress:
+            progress(message, *args)
+
+    def debug(self, message, *args):
+        for debug in self._debug:
+            debug(message, *args)
+
+    def info(self, message, *args):
+        for info in self._info:
+            info(message, *args)
+
+    def warn(self, message, *args):
+        for warn in self._warn:
+            warn(message, *args)
+
+    def error(self, message, *args):
+        for error in self._error:
+            error(message, *args)
+
+    def success(self, message, *args):
+        for success in self._success:
+            success(message, *args)
+
+    def failure(self, message, *args):
+        for failure in self._failure:
+            failure(message, *args)
 
     def command_info(self, command):
-        self._all("command_info", command)
+        for command_info in self._command_info:
+            command_info(command)
 
     def command_output(self, output):
-        self._all("command_output", output)
-
-    def _all(self, fn_name, *args, **kwargs):
-        for logger in self.loggers:
-            fn = getattr(logger, fn_name)
-            fn(*args, **kwargs)
+        for command_output in self._command_output:
+            command_output(output)
+
+    def _enabled(self, method_name):
+        """
+        :return: the bound methods of the loggers that log messages of the specified method
+        """
+        return tuple(getattr(logger, method_name) for logger in self.loggers if logger.is_enabled(method_name))
 
 
 NOOP_LOGGER = NoopLogger()
@@ -0,0 +1,188 @@
+import cProfile
+import io
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+from shminspector.util.logger import NOOP_LOGGER
+
+REPORT_FILE_NAME = "report.txt"
+
+
+class Profiler:
+    """
+    Profiles individual calls with cProfile and writes one pstats file per call name into 'directory'.
+    """
+
+    def __init__(self, directory, logger=NOOP_LOGGER):
+        self.directory = directory
+        self._logger = logger
+        self._stats_file_paths = []
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def run(self, name, fn, *args):
+        profile = cProfile.Profile()
+        if not _try_enable(profile):
+            self._logger.warn("Not profiling '{}' - it overlaps another profiled call, and this Python version "
+                              "profiles a single call at a time (use --jobs 1 to profile every call)", name)
+            return fn(*args)
+
+        try:
+            return fn(*args)
+        finally:
+            profile.disable()
+            self._dump(name, profile)
+
+    async def run_async(self, name, coroutine_fn, *args):
+        """
+        Profiles a coroutine function. Profiling is only on while the coroutine itself runs, so other tasks running on
+        the event loop in between its steps are not part of its profile.
+        """
+        profile = cProfile.Profile()
+        coroutine = _ProfiledCoroutine(coroutine_fn(*args), profile)
+        try:
+            return await coroutine
+        finally:
+            self._dump(name, profile)
+            if coroutine.skipped_steps > 0:
+                self._logger.warn("The profile of '{}' is partial - {} of its steps overlapped other profiled calls, "
+                                  "and this Python version profiles a single call at a time", name,
+                                  coroutine.skipped_steps)
+
+    def report(self, top=30):
+        """
+        Merges all the recorded stats into a report of the top hotspots by cumulative and internal time, and writes it to
+        'report.txt' in the profile directory.
+
+        :return: the report text, or None if nothing was profiled
+        """
+        with self._lock:
+            stats_file_paths = list(self._stats_file_paths)
+
+        if len(stats_file_paths) == 0:
+            return None
+
+        import pstats
+
+        output = io.StringIO()
+        stats = pstats.Stats(*stats_file_paths, stream=output)
+        stats.strip_dirs()
+        output.write("Merged profile of {} call(s) from {}\n".format(len(stats_file_paths), self.directory))
+        for sort_key in ("cumulative", "tottime"):
+            output.write("\nTop {} by {}:\n".format(top, sort_key))
+            stats.sort_stats(sort_key).print_stats(top)
+
+        text = output.getvalue()
+        with open(os.path.join(self.directory, REPORT_FILE_NAME), "w") as report_file:
+            report_file.write(text)
+
+        return text
+
+    def _dump(self, name, profile):
+        base_name = re.sub(r"[^\w.-]", "_", name)
+        with self._lock:
+            file_path = os.path.join(self.directory, "{}.pstats".format(base_name))
+            index = 1
+            while file_path in self._stats_file_paths:
+                index += 1
+                file_path = os.path.join(self.directory, "{}.{}.pstats".format(base_name, index))
+            self._stats_file_paths.append(file_path)
+
+        profile.dump_stats(file_path)
+
+
+class _ProfiledCoroutine:
+    def __init__(self, coroutine, profile):
+        self._coroutine = coroutine
+        self._profile = profile
+        self.skipped_steps = 0
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            enabled = _try_enable(self._profile)
+            if not enabled:
+                self.skipped_steps += 1
+            try:
+                if error is not None:
+                    yielded = self._coroutine.throw(error)
+                else:
+                    yielded = self._coroutine.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if enabled:
+                    self._profile.disable()
+
+            try:
+                value, error = (yield yielded), None
+            except BaseException as err:
+                value, error = None, err
+
+
+def _try_enable(profile):
+    try:
+        profile.enable()
+        return True
+    except ValueError:
+        # newer Python versions support a single active profiler at a time, so concurrent calls are not profiled
+        return False
+
+
+_active_profiler = None
+
+
+def active_profiler():
+    """
+    :return: the profiler of the current run, or None if profiling is off
+    """
+    return _active_profiler
+
+
+@contextmanager
+def profiling(directory, logger, top=30):
+    """
+    Activates a profiler for the duration of the block and logs a merged hotspots report at the end. Does nothing if
+    'directory' is None.
+    """
+    global _active_profiler
+
+    if directory is None:
+        yield None
+        return
+
+    profiler = Profiler(directory, logger)
+    previous, _active_profiler = _active_profiler, profiler
+    try:
+        yield profiler
+    finally:
+        _active_profiler = previous
+        report = profiler.report(top)
+        if report is not None:
+            logger.info(report)
+            logger.info("Profiles written to {}".format(directory))
+
+
+def profiled(name, fn, *args):
+    """
+    Calls fn under the active profiler, if any.
+    """
+    profiler = _active_profiler
+    if profiler is None:
+        return fn(*args)
+    else:
+        return profiler.run(name, fn, *args)
+
+
+async def profiled_async(name, coroutine_fn, *args):
+    """
+    Awaits coroutine_fn under the active profiler, if any.
+    """
+    profiler = _active_profiler
+    if profiler is None:
+        return await coroutine_fn(*args)
+    else:
+        return await profiler.run_async(name, coroutine_fn, *args)
@@ -0,0 +1,127 @@
+import sys
+import threading
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
+
+SpawnRecord = namedtuple(typename="SpawnRecord",
+                         field_names=["group", "argv", "wall_time", "user_time", "system_time", "max_rss", "return_code"])
+"""
+Resource usage of a single child process. 'group' is the name of the ProcessScope that spawned it (usually a component
+id) or None. CPU times are in seconds and 'max_rss' is in bytes. Resource usage fields are None when unavailable, e.g.
+for processes spawned by asyncio.
+"""
+
+UNGROUPED = "(no component)"
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+_MAX_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+class SpawnAudit:
+    def __init__(self):
+        self._records = []
+        self._lock = threading.Lock()
+
+    def add(self, group, argv, wall_time, rusage, return_code):
+        record = SpawnRecord(
+            group=group,
+            argv=list(str(arg) for arg in argv),
+            wall_time=wall_time,
+            user_time=rusage.ru_utime if rusage is not None else None,
+            system_time=rusage.ru_stime if rusage is not None else None,
+            max_rss=rusage.ru_maxrss * _MAX_RSS_UNIT if rusage is not None else None,
+            return_code=return_code
+        )
+        with self._lock:
+            self._records.append(record)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def grouped_records(self):
+        """
+        :return: an ordered dictionary of records by group, ordered by the total wall time of each group (descending)
+        """
+        groups = {}
+        for record in self.records():
+            groups.setdefault(record.group or UNGROUPED, []).append(record)
+
+        ordered_groups = sorted(groups.items(), key=lambda item: -sum(record.wall_time for record in item[1]))
+        return OrderedDict(
+            (group, sorted(records, key=lambda record: -record.wall_time)) for group, records in ordered_groups
+        )
+
+    def table(self):
+        lines = ["{:<32} {:>8} {:>8} {:>8} {:>9} {:>5}  {}".format("COMPONENT", "WALL(s)", "USER(s)", "SYS(s)",
+                                                                    "RSS(MB)", "CODE", "COMMAND")]
+        for group, records in self.grouped_records().items():
+            for record in records:
+                lines.append("{:<32} {:>8.3f} {:>8} {:>8} {:>9} {:>5}  {}".format(
+                    group,
+                    record.wall_time,
+                    _format_optional(record.user_time, "{:.3f}"),
+                    _format_optional(record.system_time, "{:.3f}"),
+                    _format_optional(record.max_rss / (1024 * 1024) if record.max_rss is not None else None,
+                                     "{:.1f}"),
+                    _format_optional(record.return_code, "{}"),
+                    _shorten(" ".join(record.argv), 80)
+                ))
+
+            lines.append("{:<32} {:>8.3f} {:>8} {:>8}  ({} process(es))".format(
+                group + " total",
+                sum(record.wall_time for record in records),
+                _format_optional(_sum_of(record.user_time for record in records), "{:.3f}"),
+                _format_optional(_sum_of(record.system_time for record in records), "{:.3f}"),
+                len(records)
+            ))
+
+        return "\n".join(lines)
+
+
+_active_audit = None
+
+
+def active_audit():
+    """
+    :return: the spawn audit of the current run, or None if auditing is off
+    """
+    return _active_audit
+
+
+@contextmanager
+def auditing(ctx):
+    """
+    Records every process spawned through shminspector.util.cmd for the duration of the block, and logs a spawn audit
+    table at the end. Only active in debug mode.
+    """
+    global _active_audit
+
+    if not ctx.flags.debug:
+        yield None
+        return
+
+    audit = SpawnAudit()
+    previous, _active_audit = _active_audit, audit
+    try:
+        yield audit
+    finally:
+        _active_audit = previous
+        if len(audit.records()) > 0:
+            ctx.logger.debug("Spawn audit:\n{}".format(audit.table()))
+
+
+def _sum_of(values):
+    values = list(values)
+    if any(value is None for value in values):
+        return None
+
+    return sum(values)
+
+
+def _format_optional(value, value_format):
+    return value_format.format(value) if value is not None else "-"
+
+
+def _shorten(text, max_length):
+    return text if len(text) <= max_length else text[:max_length - 3] + "..."
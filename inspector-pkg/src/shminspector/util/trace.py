@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from time import time
+
+
+class Tracer:
+    """
+    Records spans in the Chrome trace event format, which can be opened with Perfetto (https://ui.perfetto.dev) or
+    chrome://tracing.
+
+    Spans are laid out on named lanes (rendered as threads). By default a span goes to the lane of the thread that records
+    it, but any lane name can be used, e.g. a component id.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self._events = []
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def complete(self, name, category, start_time, end_time, lane=None, args=None):
+        """
+        Records a span with the specified start and end times (seconds since the epoch).
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": _micros(start_time),
+            "dur": _micros(end_time - start_time),
+            "pid": self.pid,
+            "tid": self._lane_id(lane if lane is not None else threading.current_thread().name),
+        }
+        if args is not None:
+            event["args"] = args
+
+        with self._lock:
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, name, category, lane=None, args=None):
+        start_time = time()
+        try:
+            yield
+        finally:
+            self.complete(name, category, start_time, time(), lane=lane, args=args)
+
+    def trace_events(self):
+        with self._lock:
+            lanes = list(self._lanes.items())
+            events = list(self._events)
+
+        metadata = list(
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": lane_id, "args": {"name": lane}}
+            for lane, lane_id in lanes
+        )
+
+        return metadata + events
+
+    def write(self, file_path):
+        with open(file_path, "w") as trace_file:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, trace_file)
+
+    def _lane_id(self, lane):
+        with self._lock:
+            lane_id = self._lanes.get(lane)
+            if lane_id is None:
+                lane_id = len(self._lanes) + 1
+                self._lanes[lane] = lane_id
+
+            return lane_id
+
+
+_active_tracer = None
+
+
+def active_tracer():
+    """
+    :return: the tracer of the current run, or None if tracing is off
+    """
+    return _active_tracer
+
+
+@contextmanager
+def tracing(file_path):
+    """
+    Activates a tracer for the duration of the block and writes its trace to 'file_path' at the end. Does nothing if
+    'file_path' is None.
+    """
+    global _active_tracer
+
+    if file_path is None:
+        yield None
+        return
+
+    tracer = Tracer()
+    previous, _active_tracer = _active_tracer, tracer
+    try:
+        yield tracer
+    finally:
+        _active_tracer = previous
+        tracer.write(file_path)
+
+
+@contextmanager
+def span(name, category, lane=None, args=None):
+    """
+    Records a span on the active tracer, if any.
+    """
+    tracer = _active_tracer
+    if tracer is None:
+        yield
+    else:
+        with tracer.span(name, category, lane=lane, args=args):
+            yield
+
+
+def _micros(seconds):
+    return int(seconds * 1000000)
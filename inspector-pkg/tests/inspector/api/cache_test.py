@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from collections import namedtuple
+
+from shminspector.api.cache import CollectorCache, files_fingerprint, binary_fingerprint
+
+Data = namedtuple(typename="Data", field_names=["value"])
+
+
+class CollectorCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = CollectorCache(cache_dir=tempfile.mkdtemp(prefix="cache-test-"))
+
+    def test_miss(self):
+        self.assertEqual((False, None), self.cache.get("id", CollectorA(), "fingerprint"))
+
+    def test_hit(self):
+        self.cache.put("id", CollectorA(), "fingerprint", Data("x"))
+
+        self.assertEqual((True, Data("x")), self.cache.get("id", CollectorA(), "fingerprint"))
+
+    def test_fingerprint_mismatch(self):
+        self.cache.put("id", CollectorA(), "fingerprint", Data("x"))
+
+        self.assertEqual((False, None), self.cache.get("id", CollectorA(), "other"))
+
+    def test_collector_mismatch(self):
+        self.cache.put("id", CollectorA(), "fingerprint", Data("x"))
+
+        self.assertEqual((False, None), self.cache.get("id", CollectorB(), "fingerprint"))
+
+    def test_corrupted_entry(self):
+        self.cache.put("id", CollectorA(), "fingerprint", Data("x"))
+        with open(os.path.join(self.cache.cache_dir, "id.pickle"), "w") as entry_file:
+            entry_file.write("garbage")
+
+        self.assertEqual((False, None), self.cache.get("id", CollectorA(), "fingerprint"))
+
+    def test_no_recorded_durations(self):
+        self.assertEqual({}, self.cache.durations())
+
+    def test_durations_are_merged(self):
+        self.cache.put_durations({"a": 1.0, "b": 2.0})
+        self.cache.put_durations({"b": 3.0})
+
+        self.assertEqual({"a": 1.0, "b": 3.0}, self.cache.durations())
+
+
+class FingerprintTest(unittest.TestCase):
+
+    def test_files_fingerprint_changes_with_mtime(self):
+        fd, file_path = tempfile.mkstemp()
+        os.close(fd)
+        os.utime(file_path, (1000, 1000))
+        before = files_fingerprint(file_path)
+        os.utime(file_path, (2000, 2000))
+
+        self.assertNotEqual(before, files_fingerprint(file_path))
+
+    def test_files_fingerprint_of_missing_file(self):
+        self.assertEqual((("/no/such/file", None),), files_fingerprint("/no/such/file"))
+
+    def test_binary_fingerprint_is_stable(self):
+        self.assertEqual(binary_fingerprint("sh", "no-such-binary"), binary_fingerprint("sh", "no-such-binary"))
+
+
+class CollectorA:
+    pass
+
+
+class CollectorB:
+    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from shminspector.api.coalesce import coalesce
+from shminspector.api.reactor import ReactorCommand, UserInput
+
+
+class CoalesceTest(unittest.TestCase):
+
+    def test_single_command(self):
+        command = ReactorCommand(["brew", "install", "git"])
+
+        coalesced = coalesce([("git", [command])])
+
+        self.assertEqual(1, len(coalesced))
+        self.assertIs(command, coalesced[0].command)
+        self.assertEqual((("git", command),), coalesced[0].sources)
+
+    def test_duplicates_are_executed_once(self):
+        command1 = ReactorCommand(["brew", "update"])
+        command2 = ReactorCommand(["brew", "update"])
+
+        coalesced = coalesce([("comp1", [command1]), ("comp2", [command2])])
+
+        self.assertEqual(["brew update"], texts_of(coalesced))
+        self.assertEqual(["comp1", "comp2"], list(comp_id for comp_id, _ in coalesced[0].sources))
+
+    def test_brew_install_commands_are_merged(self):
+        coalesced = coalesce([
+            ("git", [ReactorCommand(["brew", "install", "git"])]),
+            ("jq", [ReactorCommand(["brew", "install", "jq", "git"])]),
+            ("java", [ReactorCommand(["brew", "cask", "install", "java"])]),
+            ("docker", [ReactorCommand(["brew", "cask", "install", "docker"])]),
+        ])
+
+        self.assertEqual(["brew install git jq", "brew cask install java docker"], texts_of(coalesced))
+
+    def test_component_command_order_is_preserved(self):
+        coalesced = coalesce([
+            ("comp1", [ReactorCommand(["brew", "install", "git"])]),
+            ("comp2", [ReactorCommand(["brew", "tap", "some/tap"]), ReactorCommand(["brew", "install", "tool"])]),
+            ("comp3", [ReactorCommand(["brew", "install", "jq"])]),
+        ])
+
+        self.assertEqual(["brew install git jq", "brew tap some/tap", "brew install tool"], texts_of(coalesced))
+
+    def test_commands_with_options_or_user_input_are_not_merged(self):
+        coalesced = coalesce([
+            ("comp1", [ReactorCommand(["brew", "install", "git"])]),
+            ("comp2", [ReactorCommand(["brew", "install", "--HEAD", "tool"])]),
+            ("comp3", [ReactorCommand(["brew", "install", UserInput("formula", "Formula?")])]),
+            ("comp4", [ReactorCommand(["brew", "upgrade", "jq"])]),
+        ])
+
+        self.assertEqual(4, len(coalesced))
+
+    def test_merged_command_is_silent_only_if_all_sources_are(self):
+        coalesced = coalesce([
+            ("comp1", [ReactorCommand(["brew", "install", "git"], silent=True)]),
+            ("comp2", [ReactorCommand(["brew", "install", "jq"], silent=False)]),
+            ("comp3", [ReactorCommand(["brew", "upgrade", "git"], silent=True)]),
+            ("comp4", [ReactorCommand(["brew", "upgrade", "jq"], silent=True)]),
+        ])
+
+        self.assertFalse(coalesced[0].command.silent)
+        self.assertTrue(coalesced[1].command.silent)
+
+
+def texts_of(coalesced):
+    return list(str(entry.command) for entry in coalesced)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from shminspector.api.dag import DAG, ReachabilityIndex
+
+
+class DAGTest(unittest.TestCase):
+
+    def test_topological_order(self):
+        dag = dag_of(("a", "c"), ("b", "c"), ("c", "d"), ("b", "d"))
+
+        order = dag.topological_order()
+
+        self.assertEqual(["a", "b", "c", "d"], order)
+
+    def test_insertion_order_is_kept(self):
+        dag = DAG()
+        for node in ("z", "y", "x"):
+            dag.add_node(node)
+
+        self.assertEqual(["z", "y", "x"], dag.nodes())
+        self.assertEqual(["z", "y", "x"], dag.topological_order())
+
+    def test_neighbours(self):
+        dag = dag_of(("a", "c"), ("b", "c"), ("c", "d"))
+
+        self.assertEqual(["a", "b"], dag.predecessors("c"))
+        self.assertEqual(["d"], dag.successors("c"))
+        self.assertTrue(dag.has_edge("a", "c"))
+        self.assertFalse(dag.has_edge("c", "a"))
+        self.assertTrue(dag.has_node("d"))
+        self.assertFalse(dag.has_node("e"))
+
+    def test_duplicate_edges(self):
+        dag = dag_of(("a", "b"), ("a", "b"))
+
+        self.assertEqual(["b"], dag.successors("a"))
+        self.assertEqual(["a", "b"], dag.topological_order())
+
+    def test_find_cycle(self):
+        self.assertIsNone(dag_of(("a", "b"), ("b", "c")).find_cycle())
+        self.assertEqual(["b", "c", "d", "b"], dag_of(("a", "b"), ("b", "c"), ("c", "d"), ("d", "b")).find_cycle())
+        self.assertEqual(["a", "a"], dag_of(("a", "a")).find_cycle())
+
+    def test_topological_order_of_cyclic_graph(self):
+        self.assertRaises(ValueError, dag_of(("a", "b"), ("b", "a")).topological_order)
+
+
+class ReachabilityIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ReachabilityIndex(dag_of(("a", "c"), ("b", "c"), ("c", "d"), ("a", "e"), ("x", "y")))
+
+    def test_ancestors(self):
+        self.assertEqual(["a", "b", "c"], self.index.ancestors_of("d"))
+        self.assertEqual(["a", "b", "c", "d"], self.index.with_ancestors("d"))
+        self.assertEqual(["a", "b", "x"], self.index.ancestors_of("c", "y"))
+        self.assertEqual([], self.index.ancestors_of("a"))
+
+    def test_descendants(self):
+        self.assertEqual(["e", "c", "d"], self.index.descendants_of("a"))
+        self.assertEqual(["b", "c", "d"], self.index.with_descendants("b"))
+        self.assertEqual(["c", "y", "d"], self.index.descendants_of("b", "x"))
+        self.assertEqual([], self.index.descendants_of("d"))
+
+    def test_reaches(self):
+        self.assertTrue(self.index.reaches("a", "d"))
+        self.assertFalse(self.index.reaches("d", "a"))
+        self.assertFalse(self.index.reaches("a", "y"))
+
+    def test_deep_chain(self):
+        size = 5000
+        index = ReachabilityIndex(dag_of(*(("n{}".format(i), "n{}".format(i + 1)) for i in range(size - 1))))
+
+        self.assertEqual(size - 1, len(index.descendants_of("n0")))
+        self.assertEqual(["n0"], index.ancestors_of("n1"))
+
+
+def dag_of(*edges):
+    dag = DAG()
+    for source, target in edges:
+        dag.add_edge(source, target)
+
+    return dag
+
+
+if __name__ == '__main__':
+    unittest.main()
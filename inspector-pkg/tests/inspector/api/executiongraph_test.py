@@ -1,6 +1,6 @@
 import unittest
 
-from shminspector.api.executor import ExecutionGraph, CyclicDependencyError, MissingDependencyError
+from shminspector.api.executiongraph import ExecutionGraph, CyclicDependencyError, MissingDependencyError
 from shminspector.api.tags import prerequisites
 from tests.testutil import test_context
 
@@ -35,6 +35,91 @@ class ExecutionGraphTest(unittest.TestCase):
 
         self.assertRaises(CyclicDependencyError, lambda *args: ExecutionGraph(context))
 
+    def test_cycle_path_is_reported(self):
+        context = test_context()
+        context.registry.register_collector("cyc1", Cycle1())
+        context.registry.register_collector("cyc2", Cycle2())
+        context.registry.register_collector("cyc3", Cycle3())
+
+        try:
+            ExecutionGraph(context)
+            self.fail("CyclicDependencyError expected")
+        except CyclicDependencyError as err:
+            self.assertEqual(["cyc1", "cyc3", "cyc2", "cyc1"], err.cycle)
+            self.assertIn("cyc1 -> cyc3 -> cyc2 -> cyc1", str(err))
+
+    def test_shared_prerequisites(self):
+        context = test_context()
+        context.registry.register_collector("c1", Comp1())
+        context.registry.register_collector("c2", Comp2())
+        context.registry.register_collector("c3", Comp3())
+        context.registry.register_collector("c4", Comp4())
+
+        graph = ExecutionGraph(context)
+
+        self.assertEqual({"c3", "c2"}, graph.prerequisites_of("c4"))
+        self.assertEqual({"c1", "c2"}, graph.prerequisites_of("c3"))
+        self.assertEqual(set(), graph.prerequisites_of("c1"))
+
+    def test_deep_chain(self):
+        context = test_context()
+        size = 5000
+        for index in range(size):
+            collector = Comp1()
+            if index > 0:
+                collector = prerequisites("chain-{}".format(index - 1))(collector)
+            context.registry.register_collector("chain-{}".format(index), collector)
+
+        nodes = list(ExecutionGraph(context).topologically_ordered_comp_ids())
+
+        self.assertEqual(list("chain-{}".format(index) for index in range(size)), nodes)
+
+    def test_with_dependents_and_prerequisites(self):
+        context = test_context()
+        register_all(context)
+
+        graph = ExecutionGraph(context)
+
+        self.assertEqual({"c2", "c3", "c4"}, graph.with_dependents(["c2"]))
+        self.assertEqual({"c1", "c2", "c3"}, graph.with_prerequisites(["c3"]))
+        self.assertEqual({"c1"}, graph.with_prerequisites(["c1", "unknown"]))
+
+    def test_no_selection(self):
+        context = test_context()
+        register_all(context)
+
+        self.assertIsNone(ExecutionGraph(context).selected_comp_ids())
+
+    def test_affected_by_selection(self):
+        context = test_context()
+        register_all(context)
+        context.flags.affected_by = ["c3"]
+
+        self.assertEqual({"c3", "c4"}, ExecutionGraph(context).selected_comp_ids())
+
+    def test_only_closure_selection(self):
+        context = test_context()
+        register_all(context)
+        context.registry.register_collector("c5", Comp5())
+        context.flags.only_closure = ["c3"]
+
+        self.assertEqual({"c1", "c2", "c3", "c4"}, ExecutionGraph(context).selected_comp_ids())
+
+    def test_selections_are_combined(self):
+        context = test_context()
+        register_all(context)
+        context.flags.affected_by = ["c1"]
+        context.flags.only_closure = ["c2"]
+
+        self.assertEqual({"c1", "c2", "c3", "c4"}, ExecutionGraph(context).selected_comp_ids())
+
+    def test_selection_of_unknown_component(self):
+        context = test_context()
+        register_all(context)
+        context.flags.affected_by = ["unknown"]
+
+        self.assertRaises(MissingDependencyError, ExecutionGraph(context).selected_comp_ids)
+
     def test_missing_dep(self):
         context = test_context()
         context.registry.register_collector("c1", BrokenDep())
@@ -42,6 +127,13 @@ class ExecutionGraphTest(unittest.TestCase):
         self.assertRaises(MissingDependencyError, lambda *args: ExecutionGraph(context))
 
 
+def register_all(context):
+    context.registry.register_collector("c1", Comp1())
+    context.registry.register_collector("c2", Comp2())
+    context.registry.register_collector("c3", Comp3())
+    context.registry.register_collector("c4", Comp4())
+
+
 class Comp1:
     pass
 
@@ -60,6 +152,10 @@ class Comp4:
     pass
 
 
+class Comp5:
+    pass
+
+
 @prerequisites("cyc3")
 class Cycle1:
     pass
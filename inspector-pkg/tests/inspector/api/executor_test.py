@@ -1,11 +1,26 @@
+import asyncio
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from contextlib import contextmanager, redirect_stdout
 
-from shminspector.api.collector import Collector
+from shminspector.api.cache import CollectorCache
+from shminspector.api.collector import Collector, AsyncCollector
 from shminspector.api.context import Context, Mode
-from shminspector.api.executor import Executor, ExecutionSummary, ExecPlanExecutor
-from shminspector.api.reactor import Reactor, ReactorCommand
-from shminspector.api.tags import experimental, CURRENT_PLATFORM, Platform, target_platform, interactive
-from shminspector.api.validator import Validator, ValidationResult, Status
+from shminspector.api.events import CollectStarted, CollectFinished, ValidationFinished, ReactionFinished, \
+    CommandStarted, CommandFinished, ComponentFinished, RunFinished
+from shminspector.api.executor import Executor, ExecutionSummary, _CommandLane
+from shminspector.api.plan import ExecPlanExecutor
+from shminspector.api.reactor import Reactor, ReactorCommand, AsyncReactor
+from shminspector.api.tags import experimental, CURRENT_PLATFORM, Platform, target_platform, interactive, \
+    prerequisites, timeout
+from shminspector.api.validator import Validator, ValidationResult, Status, AsyncValidator
+from shminspector.util import cmd
+from shminspector.util.logger import CompositeLogger
 from tests.testutil import test_context
 
 
@@ -197,6 +212,546 @@ class ExecutorTest(unittest.TestCase):
         self.assertFalse(collector2.called)
         self.assertTrue(collector3.called)
 
+    def test_parallel_execution_respects_prerequisites(self):
+        ctx = test_context()
+        ctx.flags.jobs = 4
+        execution_log = []
+
+        ctx.registry.register_collector("c1", RecordingCollector("c1", execution_log))
+        ctx.registry.register_collector("c2", RecordingCollector("c2", execution_log))
+        ctx.registry.register_collector("c3", DependentRecordingCollector("c3", execution_log))
+
+        summary = Executor().execute(ctx)
+
+        self.assertEqual(ExecutionSummary(total_count=3, problem_count=0), summary)
+        self.assertEqual("c3", execution_log[-1])
+
+    def test_parallel_execution_runs_independent_components_concurrently(self):
+        ctx = test_context()
+        ctx.flags.jobs = 2
+        barrier = threading.Barrier(2, timeout=5)
+
+        ctx.registry.register_collector("c1", BarrierCollector(barrier))
+        ctx.registry.register_collector("c2", BarrierCollector(barrier))
+
+        # would time out with a broken barrier if the two collectors were executed serially
+        summary = Executor().execute(ctx)
+
+        self.assertEqual(ExecutionSummary(total_count=2, problem_count=0), summary)
+
+    def test_parallel_execution_results_order_is_deterministic(self):
+        ctx = test_context()
+        ctx.flags.jobs = 4
+
+        comp_ids = ["c{}".format(i) for i in range(10)]
+        for comp_id in comp_ids:
+            ctx.registry.register_collector(comp_id, MockCollector(comp_id))
+
+        serial_ctx = test_context()
+        serial_ctx.registry = ctx.registry
+
+        parallel_results = Executor().execute(ctx).results
+        serial_results = Executor().execute(serial_ctx).results
+
+        self.assertEqual(serial_results, parallel_results)
+
+    def test_parallel_execution_propagates_errors(self):
+        ctx = test_context()
+        ctx.flags.jobs = 2
+
+        ctx.registry.register_collector("id", MockCollector("data"))
+        ctx.registry.register_validator("id", MockValidator(result=validation_result_with("data")))
+        ctx.registry.register_reactor("id", MockReactor("whatever"))
+
+        self.assertRaises(Exception, lambda: Executor().execute(ctx, get_handler=RecordingHandler(fail=True).get))
+
+    def test_async_execute(self):
+        ctx = test_context()
+        handler = RecordingHandler()
+
+        collector = AsyncMockCollector("data")
+        validator = AsyncMockValidator(result=validation_result_with("data"))
+        reactor_command = ReactorCommand(cmd=["do", "nothing"])
+        reactor = AsyncMockReactor(reactor_command)
+
+        ctx.registry.register_collector("id", collector)
+        ctx.registry.register_validator("id", validator)
+        ctx.registry.register_reactor("id", reactor)
+
+        self.assertEqual(
+            ExecutionSummary(total_count=1, problem_count=1),
+            Executor().execute(ctx, get_handler=handler.get)
+        )
+
+        self.assertTrue(collector.called)
+        self.assertTrue(validator.called)
+        self.assertTrue(reactor.called)
+        self.assertEqual(reactor_command, handler.recorded[0])
+
+    def test_async_subprocess_collector(self):
+        # asyncio subprocesses only work with the executor's loop from Python 3.8 on
+        for async_subprocesses in {cmd._ASYNC_SUBPROCESSES, False}:
+            with async_subprocesses_set_to(async_subprocesses):
+                ctx = test_context()
+                ctx.registry.register_collector("id", AsyncSubprocessCollector())
+                events = []
+
+                summary = Executor(listeners=[events.append]).execute(ctx)
+
+                collected = [event.data for event in events if isinstance(event, CollectFinished)]
+                self.assertEqual(["hi"], collected)
+                self.assertEqual(ExecutionSummary(total_count=1, problem_count=0), summary)
+
+    def test_async_subprocess_collector_streamed(self):
+        # asyncio subprocesses only work with the executor's loop from Python 3.8 on
+        for async_subprocesses in {cmd._ASYNC_SUBPROCESSES, False}:
+            with async_subprocesses_set_to(async_subprocesses):
+                ctx = test_context()
+                ctx.registry.register_collector("id", AsyncSubprocessCollector())
+
+                events = list(Executor().stream(ctx))
+
+                collected = [event.data for event in events if isinstance(event, CollectFinished)]
+                self.assertEqual(["hi"], collected)
+                self.assertEqual(ExecutionSummary(total_count=1, problem_count=0), events[-1].summary)
+
+    def test_async_components_overlap_on_the_event_loop(self):
+        ctx = test_context()
+        ctx.flags.jobs = 2
+        both_started = AsyncBarrier(2)
+
+        ctx.registry.register_collector("c1", AsyncBarrierCollector(both_started))
+        ctx.registry.register_collector("c2", AsyncBarrierCollector(both_started))
+
+        # would time out if the two collectors were not awaited concurrently
+        summary = Executor().execute(ctx)
+
+        self.assertEqual(ExecutionSummary(total_count=2, problem_count=0), summary)
+
+    def test_unrelated_components_are_inspected_while_commands_run(self):
+        ctx = test_context()
+        inspected = threading.Event()
+        handler = BlockingHandler(inspected)
+
+        ctx.registry.register_collector("reacting", MockCollector("data"))
+        ctx.registry.register_validator("reacting", MockValidator(result=validation_result_with("data")))
+        ctx.registry.register_reactor("reacting", MockReactor(ReactorCommand(cmd=["long", "install"])))
+        ctx.registry.register_collector("unrelated", EventCollector(inspected))
+
+        Executor().execute(ctx, get_handler=handler.get)
+
+        self.assertTrue(handler.unblocked)
+
+    def test_component_timeout_kills_processes(self):
+        ctx = test_context()
+        ctx.config = {"timeouts": {"components": {"hanging": 0.5}}}
+
+        ctx.registry.register_collector("hanging", HangingCollector())
+        ctx.registry.register_collector("healthy", MockCollector("data"))
+
+        start_time = time.time()
+        summary = Executor().execute(ctx)
+
+        self.assertLess(time.time() - start_time, 5)
+        self.assertEqual(ExecutionSummary(total_count=2, problem_count=1), summary)
+        self.assertIn(("hanging", Status.TIMEOUT, 0), list(result[:3] for result in summary.results))
+
+    def test_tagged_timeout(self):
+        ctx = test_context()
+
+        ctx.registry.register_collector("hanging", TaggedHangingCollector())
+
+        summary = Executor().execute(ctx)
+
+        self.assertEqual(Status.TIMEOUT, summary.results[0].status)
+
+    def test_run_deadline(self):
+        ctx = test_context()
+        ctx.flags.deadline = 0.5
+
+        ctx.registry.register_collector("hanging", HangingCollector())
+
+        start_time = time.time()
+        summary = Executor().execute(ctx)
+
+        self.assertLess(time.time() - start_time, 5)
+        self.assertEqual(Status.TIMEOUT, summary.results[0].status)
+
+    def test_timed_out_handler_does_not_time_out_unrelated_components(self):
+        ctx = test_context()
+        ctx.flags.jobs = 1
+        ctx.config = {"timeouts": {"components": {"fast": 1}}}
+
+        ctx.registry.register_collector("blocking", BlockingCollector())
+        ctx.registry.register_collector("fast", MockCollector("data"))
+
+        summary = Executor().execute(ctx)
+
+        statuses = dict((result.comp_id, result.status) for result in summary.results)
+        self.assertEqual(Status.TIMEOUT, statuses["blocking"])
+        self.assertIsNone(statuses["fast"])
+
+    def test_run_deadline_with_blocking_handler(self):
+        ctx = test_context()
+        ctx.flags.jobs = 1
+        ctx.flags.deadline = 1
+
+        ctx.registry.register_collector("blocking", BlockingCollector())
+        ctx.registry.register_collector("fast", MockCollector("data"))
+
+        start_time = time.time()
+        summary = Executor().execute(ctx)
+
+        self.assertLess(time.time() - start_time, 2.5)
+        self.assertEqual(Status.TIMEOUT, summary.results[0].status)
+
+    def test_cached_data_is_served_while_fingerprint_matches(self):
+        ctx = test_context()
+        ctx.cache = CollectorCache(cache_dir=tempfile.mkdtemp(prefix="executor-test-"))
+        collector = FingerprintedCollector("data", fingerprint="v1")
+        validator = MockValidator(result=validation_result_with("data"))
+
+        ctx.registry.register_collector("id", collector)
+        ctx.registry.register_validator("id", validator)
+
+        Executor().execute(ctx)
+        Executor().execute(ctx)
+        self.assertEqual(1, collector.call_count)
+        self.assertTrue(validator.called)
+
+        collector.current_fingerprint = "v2"
+        Executor().execute(ctx)
+        self.assertEqual(2, collector.call_count)
+
+    def test_cache_disabled(self):
+        ctx = test_context()
+        ctx.cache = None
+        collector = FingerprintedCollector("data", fingerprint="v1")
+
+        ctx.registry.register_collector("id", collector)
+
+        Executor().execute(ctx)
+        Executor().execute(ctx)
+        self.assertEqual(2, collector.call_count)
+
+    def test_durations_are_recorded(self):
+        ctx = test_context()
+        ctx.flags.dryrun = False
+        ctx.cache = CollectorCache(cache_dir=tempfile.mkdtemp(prefix="executor-test-"))
+        register_component(ctx, "id", ReactorCommand(["do", "nothing"]))
+
+        Executor().execute(ctx, get_handler=RecordingHandler().get)
+
+        self.assertEqual(["id"], list(ctx.cache.durations()))
+
+    def test_recorded_durations_exclude_waiting_for_a_worker(self):
+        ctx = test_context()
+        ctx.flags.dryrun = False
+        ctx.cache = CollectorCache(cache_dir=tempfile.mkdtemp(prefix="executor-test-"))
+        ctx.registry.register_collector("first", DelayedCollector(0.3))
+        ctx.registry.register_collector("second", DelayedCollector(0.3))
+
+        Executor().execute(ctx)
+
+        durations = ctx.cache.durations()
+        self.assertLess(durations["first"], 0.5)
+        self.assertLess(durations["second"], 0.5)
+
+    def test_durations_are_not_recorded_in_dry_run(self):
+        ctx = test_context()
+        ctx.cache = CollectorCache(cache_dir=tempfile.mkdtemp(prefix="executor-test-"))
+        register_component(ctx, "id", ReactorCommand(["do", "nothing"]))
+
+        Executor().execute(ctx)
+
+        self.assertEqual({}, ctx.cache.durations())
+
+    def test_execute_affected_components_only(self):
+        ctx = test_context()
+        ctx.flags.affected_by = ["gcloud"]
+        network, gcloud, kubectl = MockCollector("data"), MockCollector("data"), MockCollector("data")
+        register_chain(ctx, ("network", network, Status.OK), ("gcloud", gcloud, Status.OK),
+                       ("kubectl", kubectl, Status.OK))
+
+        summary = Executor().execute(ctx)
+
+        self.assertEqual(["gcloud", "kubectl"], list(result.comp_id for result in summary.results))
+        self.assertFalse(network.called)
+
+    def test_verify_runs_components_with_dependents_without_reacting(self):
+        ctx = test_context()
+        reactor = MockReactor(ReactorCommand(cmd=["do", "nothing"]))
+        verified = MockCollector("data")
+        dependent = DependentRecordingCollector("c3", [])
+        unrelated = MockCollector("data")
+
+        ctx.registry.register_collector("c1", verified)
+        ctx.registry.register_validator("c1", MockValidator(result=validation_result_with("data")))
+        ctx.registry.register_reactor("c1", reactor)
+        ctx.registry.register_collector("c2", MockCollector("data"))
+        ctx.registry.register_collector("c3", dependent)
+        ctx.registry.register_collector("unrelated", unrelated)
+
+        summary = Executor().verify(ctx, ["c1"])
+
+        self.assertEqual(["c1", "c3"], [result.comp_id for result in summary.results])
+        self.assertEqual(ExecutionSummary(total_count=2, problem_count=1), summary)
+        self.assertTrue(verified.called)
+        self.assertFalse(reactor.called)
+        self.assertFalse(unrelated.called)
+
+    def test_events_published_to_listeners(self):
+        ctx = test_context()
+        events = []
+        reactor_command = ReactorCommand(cmd=["do", "nothing"])
+
+        ctx.registry.register_collector("id", MockCollector("data"))
+        ctx.registry.register_validator("id", MockValidator(result=validation_result_with("data")))
+        ctx.registry.register_reactor("id", MockReactor(reactor_command))
+
+        summary = Executor(listeners=[events.append]).execute(ctx, get_handler=RecordingHandler().get)
+
+        self.assertEqual(
+            [CollectStarted, CollectFinished, ValidationFinished, ReactionFinished, CommandStarted, CommandFinished,
+             ComponentFinished, RunFinished],
+            [type(event) for event in events]
+        )
+        self.assertEqual("data", events[1].data)
+        self.assertEqual(Status.NOT_FOUND, events[2].result.status)
+        self.assertEqual([reactor_command], events[3].commands)
+        self.assertEqual(reactor_command, events[4].command)
+        self.assertIsNone(events[5].error)
+        self.assertEqual(summary, events[7].summary)
+
+    def test_failing_listener_does_not_break_execution(self):
+        ctx = test_context()
+
+        def failing_listener(event):
+            raise Exception("fake")
+
+        ctx.registry.register_collector("id", MockCollector("data"))
+
+        summary = Executor(listeners=[failing_listener]).execute(ctx)
+
+        self.assertEqual(ExecutionSummary(total_count=1, problem_count=0), summary)
+
+    def test_stream(self):
+        ctx = test_context()
+
+        ctx.registry.register_collector("c1", MockCollector("data"))
+        ctx.registry.register_collector("c2", MockCollector("data"))
+
+        events = list(Executor().stream(ctx))
+
+        self.assertEqual(2, len([event for event in events if isinstance(event, CollectFinished)]))
+        self.assertIsInstance(events[-1], RunFinished)
+        self.assertEqual(ExecutionSummary(total_count=2, problem_count=0), events[-1].summary)
+
+    def test_stream_reraises_errors(self):
+        ctx = test_context()
+
+        ctx.registry.register_collector("id", MockCollector("data"))
+        ctx.registry.register_validator("id", MockValidator(result=validation_result_with("data")))
+        ctx.registry.register_reactor("id", MockReactor("whatever"))
+
+        self.assertRaises(Exception, lambda: list(Executor().stream(ctx, get_handler=RecordingHandler(fail=True).get)))
+
+    def test_commands_pending_together_are_coalesced(self):
+        ctx = test_context()
+        ctx.flags.jobs = 3
+        handler = BatchingHandler()
+
+        register_brew_components(ctx, {"slow": ["do", "slow"], "git": ["brew", "install", "git"],
+                                       "jq": ["brew", "install", "jq"]})
+
+        Executor().execute(ctx, get_handler=handler.get)
+
+        self.assertEqual(2, len(handler.recorded))
+        self.assertEqual(["brew", "git", "install", "jq"], sorted(handler.recorded[1].split(" ")))
+
+    def test_failing_coalesced_command_is_retried_per_component(self):
+        ctx = test_context()
+        ctx.flags.jobs = 3
+        handler = BatchingHandler()
+
+        register_brew_components(ctx, {"slow": ["do", "slow"], "git": ["brew", "install", "git"],
+                                       "broken": ["brew", "install", "broken"]})
+
+        Executor().execute(ctx, get_handler=handler.get)
+
+        self.assertEqual(4, len(handler.recorded))
+        self.assertEqual(["brew install broken", "brew install git"], sorted(handler.recorded[2:]))
+
+    def test_failing_duplicate_command_is_not_retried(self):
+        ctx = test_context()
+        ctx.flags.jobs = 3
+        handler = BatchingHandler()
+        events = []
+
+        register_brew_components(ctx, {"slow": ["do", "slow"], "a": ["do", "broken"], "b": ["do", "broken"]})
+
+        Executor(listeners=[events.append]).execute(ctx, get_handler=handler.get)
+
+        self.assertEqual(["do slow", "do broken"], handler.recorded)
+        failed = list(event.comp_id for event in events if isinstance(event, CommandFinished) and event.error)
+        self.assertEqual(["a", "b"], sorted(failed))
+
+    def test_commands_run_concurrently_up_to_command_jobs(self):
+        ctx = test_context()
+        ctx.flags.jobs = 3
+        ctx.flags.command_jobs = 2
+        handler = ConcurrencyRecordingHandler()
+
+        for comp_id in ("comp1", "comp2", "comp3"):
+            register_component(ctx, comp_id, ReactorCommand([comp_id, "first"]), ReactorCommand([comp_id, "second"]))
+
+        Executor().execute(ctx, get_handler=handler.get)
+
+        self.assertEqual(2, handler.max_running)
+        for comp_id in ("comp1", "comp2", "comp3"):
+            self.assertLess(handler.recorded.index("{} first".format(comp_id)),
+                            handler.recorded.index("{} second".format(comp_id)))
+
+    def test_serial_commands_run_alone(self):
+        ctx = test_context()
+        ctx.flags.jobs = 3
+        ctx.flags.command_jobs = 3
+        handler = ConcurrencyRecordingHandler()
+
+        register_component(ctx, "comp1", ReactorCommand(["comp1"]))
+        register_component(ctx, "comp2", ReactorCommand(["comp2"], serial=True))
+        register_component(ctx, "comp3", ReactorCommand(["comp3"]))
+
+        Executor().execute(ctx, get_handler=handler.get)
+
+        self.assertEqual(1, handler.running_with["comp2"])
+
+    def test_command_output_is_prefixed_with_comp_id(self):
+        ctx = test_context()
+        ctx.flags.dryrun = False
+        ctx.flags.command_jobs = 2
+        ctx.logger = OutputRecordingLogger()
+
+        register_component(ctx, "comp", ReactorCommand(["echo", "hello"]))
+
+        Executor().execute(ctx)
+
+        self.assertEqual(["[comp] hello"], list(line.strip() for line in ctx.logger.recorded_output))
+
+    def test_fail_fast_skips_transitive_dependents(self):
+        ctx = test_context()
+        ctx.flags.fail_fast = True
+
+        failing = MockCollector("data")
+        dependent = MockCollector("data")
+        transitive_dependent = MockCollector("data")
+        independent = MockCollector("data")
+        register_chain(ctx, ("network", failing, Status.NOT_FOUND), ("gcloud", dependent, Status.OK),
+                       ("gcloud-config", transitive_dependent, Status.OK))
+        ctx.registry.register_collector("independent", independent)
+
+        summary = Executor().execute(ctx)
+
+        self.assertFalse(dependent.called)
+        self.assertFalse(transitive_dependent.called)
+        self.assertTrue(independent.called)
+        self.assertEqual(ExecutionSummary(total_count=4, problem_count=3), summary)
+        skipped = dict((result.comp_id, result) for result in summary.results if result.status == Status.SKIPPED)
+        self.assertEqual({"gcloud", "gcloud-config"}, set(skipped))
+        self.assertEqual("prerequisite 'network' was not found", skipped["gcloud-config"].reason)
+
+    def test_dependents_are_executed_without_fail_fast(self):
+        ctx = test_context()
+
+        dependent = MockCollector("data")
+        register_chain(ctx, ("network", MockCollector("data"), Status.ERROR), ("gcloud", dependent, Status.OK))
+
+        Executor().execute(ctx)
+
+        self.assertTrue(dependent.called)
+
+    def test_fail_fast_does_not_skip_dependents_of_reacted_components(self):
+        ctx = test_context()
+        ctx.flags.fail_fast = True
+
+        dependent = MockCollector("data")
+        register_chain(ctx, ("network", MockCollector("data"), Status.NOT_FOUND), ("gcloud", dependent, Status.OK))
+        ctx.registry.register_reactor("network", MockReactor(ReactorCommand(["fix", "network"])))
+
+        Executor().execute(ctx, get_handler=RecordingHandler().get)
+
+        self.assertTrue(dependent.called)
+
+    def test_facts_are_shared_by_components(self):
+        ctx = test_context()
+        probes = []
+
+        ctx.registry.register_collector("a", FactCollector(probes))
+        ctx.registry.register_collector("b", FactCollector(probes))
+
+        Executor().execute(ctx)
+
+        self.assertEqual(1, len(probes))
+        self.assertEqual(1, ctx.facts.misses)
+        self.assertEqual(1, ctx.facts.hits)
+
+    def test_facts_are_invalidated_by_commands(self):
+        ctx = test_context()
+        probes = []
+
+        register_chain(ctx, ("a", FactCollector(probes), Status.NOT_FOUND), ("b", FactCollector(probes), Status.OK))
+        ctx.registry.register_reactor("a", MockReactor(ReactorCommand(["install", "a"])))
+
+        Executor().execute(ctx, get_handler=RecordingHandler().get)
+
+        self.assertEqual(2, len(probes))
+
+    def test_facts_of_timed_out_components_are_not_shared(self):
+        ctx = test_context()
+        probes = []
+
+        ctx.registry.register_collector("a", TimedOutFactCollector())
+        ctx.registry.register_collector("b", FactCollector(probes))
+
+        summary = Executor().execute(ctx)
+
+        self.assertEqual(Status.TIMEOUT, summary.results[0].status)
+        self.assertEqual(["probe"], probes)
+
+
+class CommandLaneTest(unittest.TestCase):
+    def test_command_that_succeeded_in_an_earlier_batch_runs_again(self):
+        handler = AsyncBatchingHandler()
+
+        async def scenario(lane, ctx):
+            await lane.execute("a", [ReactorCommand(["do", "it"])], ctx, None)
+            await lane.execute("b", [ReactorCommand(["do", "it"])], ctx, None)
+
+        run_lane(handler, scenario)
+
+        self.assertEqual(["do it", "do it"], handler.recorded)
+
+    def test_commands_submitted_before_the_batch_takes_its_slot_are_coalesced(self):
+        handler = AsyncBatchingHandler()
+
+        async def scenario(lane, ctx):
+            loop = asyncio.get_event_loop()
+            submissions = [loop.create_task(lane.execute("slow", [ReactorCommand(["do", "slow"])], ctx, None))]
+            while len(lane._batches) == 0:
+                await asyncio.sleep(0)
+            for comp_id in ("git", "jq"):
+                submissions.append(
+                    loop.create_task(lane.execute(comp_id, [ReactorCommand(["brew", "install", comp_id])], ctx, None)))
+                # let the lane notice each submission on its own
+                for _ in range(2):
+                    await asyncio.sleep(0)
+            await asyncio.gather(*submissions)
+
+        run_lane(handler, scenario)
+
+        self.assertEqual(2, len(handler.recorded))
+        self.assertEqual(["brew", "git", "install", "jq"], sorted(handler.recorded[1].split(" ")))
+
 
 class ExecPlanExecutorTest(unittest.TestCase):
 
@@ -220,6 +775,46 @@ class ExecPlanExecutorTest(unittest.TestCase):
         self.assertFalse(validator.called)
         self.assertFalse(reactor.called)
 
+    def test_waves_and_estimates(self):
+        ctx = test_context()
+        ctx.flags.plan = True
+        ctx.cache = CollectorCache(cache_dir=tempfile.mkdtemp(prefix="executor-test-"))
+        ctx.cache.put_durations({"network": 1, "gcloud": 2})
+        register_chain(ctx, ("network", MockCollector("data"), Status.OK), ("gcloud", MockCollector("data"), Status.OK))
+        ctx.registry.register_collector("docker", MockCollector("data"))
+        ctx.registry.register_collector("filtered", PlatformInCompatible())
+
+        plan = ExecPlanExecutor().execute(ctx)
+
+        self.assertEqual([["network", "docker"], ["gcloud"]], plan.waves)
+        self.assertEqual(3, plan.serial_sec)
+        self.assertEqual(3, plan.critical_path_sec)
+        self.assertEqual(["docker"], plan.unknown_comp_ids)
+
+    def test_json_plan(self):
+        ctx = test_context()
+        ctx.flags.plan = True
+        ctx.flags.plan_format = "json"
+        ctx.cache = None
+        register_chain(ctx, ("network", MockCollector("data"), Status.OK), ("gcloud", MockCollector("data"), Status.OK))
+        ctx.registry.register_reactor("gcloud", MockReactor(ReactorCommand(["do", "nothing"])))
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            ExecPlanExecutor().execute(ctx)
+
+        json_plan = json.loads(output.getvalue())
+        self.assertEqual(["network"], list(comp["comp_id"] for comp in json_plan["waves"][0]))
+        self.assertEqual({
+            "comp_id": "gcloud",
+            "prerequisites": ["network"],
+            "duration_sec": None,
+            "collector": "MockCollector[tags=@requires:network]",
+            "validator": "MockValidator",
+            "reactors": ["MockReactor"],
+        }, json_plan["waves"][1][0])
+        self.assertEqual(["network", "gcloud"], json_plan["estimate"]["critical_path"])
+
 
 def not_the_current_platform():
     if CURRENT_PLATFORM == Platform.MACOS:
@@ -256,6 +851,125 @@ class InteractiveMockCollector(MockCollector):
         super().__init__("data")
 
 
+class FingerprintedCollector(Collector):
+    def __init__(self, result, fingerprint):
+        self.result = result
+        self.current_fingerprint = fingerprint
+        self.call_count = 0
+
+    def fingerprint(self, ctx: Context):
+        return self.current_fingerprint
+
+    def collect(self, ctx: Context) -> object:
+        self.call_count += 1
+        return self.result
+
+
+class HangingCollector(Collector):
+    def collect(self, ctx: Context) -> object:
+        return cmd.try_execute(["sleep", "30"])
+
+
+@timeout(0.5)
+class TaggedHangingCollector(HangingCollector):
+    pass
+
+
+@timeout(0.5)
+class BlockingCollector(Collector):
+    def collect(self, ctx: Context) -> object:
+        time.sleep(3)
+        return "data"
+
+
+class RecordingCollector(Collector):
+    def __init__(self, name, execution_log):
+        self.name = name
+        self.execution_log = execution_log
+
+    def collect(self, ctx: Context) -> object:
+        self.execution_log.append(self.name)
+        return self.name
+
+
+class FactCollector(Collector):
+    def __init__(self, probes):
+        self.probes = probes
+
+    def collect(self, ctx: Context) -> object:
+        def probe():
+            self.probes.append("probe")
+            return "data"
+
+        return ctx.facts.get("probe", probe)
+
+
+@timeout(0.5)
+class TimedOutFactCollector(Collector):
+    def collect(self, ctx: Context) -> object:
+        return ctx.facts.get("probe", lambda: cmd.try_execute(["sleep", "30"]))
+
+
+@prerequisites("c1", "c2")
+class DependentRecordingCollector(RecordingCollector):
+    pass
+
+
+class BarrierCollector(Collector):
+    def __init__(self, barrier):
+        self.barrier = barrier
+
+    def collect(self, ctx: Context) -> object:
+        self.barrier.wait()
+        return "data"
+
+
+class AsyncMockCollector(AsyncCollector):
+    def __init__(self, result):
+        self.result = result
+        self.called = False
+
+    async def collect(self, ctx: Context) -> object:
+        self.called = True
+        return self.result
+
+
+class AsyncSubprocessCollector(AsyncCollector):
+    async def collect(self, ctx: Context) -> object:
+        ok, code, output = await cmd.try_execute_async([sys.executable, "-c", "print('hi')"], logger=ctx.logger)
+        return output.strip() if ok and code == 0 else None
+
+
+@contextmanager
+def async_subprocesses_set_to(enabled):
+    previous = cmd._ASYNC_SUBPROCESSES
+    cmd._ASYNC_SUBPROCESSES = enabled
+    try:
+        yield
+    finally:
+        cmd._ASYNC_SUBPROCESSES = previous
+
+
+class AsyncBarrier:
+    def __init__(self, parties):
+        self.parties = parties
+        self.arrived = 0
+
+    async def wait(self):
+        self.arrived += 1
+        while self.arrived < self.parties:
+            await asyncio.sleep(0.01)
+
+
+class AsyncBarrierCollector(AsyncCollector):
+    def __init__(self, barrier):
+        self.barrier = barrier
+
+    async def collect(self, ctx: Context) -> object:
+        await asyncio.wait_for(self.barrier.wait(), timeout=5)
+        return "data"
+
+
 class MockValidator(Validator):
     def __init__(self, result: ValidationResult):
         self.result = result
@@ -279,6 +993,47 @@ class MockReactor(Reactor):
         return self.commands
 
 
+class AsyncMockValidator(AsyncValidator):
+    def __init__(self, result: ValidationResult):
+        self.result = result
+        self.called = False
+
+    async def validate(self, input_data, ctx: Context) -> ValidationResult:
+        self.called = True
+        return self.result
+
+
+class AsyncMockReactor(AsyncReactor):
+    def __init__(self, *commands):
+        self.commands = commands
+        self.called = False
+
+    async def react(self, data, ctx: Context):
+        self.called = True
+        return self.commands
+
+
+class EventCollector(Collector):
+    def __init__(self, event):
+        self.event = event
+
+    def collect(self, ctx: Context) -> object:
+        self.event.set()
+        return "data"
+
+
+class BlockingHandler:
+    def __init__(self, event):
+        self.event = event
+        self.unblocked = False
+
+    def handle(self, command, ctx):
+        self.unblocked = self.event.wait(timeout=5)
+
+    def get(self, ctx):
+        return self.handle
+
+
 class RecordingHandler:
     def __init__(self, fail=False):
         self.recorded = []
@@ -296,6 +1051,129 @@ class RecordingHandler:
         return self.handle
 
 
+class BatchingHandler:
+    """
+    Records executed commands. 'do slow' blocks for a while so that other components' commands pile up in the
+    command lane; 'do broken' and commands mentioning 'broken' along with other formulas fail.
+    """
+
+    def __init__(self):
+        self.recorded = []
+
+    def handle(self, command, ctx):
+        self.recorded.append(str(command))
+        if str(command) == "do slow":
+            time.sleep(0.3)
+        elif str(command) == "do broken" or "broken" in command.cmd and len(command.cmd) > 3:
+            return Exception("fake")
+
+        return None
+
+    def get(self, ctx):
+        return self.handle
+
+
+class AsyncBatchingHandler:
+    def __init__(self):
+        self.recorded = []
+
+    # noinspection PyUnusedLocal
+    async def handle(self, command, ctx):
+        self.recorded.append(str(command))
+        if str(command) == "do slow":
+            await asyncio.sleep(0.3)
+
+        return None
+
+
+def run_lane(handler, scenario):
+    ctx = test_context()
+    lane = _CommandLane(handler.handle, None, lambda *args: None)
+
+    async def run():
+        lane.open(ctx)
+        try:
+            await scenario(lane, ctx)
+        finally:
+            await lane.close()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+
+class DelayedCollector(Collector):
+    def __init__(self, delay):
+        self.delay = delay
+
+    def collect(self, ctx):
+        time.sleep(self.delay)
+        return "data"
+
+
+def register_brew_components(ctx, commands_by_comp_id):
+    for comp_id, cmd_args in commands_by_comp_id.items():
+        ctx.registry.register_collector(comp_id, DelayedCollector(0 if comp_id == "slow" else 0.1))
+        ctx.registry.register_validator(comp_id, MockValidator(result=validation_result_with("data")))
+        ctx.registry.register_reactor(comp_id, MockReactor(ReactorCommand(cmd_args)))
+
+
+class ConcurrencyRecordingHandler:
+    def __init__(self):
+        self.recorded = []
+        self.running = set()
+        self.running_with = {}
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def handle(self, command, ctx):
+        with self._lock:
+            self.recorded.append(str(command))
+            self.running.add(str(command))
+            self.max_running = max(self.max_running, len(self.running))
+
+        time.sleep(0.1)
+
+        with self._lock:
+            self.running_with[str(command)] = len(self.running)
+            self.running.remove(str(command))
+
+        return None
+
+    def get(self, ctx):
+        return self.handle
+
+
+class OutputRecordingLogger(CompositeLogger):
+    def __init__(self):
+        super().__init__(loggers=[])
+        self.recorded_output = []
+
+    def command_output(self, output):
+        self.recorded_output.append(output)
+
+
+def register_component(ctx, comp_id, *commands):
+    ctx.registry.register_collector(comp_id, MockCollector("data"))
+    ctx.registry.register_validator(comp_id, MockValidator(result=validation_result_with("data")))
+    ctx.registry.register_reactor(comp_id, MockReactor(*commands))
+
+
+def register_chain(ctx, *components):
+    """
+    Registers components, each of which is a prerequisite of the next one.
+    """
+    prerequisite = None
+    for comp_id, collector, status in components:
+        if prerequisite is not None:
+            collector = prerequisites(prerequisite)(collector)
+        ctx.registry.register_collector(comp_id, collector)
+        ctx.registry.register_validator(comp_id, MockValidator(result=validation_result_with("data", status)))
+        prerequisite = comp_id
+
+
 def validation_result_with(data, status: Status = Status.NOT_FOUND):
     return ValidationResult(data, status)
 
@@ -0,0 +1,181 @@
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+from shminspector.api.facts import FactStore
+from shminspector.util.cmd import ProcessScope, process_scope
+
+
+class FactStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.facts = FactStore()
+
+    def test_fact_is_computed_once(self):
+        computation = Computation("value")
+
+        self.assertEqual("value", self.facts.get("fact", computation))
+        self.assertEqual("value", self.facts.get("fact", computation))
+
+        self.assertEqual(1, computation.count)
+        self.assertEqual(1, self.facts.misses)
+        self.assertEqual(1, self.facts.hits)
+
+    def test_facts_are_keyed(self):
+        self.assertEqual("a", self.facts.get("a", Computation("a")))
+        self.assertEqual("b", self.facts.get("b", Computation("b")))
+
+        self.assertEqual(2, self.facts.misses)
+        self.assertEqual(0, self.facts.hits)
+
+    def test_concurrent_requests_share_one_computation(self):
+        computation = Computation("value", delay_sec=0.1)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            values = list(pool.map(lambda _: self.facts.get("fact", computation), range(8)))
+
+        self.assertEqual(["value"] * 8, values)
+        self.assertEqual(1, computation.count)
+        self.assertEqual(1, self.facts.misses)
+        self.assertEqual(7, self.facts.hits)
+
+    def test_errors_are_shared(self):
+        computation = Computation(error=ValueError("failed"))
+
+        self.assertRaises(ValueError, self.facts.get, "fact", computation)
+        self.assertRaises(ValueError, self.facts.get, "fact", computation)
+        self.assertEqual(1, computation.count)
+
+    def test_facts_of_timed_out_components_are_not_stored(self):
+        scope = ProcessScope("timed-out")
+        with process_scope(scope):
+            self.assertEqual("partial", self.facts.get("fact", KilledComputation(scope, "partial")))
+
+        self.assertEqual("value", self.facts.get("fact", Computation("value")))
+
+    def test_requests_waiting_for_a_timed_out_component_compute_again(self):
+        scope = ProcessScope("timed-out")
+        started = threading.Event()
+        computation = KilledComputation(scope, "partial", started=started, delay_sec=0.2)
+
+        def request_in_scope():
+            with process_scope(scope):
+                self.facts.get("fact", computation)
+
+        thread = threading.Thread(target=request_in_scope)
+        thread.start()
+        started.wait()
+        value = self.facts.get("fact", Computation("value"))
+        thread.join()
+
+        self.assertEqual("value", value)
+        self.assertEqual(2, self.facts.misses)
+        self.assertEqual(1, self.facts.hits)
+
+    def test_requests_waiting_for_a_timed_out_component_do_not_spin(self):
+        scope = ProcessScope("timed-out")
+        started = threading.Event()
+        discard = self.facts._discard
+
+        def slow_discard(key, fact):
+            time.sleep(0.2)
+            discard(key, fact)
+
+        def request_in_scope():
+            with process_scope(scope):
+                self.facts.get("fact", KilledComputation(scope, "partial", started=started, delay_sec=0.1))
+
+        with mock.patch.object(self.facts, "_discard", slow_discard):
+            thread = threading.Thread(target=request_in_scope)
+            thread.start()
+            started.wait()
+            self.facts.get("fact", Computation("value"))
+            thread.join()
+
+        self.assertEqual(1, self.facts.hits)
+
+    def test_interruptions_reach_waiting_requests_and_are_not_stored(self):
+        started = threading.Event()
+        interrupted = []
+
+        def interrupted_request():
+            try:
+                self.facts.get("fact", Computation(error=KeyboardInterrupt(), started=started, delay_sec=0.2))
+            except KeyboardInterrupt:
+                interrupted.append(True)
+
+        thread = threading.Thread(target=interrupted_request)
+        thread.start()
+        started.wait()
+        self.assertRaises(KeyboardInterrupt, self.facts.get, "fact", Computation("value"))
+        thread.join()
+
+        self.assertEqual([True], interrupted)
+        self.assertEqual("value", self.facts.get("fact", Computation("value")))
+
+    def test_invalidate(self):
+        computation = Computation("value")
+        self.facts.get("fact", computation)
+
+        self.facts.invalidate()
+        self.facts.get("fact", computation)
+
+        self.assertEqual(2, computation.count)
+        self.assertEqual(2, self.facts.misses)
+
+    def test_reset(self):
+        self.facts.get("fact", Computation("value"))
+        self.facts.get("fact", Computation("value"))
+
+        self.facts.reset()
+
+        self.assertEqual(0, self.facts.misses)
+        self.assertEqual(0, self.facts.hits)
+
+    def test_which(self):
+        self.assertIsNone(self.facts.which("python-that-does-not-exist"))
+        self.assertIsNone(self.facts.which("python-that-does-not-exist"))
+
+        self.assertEqual(1, self.facts.hits)
+
+    def test_execute(self):
+        output = self.facts.execute([sys.executable, "-c", "print('x')"])
+
+        self.assertEqual("x", output.strip())
+        self.assertIs(output, self.facts.execute([sys.executable, "-c", "print('x')"]))
+
+
+class Computation:
+    def __init__(self, value=None, error=None, delay_sec=0, started=None):
+        self.value = value
+        self.error = error
+        self.delay_sec = delay_sec
+        self.started = started
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.count += 1
+        if self.started is not None:
+            self.started.set()
+        time.sleep(self.delay_sec)
+        if self.error is not None:
+            raise self.error
+
+        return self.value
+
+
+class KilledComputation(Computation):
+    def __init__(self, scope, value, delay_sec=0, started=None):
+        super().__init__(value, delay_sec=delay_sec, started=started)
+        self.scope = scope
+
+    def __call__(self):
+        value = super().__call__()
+        self.scope.kill_all()
+
+        return value
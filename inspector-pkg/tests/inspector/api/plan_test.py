@@ -0,0 +1,74 @@
+import unittest
+
+from shminspector.api.dag import DAG
+from shminspector.api.plan import ExecutionPlan
+
+
+class ExecutionPlanTest(unittest.TestCase):
+
+    def test_waves_are_topological_levels(self):
+        dag = dag_of(("a", "c"), ("b", "c"), ("c", "d"), ("a", "e"))
+
+        plan = ExecutionPlan(dag, ["a", "b", "c", "d", "e"], {})
+
+        self.assertEqual([["a", "b"], ["e", "c"], ["d"]], plan.waves)
+        self.assertEqual(1, plan.wave_of("e"))
+
+    def test_filtered_components_pass_on_ordering_without_taking_a_wave(self):
+        dag = dag_of(("a", "filtered"), ("filtered", "b"))
+
+        plan = ExecutionPlan(dag, ["a", "b"], {"filtered": 100})
+
+        self.assertEqual([["a"], ["b"]], plan.waves)
+        self.assertEqual(0, plan.critical_path_sec)
+        self.assertEqual(["a", "b"], plan.critical_path)
+
+    def test_estimates(self):
+        dag = dag_of(("a", "c"), ("b", "c"), ("c", "d"), ("a", "e"))
+
+        plan = ExecutionPlan(dag, ["a", "b", "c", "d", "e"], {"a": 1, "b": 5, "c": 2, "d": 1, "e": 6})
+
+        self.assertEqual(15, plan.serial_sec)
+        self.assertEqual(8, plan.critical_path_sec)
+        self.assertEqual(["b", "c", "d"], plan.critical_path)
+        self.assertEqual([], plan.unknown_comp_ids)
+
+    def test_unknown_durations(self):
+        dag = dag_of(("a", "b"), ("b", "c"), ("x", "c"))
+
+        plan = ExecutionPlan(dag, ["a", "b", "c", "x"], {"x": 1})
+
+        self.assertEqual(1, plan.serial_sec)
+        self.assertEqual(["a", "b", "c"], plan.unknown_comp_ids)
+        self.assertEqual(["x", "c"], plan.critical_path)
+
+    def test_longest_chain_is_critical_without_durations(self):
+        dag = dag_of(("a", "b"), ("b", "c"), ("x", "c"))
+
+        plan = ExecutionPlan(dag, ["a", "b", "c", "x"], {})
+
+        self.assertEqual(["a", "b", "c"], plan.critical_path)
+
+    def test_empty(self):
+        plan = ExecutionPlan(DAG(), [], {})
+
+        self.assertEqual([], plan.waves)
+        self.assertEqual([], plan.critical_path)
+        self.assertEqual(0, plan.critical_path_sec)
+
+    def test_to_dict(self):
+        plan = ExecutionPlan(dag_of(("a", "b")), ["a", "b"], {"a": 1})
+
+        self.assertEqual({
+            "waves": [["a"], ["b"]],
+            "durations_sec": {"a": 1, "b": None},
+            "estimate": {"serial_sec": 1, "critical_path_sec": 1, "critical_path": ["a", "b"], "unknown": ["b"]},
+        }, plan.to_dict())
+
+
+def dag_of(*edges):
+    dag = DAG()
+    for source, target in edges:
+        dag.add_edge(source, target)
+
+    return dag
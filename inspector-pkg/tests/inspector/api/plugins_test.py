@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+
+from shminspector.api import plugins
+from shminspector.api.plugins import LazyHandler, loaded, register_plugins
+from shminspector.api.registry import Registry
+from shminspector.api.tags import prerequisites, CURRENT_PLATFORM, is_experimental, prerequisites_of, experimental
+
+
+class LazyHandlerTest(unittest.TestCase):
+
+    def test_load(self):
+        handler = LazyHandler("tests.inspector.api.plugins_test:Handler", "a", value="b")
+
+        self.assertFalse(handler.is_loaded())
+        self.assertEqual(("a",), handler.load().args)
+        self.assertEqual("b", handler.load().value)
+        self.assertTrue(handler.is_loaded())
+        self.assertIs(handler.load(), handler.load())
+
+    def test_declared_tags_are_added_to_the_loaded_handler(self):
+        handler = experimental(LazyHandler("tests.inspector.api.plugins_test:TaggedHandler"))
+
+        self.assertTrue(is_experimental(handler.load()))
+        self.assertEqual({"a"}, prerequisites_of(handler.load()))
+        self.assertFalse(is_experimental(TaggedHandler()))
+
+    def test_loaded(self):
+        handler = Handler()
+
+        self.assertIs(handler, loaded(handler))
+        self.assertIsNone(loaded(None))
+        self.assertIsInstance(loaded(LazyHandler("tests.inspector.api.plugins_test:Handler")), Handler)
+
+
+class LazyRegistryTest(unittest.TestCase):
+
+    def test_handlers_are_loaded_on_lookup(self):
+        registry = Registry()
+        collector = LazyHandler("tests.inspector.api.plugins_test:Handler")
+        reactor = LazyHandler("tests.inspector.api.plugins_test:Handler")
+        registry.register_collector("comp", collector)
+        registry.register_reactor("comp", reactor)
+
+        self.assertEqual(["comp"], list(registry.component_ids()))
+        self.assertFalse(collector.is_loaded())
+
+        self.assertIsInstance(registry.find_collector("comp"), Handler)
+        self.assertTrue(collector.is_loaded())
+        self.assertFalse(reactor.is_loaded())
+
+    def test_prerequisites_and_filtering_do_not_load_handlers(self):
+        registry = Registry()
+        collector = prerequisites("b", "a")(LazyHandler("tests.inspector.api.plugins_test:Handler"))
+        reactor = prerequisites("c", "a")(LazyHandler("tests.inspector.api.plugins_test:Handler"))
+        registry.register_collector("comp", collector)
+        registry.register_reactor("comp", reactor)
+        registry.register_collector("experimental", experimental(LazyHandler("no.such.module:Handler")))
+
+        self.assertEqual(["a", "b", "c"], registry.prerequisites_of("comp"))
+        view = registry.effective_view(CURRENT_PLATFORM, experimental=False, interactive=False)
+        self.assertEqual(["comp"], list(view.component_ids()))
+        self.assertFalse(collector.is_loaded())
+        self.assertFalse(reactor.is_loaded())
+
+        self.assertEqual(1, len(view.find_reactors("comp")))
+        self.assertTrue(reactor.is_loaded())
+
+
+class RegisterPluginsTest(unittest.TestCase):
+
+    def test_entry_points_are_registered(self):
+        registry = Registry()
+        targets = ["tests.inspector.api.plugins_test:register_plugin_components"]
+
+        with mock.patch.object(plugins, "_entry_point_targets", return_value=targets) as entry_point_targets:
+            register_plugins(registry, cache_dir=None)
+
+        entry_point_targets.assert_called_once_with(plugins.PLUGINS_ENTRY_POINT_GROUP, None)
+        self.assertEqual(["plugin"], list(registry.component_ids()))
+
+    def test_no_plugins_installed(self):
+        registry = Registry()
+
+        register_plugins(registry, group="no.such.group", cache_dir=None)
+
+        self.assertEqual(0, len(registry.component_ids()))
+
+    def test_entry_points_are_cached(self):
+        cache_dir = tempfile.mkdtemp(prefix="plugins-test-")
+
+        with scanned({"group": ["module:register"]}) as scan:
+            self.assertEqual(["module:register"], plugins._cached_entry_point_targets("group", cache_dir))
+            self.assertEqual(["module:register"], plugins._cached_entry_point_targets("group", cache_dir))
+
+        self.assertEqual(1, scan.call_count)
+
+    def test_only_read_groups_are_cached(self):
+        cache_dir = tempfile.mkdtemp(prefix="plugins-test-")
+
+        with scanned({"group": ["module:register"], "other": ["other:register"]}):
+            plugins._cached_entry_point_targets("group", cache_dir)
+            plugins._cached_entry_point_targets("empty", cache_dir)
+
+        with open(os.path.join(cache_dir, "plugins.json")) as cache_file:
+            self.assertEqual({"group": ["module:register"], "empty": []}, json.load(cache_file)["targets"])
+
+
+@contextmanager
+def scanned(targets):
+    with mock.patch.object(plugins, "_scanned_entry_point_targets", None), \
+            mock.patch.object(plugins, "_scan_entry_point_targets", return_value=targets) as scan:
+        yield scan
+
+
+def register_plugin_components(registry):
+    registry.register_collector("plugin", LazyHandler("tests.inspector.api.plugins_test:Handler"))
+
+
+class Handler:
+    def __init__(self, *args, value=None):
+        self.args = args
+        self.value = value
+
+
+@prerequisites("a")
+class TaggedHandler:
+    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,6 +30,13 @@ class ReactorCommandTest(unittest.TestCase):
 
         self.assertEqual(expected_command, command.resolve(ctx=test_context(mode=Mode.INTERACTIVE)))
 
+    def test_serial_defaults(self):
+        self.assertFalse(ReactorCommand(cmd=["brew", "install", "git"]).serial)
+        self.assertTrue(ReactorCommand(cmd=["sudo", "installer", "-pkg", "x.pkg"]).serial)
+        self.assertTrue(ReactorCommand(cmd=["git", "config", UserInput("email", "email: ")]).serial)
+        self.assertTrue(ReactorCommand(cmd=["brew", "install", "git"], serial=True).serial)
+        self.assertFalse(ReactorCommand(cmd=["sudo", "true"], serial=False).serial)
+
 
 def validation_result_with(status: Status):
     return ValidationResult(None, status)
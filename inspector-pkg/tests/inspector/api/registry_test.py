@@ -1,6 +1,7 @@
 import unittest
 
 from shminspector.api.registry import Registry
+from shminspector.api.tags import experimental, interactive, Platform, target_platform, CURRENT_PLATFORM
 
 
 class RegistryTest(unittest.TestCase):
@@ -24,10 +25,74 @@ class RegistryTest(unittest.TestCase):
         self.assertEqual(implied_compatible, registry.find_validator(comp_id))
         self.assertEqual([implied_compatible], registry.find_reactors(comp_id))
 
+    def test_effective_view(self):
+        registry = Registry()
+        compatible = DummyHandler()
+        registry.register_collector("compatible", compatible)
+        registry.register_collector("experimental", ExperimentalHandler())
+        registry.register_collector("incompatible", IncompatibleHandler())
+        registry.register_validator("compatible", compatible)
+        registry.register_reactor("compatible", compatible, InteractiveHandler())
+
+        view = registry.effective_view(CURRENT_PLATFORM, experimental=False, interactive=False)
+
+        self.assertEqual(["compatible"], list(view.component_ids()))
+        self.assertEqual(compatible, view.find_collector("compatible"))
+        self.assertIsNone(view.find_collector("experimental"))
+        self.assertIsNone(view.find_collector("incompatible"))
+        self.assertEqual(compatible, view.find_validator("compatible"))
+        self.assertEqual([compatible], view.find_reactors("compatible"))
+        self.assertEqual([], view.find_reactors("unknown"))
+
+    def test_effective_view_with_experimental_and_interactive(self):
+        registry = Registry()
+        registry.register_collector("experimental", ExperimentalHandler())
+        registry.register_reactor("experimental", InteractiveHandler())
+
+        view = registry.effective_view(CURRENT_PLATFORM, experimental=True, interactive=True)
+
+        self.assertIsNotNone(view.find_collector("experimental"))
+        self.assertEqual(1, len(view.find_reactors("experimental")))
+
+    def test_effective_views_are_cached_until_registration(self):
+        registry = Registry()
+        view = registry.effective_view(CURRENT_PLATFORM, experimental=False, interactive=False)
+
+        self.assertIs(view, registry.effective_view(CURRENT_PLATFORM, experimental=False, interactive=False))
+        self.assertIsNot(view, registry.effective_view(CURRENT_PLATFORM, experimental=True, interactive=False))
+
+        registry.register_collector("test", DummyHandler())
+
+        self.assertEqual(["test"], list(
+            registry.effective_view(CURRENT_PLATFORM, experimental=False, interactive=False).component_ids()
+        ))
+
+
+def not_the_current_platform():
+    if CURRENT_PLATFORM == Platform.MACOS:
+        return Platform.LINUX
+    else:
+        return Platform.MACOS
+
 
 class DummyHandler:
     def dummy(self): pass
 
 
+@experimental
+class ExperimentalHandler(DummyHandler):
+    pass
+
+
+@interactive
+class InteractiveHandler(DummyHandler):
+    pass
+
+
+@target_platform(not_the_current_platform())
+class IncompatibleHandler(DummyHandler):
+    pass
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,7 +3,7 @@ from uuid import uuid4
 
 from shminspector.api.tags import experimental, is_experimental, is_interactive, interactive, tags, has_tag, tags_of, \
     _platform_tag_name_for, Platform, CURRENT_PLATFORM, target_platform, linux, \
-    is_compatible_with_current_platform, prerequisites, prerequisites_of
+    is_compatible_with_current_platform, prerequisites, prerequisites_of, tag_info_of, timeout, timeout_of, macos
 
 TAG_A = str(uuid4())
 TAG_B = str(uuid4())
@@ -56,6 +56,34 @@ class TagsTest(unittest.TestCase):
 
         self.assertEqual(set(), prerequisites_of(obj))
 
+    def test_tag_info(self):
+        info = tag_info_of(TaggedDummy())
+
+        self.assertEqual({COMP_ID_A, COMP_ID_B}, info.prerequisites)
+        self.assertTrue(info.experimental)
+        self.assertTrue(info.interactive)
+        self.assertEqual(frozenset(), info.platforms)
+        self.assertIsNone(info.timeout)
+
+    def test_tag_info_of_platform_and_timeout(self):
+        info = tag_info_of(timeout(30)(macos(UnTaggedDummy())))
+
+        self.assertEqual({Platform.MACOS}, info.platforms)
+        self.assertEqual(30, info.timeout)
+        self.assertEqual(10, timeout_of(TimedDummy()))
+
+    def test_tagging_a_subclass_does_not_modify_the_base_class(self):
+        self.assertTrue(has_tag(TaggedSubclassDummy, TAG_C))
+        self.assertFalse(has_tag(TaggedDummy, TAG_C))
+        self.assertTrue(has_tag(TaggedSubclassDummy, TAG_A))
+
+    def test_tagging_an_instance_does_not_modify_its_class(self):
+        obj = prerequisites("other")(TaggedDummy())
+
+        self.assertEqual({COMP_ID_A, COMP_ID_B, "other"}, prerequisites_of(obj))
+        self.assertEqual({COMP_ID_A, COMP_ID_B}, prerequisites_of(TaggedDummy()))
+
+
 
 @tags(TAG_A, TAG_B)
 @prerequisites(COMP_ID_A, COMP_ID_B)
@@ -65,6 +93,16 @@ class TaggedDummy:
     pass
 
 
+@tags(TAG_C)
+class TaggedSubclassDummy(TaggedDummy):
+    pass
+
+
+@timeout(10)
+class TimedDummy:
+    pass
+
+
 class UnTaggedDummy:
     pass
 
@@ -0,0 +1,32 @@
+import os
+import tempfile
+import unittest
+
+from shminspector.components.bazel import BazelInfoCollector
+from tests.testutil import test_context
+
+
+class BazelInfoCollectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous_cwd = os.getcwd()
+        self.workspace_dir = tempfile.mkdtemp(prefix="bazel-test-")
+        package_dir = os.path.join(self.workspace_dir, "package")
+        os.makedirs(package_dir)
+        os.chdir(package_dir)
+
+    def tearDown(self):
+        os.chdir(self.previous_cwd)
+
+    def test_fingerprint_changes_with_bazelversion_of_parent_dir(self):
+        collector = BazelInfoCollector()
+        fingerprint = collector.fingerprint(test_context())
+
+        with open(os.path.join(self.workspace_dir, ".bazelversion"), "w") as bazelversion_file:
+            bazelversion_file.write("6.4.0\n")
+
+        self.assertNotEqual(fingerprint, collector.fingerprint(test_context()))
+
+
+if __name__ == '__main__':
+    unittest.main()
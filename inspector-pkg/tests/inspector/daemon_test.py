@@ -0,0 +1,130 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from shminspector.api.collector import Collector
+from shminspector.api.tags import prerequisites
+from shminspector.api.validator import Validator, ValidationResult, Status
+from shminspector.daemon import Daemon
+from shminspector.query import query
+from tests.testutil import test_context
+
+
+class DaemonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ctx = test_context()
+        self.ctx.config["daemon"] = {"socket_path": None}
+
+    def test_check_reports_results(self):
+        ctx = self.ctx
+        register(ctx, "comp", CountingCollector())
+
+        daemon = Daemon(ctx)
+        summary = daemon.check(["comp"])
+
+        self.assertEqual(1, summary.total_count)
+        self.assertEqual(Status.OK, daemon.results["comp"].status)
+        self.assertIsNotNone(daemon.last_check_time)
+
+    def test_only_changed_components_and_dependents_are_rechecked(self):
+        ctx = self.ctx
+        changed = CountingCollector()
+        dependent = DependentCountingCollector()
+        unchanged = CountingCollector()
+        register(ctx, "changed", changed)
+        register(ctx, "dependent", dependent)
+        register(ctx, "unchanged", unchanged)
+
+        daemon = Daemon(ctx)
+        daemon.check(["changed", "dependent", "unchanged"])
+        self.assertEqual(set(), daemon.changed_comp_ids())
+
+        changed.version = 2
+        changed_comp_ids = daemon.changed_comp_ids()
+        self.assertEqual({"changed"}, changed_comp_ids)
+
+        daemon.check(changed_comp_ids)
+
+        self.assertEqual(2, changed.count)
+        self.assertEqual(2, dependent.count)
+        self.assertEqual(1, unchanged.count)
+        self.assertEqual(set(), daemon.changed_comp_ids())
+
+    def test_watched_file_changes_are_detected(self):
+        with tempfile.TemporaryDirectory() as watched_dir:
+            ctx = self.ctx
+            ctx.config["daemon"] = {"watch": {"comp": [watched_dir]}, "socket_path": None}
+            register(ctx, "comp", CountingCollector())
+
+            daemon = Daemon(ctx)
+            daemon.check(["comp"])
+
+            with open(os.path.join(watched_dir, "config.json"), "w") as config_file:
+                config_file.write("{}")
+
+            self.assertEqual({"comp"}, daemon.changed_comp_ids())
+
+    def test_run_until_stopped(self):
+        with tempfile.TemporaryDirectory() as socket_dir:
+            socket_path = os.path.join(socket_dir, "status.sock")
+            ctx = test_context()
+            ctx.config["daemon"] = {"poll_sec": 0.01, "socket_path": socket_path}
+            collector = CountingCollector()
+            register(ctx, "comp", collector)
+
+            daemon = Daemon(ctx)
+            thread = threading.Thread(target=daemon.run)
+            thread.start()
+            collector.collected.wait(5)
+            wait_until(lambda: "comp" in daemon.results)
+
+            self.assertEqual("OK", query("comp", socket_path=socket_path)["status"])
+
+            daemon.stop()
+            thread.join(5)
+
+            self.assertFalse(thread.is_alive())
+            self.assertFalse(os.path.exists(socket_path))
+
+
+class CountingCollector(Collector):
+    def __init__(self):
+        self.version = 1
+        self.count = 0
+        self.collected = threading.Event()
+
+    def collect(self, ctx):
+        self.count += 1
+        self.collected.set()
+        return self.version
+
+    def fingerprint(self, ctx):
+        return self.version
+
+
+@prerequisites("changed")
+class DependentCountingCollector(CountingCollector):
+    pass
+
+
+class OkValidator(Validator):
+    def validate(self, input_data, ctx) -> ValidationResult:
+        return ValidationResult(input_data, Status.OK)
+
+
+def wait_until(condition, timeout=5):
+    end_time = time.time() + timeout
+    while not condition() and time.time() < end_time:
+        time.sleep(0.01)
+
+
+def register(ctx, comp_id, collector):
+    ctx.registry.register_collector(comp_id, collector)
+    ctx.registry.register_validator(comp_id, OkValidator())
+
+
+if __name__ == '__main__':
+    unittest.main()
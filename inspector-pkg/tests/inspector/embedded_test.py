@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from shminspector.api.registry import Registry
+from shminspector.api.tags import tag_info_of
+from shminspector.embedded import register_components
+
+
+class RegisterComponentsTest(unittest.TestCase):
+
+    def test_declared_tags_match_component_classes(self):
+        registry = Registry()
+        register_components(registry, plugins_cache_dir=tempfile.mkdtemp(prefix="embedded-test-"))
+
+        assert_declared_tags_match(self, registry)
+
+    def test_component_modules_are_not_imported(self):
+        # runs in a fresh interpreter, since other tests import component modules
+        script = "import sys; " \
+                 "from shminspector.api.registry import Registry; " \
+                 "from shminspector.embedded import register_components; " \
+                 "register_components(Registry(), plugins_cache_dir=None); " \
+                 "print([name for name in sys.modules if name.startswith('shminspector.components.')])"
+
+        output = subprocess.check_output([sys.executable, "-c", script],
+                                         env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+
+        self.assertEqual("[]", output.decode().strip())
+
+    def test_loading_components_keeps_debug_output(self):
+        # runs in a fresh interpreter, so that the component module is imported by the lookup
+        script = "from shminspector.api.context import Context; " \
+                 "from shminspector.api.registry import Registry; " \
+                 "from shminspector.components import NET_COMP_ID; " \
+                 "from shminspector.embedded import register_components; " \
+                 "ctx = Context(name='test', registry=Registry(), debug=True, no_cache=True); " \
+                 "register_components(ctx.registry, plugins_cache_dir=None); " \
+                 "ctx.registry.find_collector(NET_COMP_ID); " \
+                 "ctx.logger.debug('still debugging')"
+
+        output = subprocess.check_output([sys.executable, "-c", script], stderr=subprocess.STDOUT,
+                                         env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+
+        self.assertIn("still debugging", output.decode())
+
+    def test_plan_mode_modules_do_not_import_heavy_dependencies(self):
+        script = "import sys; " \
+                 "import shminspector.embedded, shminspector.clicontext, shminspector.api.plan; " \
+                 "print(sorted(name for name in ('asyncio', 'urllib.request', 'logging.handlers', 'pstats') " \
+                 "if name in sys.modules))"
+
+        output = subprocess.check_output([sys.executable, "-c", script],
+                                         env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+
+        self.assertEqual("[]", output.decode().strip())
+
+
+def assert_declared_tags_match(test, registry):
+    for comp_id in registry.component_ids():
+        handlers = [registry._collectors.get(comp_id), registry._validators.get(comp_id)]
+        for declared in handlers + registry._reactors.get(comp_id, []):
+            if declared is None:
+                continue
+
+            actual = tag_info_of(type(declared.load()))
+            test.assertEqual(tag_info_of(declared).tags, actual.tags, "{} of {}".format(declared, comp_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import io
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from contextlib import contextmanager, redirect_stdout
+
+from shminspector.api.executor import ComponentResult
+from shminspector.api.validator import Status
+from shminspector.query import query, QueryError, main, EXIT_OK, EXIT_PROBLEMS, EXIT_UNAVAILABLE, EXIT_UNKNOWN
+from shminspector.statusserver import StatusServer
+
+
+class StatusServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.socket_dir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.socket_dir.name, "status.sock")
+        self.server = StatusServer(self.socket_path)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.socket_dir.cleanup()
+
+    def test_query_component(self):
+        self.server.update({"comp": ComponentResult("comp", Status.NOT_FOUND, 0)}, 1000)
+
+        self.assertEqual({"id": "comp", "status": "NOT_FOUND", "checked_at": 1000},
+                         query("comp", socket_path=self.socket_path))
+
+    def test_query_all(self):
+        self.server.update({"comp1": ComponentResult("comp1", None, 0),
+                            "comp2": ComponentResult("comp2", Status.OK, 0)}, 1000)
+
+        self.assertEqual({"components": {"comp1": "OK", "comp2": "OK"}, "checked_at": 1000},
+                         query(socket_path=self.socket_path))
+
+    def test_query_unknown_component(self):
+        self.assertRaises(QueryError, lambda: query("unknown", socket_path=self.socket_path))
+
+    def test_concurrent_queries(self):
+        self.server.update({"comp": ComponentResult("comp", Status.OK, 0)}, 1000)
+        errors = []
+
+        def query_many():
+            try:
+                for _ in range(50):
+                    query("comp", socket_path=self.socket_path)
+            except Exception as err:
+                errors.append(err)
+
+        threads = list(threading.Thread(target=query_many) for _ in range(8))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+
+    def test_another_server_on_the_same_socket_is_rejected(self):
+        self.assertRaises(Exception, StatusServer(self.socket_path).start)
+
+    def test_main_exit_codes(self):
+        os.environ["SHMINSPECTOR_SOCKET"] = self.socket_path
+        try:
+            self.server.update({"comp1": ComponentResult("comp1", Status.OK, 0),
+                                "comp2": ComponentResult("comp2", Status.ERROR, 0)}, 1000)
+
+            self.assertEqual(EXIT_OK, main(["comp1"]))
+            self.assertEqual(EXIT_PROBLEMS, main([]))
+            self.assertEqual(EXIT_UNKNOWN, main(["unknown"]))
+
+            self.server.stop()
+
+            self.assertEqual(EXIT_UNAVAILABLE, main([]))
+        finally:
+            del os.environ["SHMINSPECTOR_SOCKET"]
+
+
+    def test_main_exit_code_before_first_check(self):
+        os.environ["SHMINSPECTOR_SOCKET"] = self.socket_path
+        try:
+            self.assertEqual(EXIT_UNKNOWN, main([]))
+            self.assertEqual(EXIT_UNKNOWN, main(["comp1"]))
+        finally:
+            del os.environ["SHMINSPECTOR_SOCKET"]
+
+    def test_main_help(self):
+        output = io.StringIO()
+        with redirect_stdout(output), self.assertRaises(SystemExit) as exit_context:
+            main(["--help"])
+
+        self.assertEqual(0, exit_context.exception.code)
+        self.assertIn("usage: envstatus", output.getvalue())
+
+
+class QueryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.socket_dir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.socket_dir.name, "status.sock")
+
+    def tearDown(self):
+        self.socket_dir.cleanup()
+
+    def test_server_closing_without_reply(self):
+        with replying_server(self.socket_path, b""):
+            self.assertRaises(QueryError, lambda: query(socket_path=self.socket_path))
+
+    def test_truncated_reply(self):
+        with replying_server(self.socket_path, b'{"components": {"comp'):
+            self.assertRaises(QueryError, lambda: query(socket_path=self.socket_path))
+
+    def test_main_exit_code_without_reply(self):
+        os.environ["SHMINSPECTOR_SOCKET"] = self.socket_path
+        try:
+            with replying_server(self.socket_path, b""):
+                self.assertEqual(EXIT_UNAVAILABLE, main([]))
+        finally:
+            del os.environ["SHMINSPECTOR_SOCKET"]
+
+
+@contextmanager
+def replying_server(socket_path, reply):
+    """
+    Serves a single query with the specified raw reply, then closes the connection.
+    """
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+
+    def serve():
+        connection, _ = server.accept()
+        with connection:
+            connection.recv(1024)
+            connection.sendall(reply)
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    try:
+        yield
+    finally:
+        thread.join()
+        server.close()
+
+if __name__ == '__main__':
+    unittest.main()
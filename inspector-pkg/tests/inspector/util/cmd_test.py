@@ -0,0 +1,76 @@
+import asyncio
+import subprocess
+import time
+import unittest
+
+from shminspector.util.cmd import execute, try_execute, try_execute_async, execute_with_streamed_output, \
+    ProcessScope, process_scope
+
+
+class CmdTest(unittest.TestCase):
+
+    def test_execute(self):
+        self.assertEqual("ok\n", execute(["echo", "ok"]))
+
+    def test_execute_timeout(self):
+        self.assertRaises(subprocess.TimeoutExpired, lambda: execute(["sleep", "30"], timeout=0.2))
+
+    def test_try_execute_exit_code(self):
+        self.assertEqual((True, 3, "out\n"), try_execute(["sh", "-c", "echo out; exit 3"]))
+        self.assertEqual((True, -9, ""), try_execute(["sh", "-c", "kill -9 $$"]))
+
+    def test_try_execute_timeout_output(self):
+        _, _, output = try_execute(["sh", "-c", "echo partial; sleep 30"], timeout=0.5)
+
+        self.assertEqual("partial\n", output)
+
+    def test_try_execute_missing_command(self):
+        self.assertEqual((False, -1, None), try_execute(["no-such-command-a1b2c3"]))
+
+    def test_try_execute_timeout(self):
+        ok, code, _ = try_execute(["sleep", "30"], timeout=0.2)
+
+        self.assertTrue(ok)
+        self.assertNotEqual(0, code)
+
+    def test_try_execute_async_timeout(self):
+        loop = asyncio.new_event_loop()
+        try:
+            ok, code, _ = loop.run_until_complete(try_execute_async(["sleep", "30"], timeout=0.2))
+        finally:
+            loop.close()
+
+        self.assertTrue(ok)
+        self.assertNotEqual(0, code)
+
+    def test_try_execute_async_timeout_output(self):
+        loop = asyncio.new_event_loop()
+        try:
+            _, _, output = loop.run_until_complete(
+                try_execute_async(["sh", "-c", "echo partial; sleep 30"], timeout=0.5)
+            )
+        finally:
+            loop.close()
+
+        self.assertEqual("partial\n", output)
+
+    def test_streamed_output_timeout(self):
+        def consume():
+            list(execute_with_streamed_output(["sleep", "30"], timeout=0.2))
+
+        self.assertRaises(subprocess.TimeoutExpired, consume)
+
+    def test_killed_scope_kills_new_processes(self):
+        scope = ProcessScope("test")
+        scope.kill_all()
+
+        start_time = time.time()
+        with process_scope(scope):
+            ok, code, _ = try_execute(["sleep", "30"])
+
+        self.assertLess(time.time() - start_time, 5)
+        self.assertNotEqual(0, code)
+
+
+if __name__ == '__main__':
+    unittest.main()
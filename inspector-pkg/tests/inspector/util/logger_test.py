@@ -0,0 +1,105 @@
+import logging
+import os
+import tempfile
+import unittest
+
+from shminspector.util.logger import CompositeLogger, FileLogger, NOOP_LOGGER, Logger, render
+
+
+class RenderTest(unittest.TestCase):
+
+    def test_format_string_with_arguments(self):
+        self.assertEqual("a -> b", render("{} -> {}", ("a", "b")))
+
+    def test_function(self):
+        self.assertEqual("message", render(lambda: "message"))
+
+    def test_plain_messages_are_not_formatted(self):
+        error = ValueError("{}")
+
+        self.assertEqual("{}", render("{}"))
+        self.assertIs(error, render(error))
+
+
+class CompositeLoggerTest(unittest.TestCase):
+
+    def test_dispatches_to_enabled_loggers_only(self):
+        info_logger = RecordingLogger(logging.INFO)
+        debug_logger = RecordingLogger(logging.DEBUG)
+        logger = CompositeLogger([info_logger, debug_logger])
+
+        logger.debug("{} - debug", "id")
+        logger.info("info")
+
+        self.assertEqual([("info", "info")], info_logger.recorded)
+        self.assertEqual([("debug", "id - debug"), ("info", "info")], debug_logger.recorded)
+
+    def test_filtered_out_messages_are_not_formatted(self):
+        logger = CompositeLogger([RecordingLogger(logging.INFO)])
+
+        logger.debug(lambda: self.fail("formatted a filtered out message"))
+        logger.debug("{}", Unformattable())
+
+    def test_is_enabled(self):
+        logger = CompositeLogger([RecordingLogger(logging.WARNING), NOOP_LOGGER])
+
+        self.assertTrue(logger.is_enabled("error"))
+        self.assertFalse(logger.is_enabled("info"))
+
+
+class FileLoggerTest(unittest.TestCase):
+
+    def test_deferred_messages(self):
+        file_path = os.path.join(tempfile.mkdtemp(prefix="logger-test-"), "test.log")
+        logger = FileLogger(filename=file_path, level=logging.INFO)
+        try:
+            logger.info("{} -> {}", "a", "b")
+            logger.warn(lambda: "warning")
+            logger.debug(lambda: self.fail("formatted a filtered out message"))
+        finally:
+            for handler in logger.logger.handlers:
+                handler.close()
+            logger.logger.handlers.clear()
+
+        with open(file_path) as log_file:
+            lines = log_file.read().splitlines()
+
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[0].endswith("INFO: a -> b"))
+        self.assertTrue(lines[1].endswith("WARNING: warning"))
+
+
+class NoopLoggerTest(unittest.TestCase):
+
+    def test_messages_are_not_formatted(self):
+        NOOP_LOGGER.debug(lambda: self.fail("formatted a message"))
+        NOOP_LOGGER.error("{}", Unformattable())
+
+        self.assertFalse(NOOP_LOGGER.is_enabled("error"))
+
+
+class RecordingLogger(Logger):
+    def __init__(self, level):
+        self.level = level
+        self.recorded = []
+
+    def is_enabled(self, method_name):
+        return self.LEVELS[method_name] >= self.level
+
+    def progress(self, message, *args):
+        self.recorded.append(("progress", render(message, args)))
+
+    def debug(self, message, *args):
+        self.recorded.append(("debug", render(message, args)))
+
+    def info(self, message, *args):
+        self.recorded.append(("info", render(message, args)))
+
+
+class Unformattable:
+    def __format__(self, format_spec):
+        raise AssertionError("formatted a filtered out message")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from shminspector.api.collector import Collector, AsyncCollector
+from shminspector.api.executor import Executor
+from shminspector.util.logger import NOOP_LOGGER
+from shminspector.util import profile
+from shminspector.util.profile import Profiler, profiling, profiled, REPORT_FILE_NAME
+from tests.testutil import test_context
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def test_run_writes_stats_per_name(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            profiler = Profiler(profile_dir)
+
+            self.assertEqual(3, profiler.run("comp.collect", busy, 3))
+            profiler.run("comp.collect", busy, 3)
+
+            self.assertEqual(["comp.collect.2.pstats", "comp.collect.pstats"], sorted(os.listdir(profile_dir)))
+
+    def test_skipped_calls_are_logged(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            logger = mock.Mock()
+            profiler = Profiler(profile_dir, logger)
+
+            with mock.patch.object(profile, "_try_enable", return_value=False):
+                self.assertEqual(3, profiler.run("comp.collect", busy, 3))
+
+            self.assertEqual([], os.listdir(profile_dir))
+            logger.warn.assert_called_once()
+            self.assertIn("comp.collect", logger.warn.call_args[0])
+
+    def test_report(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            profiler = Profiler(profile_dir)
+            profiler.run("comp.collect", busy, 3)
+
+            report = profiler.report(top=5)
+
+            self.assertIn("busy", report)
+            self.assertTrue(os.path.exists(os.path.join(profile_dir, REPORT_FILE_NAME)))
+
+    def test_profiled_without_active_profiler(self):
+        self.assertEqual(3, profiled("name", busy, 3))
+
+    def test_component_phases_are_profiled(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            ctx = test_context()
+            ctx.registry.register_collector("comp", BusyCollector())
+
+            with profiling(profile_dir, NOOP_LOGGER):
+                Executor().execute(ctx)
+
+            self.assertEqual(["comp.collect.pstats", REPORT_FILE_NAME], sorted(os.listdir(profile_dir)))
+
+    def test_async_component_phases_are_profiled(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            ctx = test_context()
+            ctx.registry.register_collector("comp", AsyncBusyCollector())
+
+            with profiling(profile_dir, NOOP_LOGGER) as profiler:
+                Executor().execute(ctx)
+                report = profiler.report()
+
+            self.assertIn("comp.collect.pstats", os.listdir(profile_dir))
+            self.assertIn("busy", report)
+
+
+class BusyCollector(Collector):
+    def collect(self, ctx):
+        return busy(1000)
+
+
+class AsyncBusyCollector(AsyncCollector):
+    async def collect(self, ctx):
+        await asyncio.sleep(0.01)
+        return busy(1000)
+
+
+def busy(count):
+    return len(list(str(i) for i in range(count)))
+
+
+if __name__ == '__main__':
+    unittest.main()
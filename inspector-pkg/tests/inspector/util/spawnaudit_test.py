@@ -0,0 +1,67 @@
+import unittest
+
+from shminspector.api.collector import Collector
+from shminspector.api.executor import Executor
+from shminspector.util import cmd
+from shminspector.util.spawnaudit import auditing, SpawnAudit, UNGROUPED
+from tests.testutil import test_context
+
+
+class SpawnAuditTest(unittest.TestCase):
+
+    def test_spawns_are_recorded_per_component(self):
+        ctx = test_context()
+        ctx.flags.debug = True
+        ctx.registry.register_collector("comp", SpawningCollector())
+
+        with auditing(ctx) as audit:
+            Executor().execute(ctx)
+            cmd.try_execute(["true"])
+
+        groups = audit.grouped_records()
+        self.assertEqual({"comp", UNGROUPED}, set(groups))
+
+        record = groups["comp"][0]
+        self.assertEqual(["python3", "-c", "sum(range(100000))"], record.argv)
+        self.assertEqual(0, record.return_code)
+        self.assertGreater(record.wall_time, 0)
+        self.assertIsNotNone(record.user_time)
+        self.assertIsNotNone(record.system_time)
+        self.assertGreater(record.max_rss, 0)
+
+    def test_usage_of_timed_out_processes_is_recorded(self):
+        ctx = test_context()
+        ctx.flags.debug = True
+
+        with auditing(ctx) as audit:
+            cmd.try_execute(["sleep", "30"], timeout=0.2)
+
+        record = audit.grouped_records()[UNGROUPED][0]
+        self.assertEqual(-9, record.return_code)
+        self.assertIsNotNone(record.user_time)
+
+    def test_auditing_is_off_without_debug(self):
+        ctx = test_context()
+
+        with auditing(ctx) as audit:
+            cmd.try_execute(["true"])
+
+        self.assertIsNone(audit)
+
+    def test_table(self):
+        audit = SpawnAudit()
+        audit.add("comp", ["brew", "doctor"], 2.5, None, 0)
+
+        table = audit.table()
+
+        self.assertIn("brew doctor", table)
+        self.assertIn("comp total", table)
+
+
+class SpawningCollector(Collector):
+    def collect(self, ctx):
+        return cmd.execute(["python3", "-c", "sum(range(100000))"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+
+from shminspector.api.collector import Collector
+from shminspector.api.executor import Executor
+from shminspector.util import cmd, trace
+from shminspector.util.trace import Tracer, tracing
+from tests.testutil import test_context
+
+
+class TracerTest(unittest.TestCase):
+
+    def test_complete_span(self):
+        tracer = Tracer()
+
+        tracer.complete("collect", "component", 1.0, 1.5, lane="comp", args={"cached": False})
+
+        metadata, event = tracer.trace_events()
+        self.assertEqual({"name": "thread_name", "ph": "M", "pid": tracer.pid, "tid": 1, "args": {"name": "comp"}},
+                         metadata)
+        self.assertEqual({"name": "collect", "cat": "component", "ph": "X", "ts": 1000000, "dur": 500000,
+                          "pid": tracer.pid, "tid": 1, "args": {"cached": False}}, event)
+
+    def test_spans_are_ignored_when_tracing_is_off(self):
+        with trace.span("name", "category"):
+            pass
+
+        self.assertIsNone(trace.active_tracer())
+
+    def test_run_is_traced(self):
+        with tempfile.TemporaryDirectory() as trace_dir:
+            trace_file_path = os.path.join(trace_dir, "trace.json")
+            ctx = test_context()
+            ctx.registry.register_collector("comp", SubprocessCollector())
+
+            with tracing(trace_file_path):
+                Executor().execute(ctx)
+
+            with open(trace_file_path) as trace_file:
+                events = json.load(trace_file)["traceEvents"]
+
+        names = set(event["name"] for event in events)
+        self.assertTrue({"execution graph", "collect", "comp", "run", "echo"}.issubset(names))
+
+        echo_span = next(event for event in events if event["name"] == "echo")
+        self.assertEqual(["echo", "traced"], echo_span["args"]["argv"])
+        self.assertEqual(0, echo_span["args"]["returncode"])
+
+        comp_lane = next(event["tid"] for event in events if event["name"] == "comp" and event["ph"] == "X")
+        self.assertEqual(comp_lane, echo_span["tid"])
+
+
+class SubprocessCollector(Collector):
+    def collect(self, ctx):
+        return cmd.execute(["echo", "traced"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,7 +29,6 @@ setup(
     ],
     install_requires=[
         'envinspector-sha1n>=0.0.1',
-        'networkx>=2.2,<3',
     ],
     entry_points={
         "console_scripts": [
@@ -1,56 +1,92 @@
 from shminspector import embedded as inspector
+from shminspector.api.cache import DEFAULT_CACHE_DIR
 from shminspector.clicontext import parse_context
-from shminspector.api.executor import Executor
+from shminspector.api.plugins import LazyHandler, register_plugins
 from shminspector.api.registry import Registry
+from shminspector.api.tags import macos, interactive, experimental, prerequisites
+from shminspector.api.validator import Status
 from shminspector.components import *
 
 from shminstaller.cliapp import CliAppRunner
-from shminstaller.components.bazel import BazelInstallReactor
-from shminstaller.components.brew import HomebrewInstallReactor
-from shminstaller.components.docker import DockerInstallReactor
-from shminstaller.components.gcloud import GCloudInstallReactor, GCloudConfigInstallReactor
-from shminstaller.components.python import PythonInstallReactor, Python3InstallReactor
-from shminstaller.components.xcode import XcodeInstallReactor
 
+INSTALLER_PLUGINS_ENTRY_POINT_GROUP = "shminstaller.components"
 
-def register_components(registry: Registry):
-    inspector.register_components(registry)
 
-    registry.register_reactor(BREW_COMP_ID, HomebrewInstallReactor())
-    registry.register_reactor(BAZEL_COMP_ID, BazelInstallReactor())
-    registry.register_reactor(PYTHON_COMP_ID, PythonInstallReactor())
-    registry.register_reactor(PYTHON3_COMP_ID, Python3InstallReactor())
-    registry.register_reactor(XCODE_COMP_ID, XcodeInstallReactor())
-    registry.register_reactor(GCLOUD_COMP_ID, GCloudInstallReactor())
-    registry.register_reactor(GCLOUD_CONFIG_COMP_ID, GCloudConfigInstallReactor())
-    registry.register_reactor(inspector.DOCKER_COMP_ID, DockerInstallReactor())
+def _lazy(target, *args, **kwargs):
+    """
+    Reactor modules are only imported when their components are actually scheduled. The tags declared on the returned
+    handlers must match the tags of the referenced classes.
+    """
+    return LazyHandler("shminstaller.components." + target, *args, **kwargs)
 
-def _inspection_context():
-    registry = Registry()
-    inspector.register_components(registry)
-    ctx = parse_context(name="installer", registry=registry)
 
-    return ctx
+def register_components(registry: Registry, plugins_cache_dir=DEFAULT_CACHE_DIR):
+    inspector.register_components(registry, plugins_cache_dir)
+
+    registry.register_reactor(BREW_COMP_ID, macos(interactive(
+        prerequisites(DISK_COMP_ID, NET_COMP_ID)(_lazy("brew:HomebrewInstallReactor"))
+    )))
+    registry.register_reactor(BAZEL_COMP_ID, macos(experimental(
+        prerequisites(BREW_COMP_ID)(_lazy("bazel:BazelInstallReactor"))
+    )))
+    registry.register_reactor(PYTHON_COMP_ID, macos(
+        prerequisites(BREW_COMP_ID)(_lazy("python:PythonInstallReactor"))
+    ))
+    registry.register_reactor(PYTHON3_COMP_ID, macos(experimental(interactive(
+        prerequisites(DISK_COMP_ID, NET_COMP_ID)(_lazy("python:Python3InstallReactor"))
+    ))))
+    registry.register_reactor(XCODE_COMP_ID, macos(interactive(
+        prerequisites(DISK_COMP_ID, NET_COMP_ID)(_lazy("xcode:XcodeInstallReactor"))
+    )))
+    registry.register_reactor(GCLOUD_COMP_ID, macos(interactive(experimental(
+        prerequisites(BREW_COMP_ID)(_lazy("gcloud:GCloudInstallReactor"))
+    ))))
+    registry.register_reactor(GCLOUD_CONFIG_COMP_ID, macos(interactive(experimental(
+        prerequisites(GCLOUD_COMP_ID, NET_COMP_ID)(_lazy("gcloud:GCloudConfigInstallReactor"))
+    ))))
+    registry.register_reactor(DOCKER_COMP_ID, macos(experimental(interactive(
+        prerequisites(DISK_COMP_ID, NET_COMP_ID)(_lazy("docker:DockerInstallReactor"))
+    ))))
+
+    register_plugins(registry, INSTALLER_PLUGINS_ENTRY_POINT_GROUP, plugins_cache_dir)
 
 
 def run_embedded(ctx):
+    # deferred, because the executor imports asyncio, which argument parsing and plan mode do not need
+    from shminspector.api.executor import Executor
     executor = Executor()
 
     def execute():
         summary = executor.execute(ctx)
 
         if summary.problem_count > 0:
-            verify_changes()
+            verify_changes(summary)
         else:
             ctx.logger.success("No problems detected!")
 
         return summary
 
-    def verify_changes():
-        if not ctx.flags.dryrun:
-            ctx.logger.info("Inspecting components again to verify changes...")
-            if inspector.run_embedded(_inspection_context()).problem_count > 0:
-                ctx.logger.failure("Some issues could not be resolved. Please report this issue!")
+    def verify_changes(summary):
+        if ctx.flags.dryrun:
+            return
+
+        changed_comp_ids = [result.comp_id for result in summary.results if result.command_count > 0]
+        if len(changed_comp_ids) == 0:
+            # nothing was attempted, so there is nothing to verify and every problem is still there
+            ctx.logger.failure("Some issues could not be resolved. Please report this issue!")
+            return
+
+        ctx.logger.info("Inspecting changed components again to verify changes: {}".format(", ".join(changed_comp_ids)))
+
+        verification = executor.verify(ctx, changed_comp_ids)
+        verified_comp_ids = set(result.comp_id for result in verification.results)
+        unchanged_problem_count = sum(
+            1 for result in summary.results
+            if result.comp_id not in verified_comp_ids and result.status not in (None, Status.OK)
+        )
+
+        if verification.problem_count + unchanged_problem_count > 0:
+            ctx.logger.failure("Some issues could not be resolved. Please report this issue!")
 
     return execute()
 
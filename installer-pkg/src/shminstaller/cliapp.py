@@ -1,8 +1,11 @@
 import json
 
 from shminspector.api.context import Context
-from shminspector.api.executor import ExecPlanExecutor
+from shminspector.api.plan import ExecPlanExecutor
 from shminspector.api.registry import Registry
+from shminspector.util.profile import profiling
+from shminspector.util.spawnaudit import auditing
+from shminspector.util.trace import tracing
 
 
 class CliAppRunner:
@@ -22,10 +25,14 @@ class CliAppRunner:
         ctx.logger.info("Starting {}.".format(self.name))
         _print_header(ctx)
 
-        if ctx.flags.plan:
-            _run_safe_execution_plan(ctx)
-        else:
-            run_safe(ctx, self._do_run)
+        with tracing(ctx.flags.trace_file), profiling(ctx.flags.profile_dir, ctx.logger), auditing(ctx):
+            if ctx.flags.plan:
+                _run_safe_execution_plan(ctx)
+            elif ctx.flags.daemon:
+                from shminspector.daemon import run_daemon
+                run_safe(ctx, run_daemon)
+            else:
+                run_safe(ctx, self._do_run)
 
         ctx.logger.info("{} finished.".format(self.name.capitalize()))
 
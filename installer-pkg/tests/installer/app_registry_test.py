@@ -0,0 +1,22 @@
+import tempfile
+import unittest
+
+from shminspector.api.registry import Registry
+from shminspector.api.tags import tag_info_of
+from shminstaller.app import register_components
+
+
+class RegisterComponentsTest(unittest.TestCase):
+
+    def test_declared_reactor_tags_match_reactor_classes(self):
+        registry = Registry()
+        register_components(registry, plugins_cache_dir=tempfile.mkdtemp(prefix="app-registry-test-"))
+
+        for comp_id in registry.component_ids():
+            for declared in registry._reactors.get(comp_id, []):
+                actual = tag_info_of(type(declared.load()))
+                self.assertEqual(tag_info_of(declared).tags, actual.tags, "{} of {}".format(declared, comp_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,15 @@
+import tempfile
 import unittest
 
-from shminstaller.app import run_embedded, _inspection_context
+from shminstaller.app import run_embedded, register_components
 from tests.testutil import test_context
 
 
-@unittest.skip  # argv passed by testing executing env screw the args parser
 class InstallerSanityTestTest(unittest.TestCase):
 
     def test_dry_run_sanity(self):
         context = test_context()
-        context.registry = _inspection_context().registry
+        register_components(context.registry, plugins_cache_dir=tempfile.mkdtemp(prefix="app-sanity-test-"))
         context.flags.dryrun = True
 
         summary = run_embedded(context)
@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+
+from shminspector.api.collector import Collector
+from shminspector.api.context import Context
+from shminspector.api.executor import Executor
+from shminspector.api.reactor import Reactor, ReactorCommand
+from shminspector.api.tags import prerequisites
+from shminspector.api.validator import Validator, ValidationResult, Status
+from shminstaller.app import run_embedded
+from tests.testutil import test_context
+
+
+class RunEmbeddedTest(unittest.TestCase):
+
+    def test_only_changed_components_and_dependents_are_verified(self):
+        ctx = test_context()
+        ctx.flags.dryrun = False
+        ctx.cache = None
+
+        fixed = SequenceCollector(Status.NOT_FOUND, Status.OK)
+        dependent = DependentSequenceCollector(Status.OK, Status.OK)
+        unrelated = SequenceCollector(Status.OK)
+
+        ctx.registry.register_collector("fixed", fixed)
+        ctx.registry.register_validator("fixed", StatusValidator())
+        ctx.registry.register_reactor("fixed", FixingReactor())
+        ctx.registry.register_collector("dependent", dependent)
+        ctx.registry.register_validator("dependent", StatusValidator())
+        ctx.registry.register_collector("unrelated", unrelated)
+        ctx.registry.register_validator("unrelated", StatusValidator())
+
+        summary = run_embedded(ctx)
+
+        self.assertEqual(1, summary.problem_count)
+        self.assertEqual(2, fixed.call_count)
+        self.assertEqual(2, dependent.call_count)
+        self.assertEqual(1, unrelated.call_count)
+
+    def test_nothing_is_verified_without_changes(self):
+        ctx = test_context()
+        ctx.flags.dryrun = False
+        ctx.cache = None
+
+        ctx.registry.register_collector("broken", SequenceCollector(Status.NOT_FOUND))
+        ctx.registry.register_validator("broken", StatusValidator())
+
+        with mock.patch.object(Executor, "verify") as verify:
+            summary = run_embedded(ctx)
+
+        self.assertEqual(1, summary.problem_count)
+        verify.assert_not_called()
+
+
+class SequenceCollector(Collector):
+    def __init__(self, *statuses):
+        self.statuses = statuses
+        self.call_count = 0
+
+    def collect(self, ctx: Context):
+        status = self.statuses[self.call_count]
+        self.call_count += 1
+        return status
+
+
+@prerequisites("fixed")
+class DependentSequenceCollector(SequenceCollector):
+    pass
+
+
+class StatusValidator(Validator):
+    def validate(self, input_data, ctx: Context) -> ValidationResult:
+        return ValidationResult(input_data, input_data)
+
+
+class FixingReactor(Reactor):
+    def react(self, data, ctx: Context):
+        if data.status != Status.OK:
+            return [ReactorCommand(["true"], silent=True)]
+        else:
+            return []
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,4 +9,4 @@ def test_context(mode=None) -> Context:
     if resolved_mode is None:
         resolved_mode = Mode.from_str(os.environ.get('INSPECTOR_TEST_MODE', str(Mode.BACKGROUND)))
 
-    return Context(name="test", mode=resolved_mode, dryrun=True, registry=Registry())
+    return Context(name="test", mode=resolved_mode, dryrun=True, no_cache=True, registry=Registry())